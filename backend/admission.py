@@ -0,0 +1,163 @@
+import math
+import time
+import bisect
+import itertools
+import threading
+from typing import Dict, Any, Optional
+
+from config import Config
+from metrics import REGISTRY, LATENCY_BUCKETS
+
+INTERACTIVE = 'interactive'
+BATCH = 'batch'
+PRIORITIES = {INTERACTIVE: 0, BATCH: 1}
+
+ADMISSION_WAIT_SECONDS = REGISTRY.histogram(
+    "legal_ai_admission_wait_seconds", "Time admitted requests spent queued", ("work", "priority"),
+    buckets=LATENCY_BUCKETS
+)
+ADMISSION_REJECTED_TOTAL = REGISTRY.counter(
+    "legal_ai_admission_rejected_total", "Requests shed by admission control", ("work", "priority", "reason")
+)
+ADMISSION_QUEUE_DEPTH = REGISTRY.gauge(
+    "legal_ai_admission_queue_depth", "Requests waiting for admission", ("work",)
+)
+ADMISSION_ACTIVE = REGISTRY.gauge(
+    "legal_ai_admission_active", "Requests currently admitted", ("work",)
+)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed; retry_after is the suggested delay in seconds"""
+
+    def __init__(self, message: str, retry_after: int, reason: str):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class AdmissionTicket:
+    """Proof of admission; hand it back to release()"""
+
+    __slots__ = ("priority", "admitted_at")
+
+    def __init__(self, priority: str):
+        self.priority = priority
+        self.admitted_at = time.monotonic()
+
+
+class AdmissionController:
+    """Bounded, priority-ordered admission queue for one kind of work (query or ingest)"""
+
+    def __init__(self, work: str, max_concurrent: int, max_queue: int, max_batch_queue: int, max_wait: float):
+        self.work = work
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_batch_queue = max_batch_queue
+        self.max_wait = max_wait
+
+        self._cond = threading.Condition()
+        self._active = 0
+        # Sorted (priority rank, arrival sequence, entry) so interactive waiters are always served first
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._service_time = None  # EMA of seconds a request holds its slot
+        self._stats = {"admitted": 0, "rejected": 0, "timed_out": 0}
+
+    def _expected_wait(self, ahead: int) -> float:
+        """Seconds until a request with `ahead` higher-or-equal priority waiters gets a slot"""
+        if self._service_time is None:
+            return 0.0
+        return (ahead // self.max_concurrent + 1) * self._service_time
+
+    def _reject(self, priority: str, reason: str, message: str, expected_wait: float):
+        self._stats["rejected"] += 1
+        if reason == "timeout":
+            self._stats["timed_out"] += 1
+        ADMISSION_REJECTED_TOTAL.inc(work=self.work, priority=priority, reason=reason)
+        retry_after = max(1, math.ceil(expected_wait or self._service_time or 1))
+        raise AdmissionRejected(message, retry_after, reason)
+
+    def acquire(self, priority: str = INTERACTIVE) -> AdmissionTicket:
+        """Wait for a slot, or raise AdmissionRejected when the queue is full or the wait would be too long"""
+        priority = priority if priority in PRIORITIES else INTERACTIVE
+        rank = PRIORITIES[priority]
+        start = time.monotonic()
+
+        with self._cond:
+            if self._active < self.max_concurrent and not self._waiters:
+                self._active += 1
+                return self._admitted(priority, start)
+
+            queue_limit = self.max_queue if priority == INTERACTIVE else self.max_batch_queue
+            if len(self._waiters) >= queue_limit:
+                self._reject(priority, "queue_full", f"{self.work} queue is full",
+                             self._expected_wait(len(self._waiters)))
+
+            ahead = sum(1 for waiter in self._waiters if waiter[0] <= rank)
+            expected_wait = self._expected_wait(ahead)
+            if expected_wait > self.max_wait:
+                self._reject(priority, "expected_wait",
+                             f"{self.work} queue wait of ~{expected_wait:.1f}s exceeds {self.max_wait}s", expected_wait)
+
+            entry = [rank, next(self._sequence), False]
+            bisect.insort(self._waiters, entry)
+            ADMISSION_QUEUE_DEPTH.set(len(self._waiters), work=self.work)
+            deadline = start + self.max_wait
+            try:
+                while not entry[2]:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._waiters.remove(entry)
+                        self._reject(priority, "timeout", f"Timed out waiting for a {self.work} slot",
+                                     self._expected_wait(len(self._waiters)))
+                    self._cond.wait(remaining)
+            finally:
+                ADMISSION_QUEUE_DEPTH.set(len(self._waiters), work=self.work)
+            return self._admitted(priority, start)
+
+    def _admitted(self, priority: str, start: float) -> AdmissionTicket:
+        self._stats["admitted"] += 1
+        ADMISSION_ACTIVE.set(self._active, work=self.work)
+        ADMISSION_WAIT_SECONDS.observe(time.monotonic() - start, work=self.work, priority=priority)
+        return AdmissionTicket(priority)
+
+    def release(self, ticket: AdmissionTicket):
+        """Free the slot, handing it straight to the highest-priority waiter"""
+        held = time.monotonic() - ticket.admitted_at
+        with self._cond:
+            self._service_time = held if self._service_time is None else 0.8 * self._service_time + 0.2 * held
+            if self._waiters:
+                # The slot passes to the waiter without dropping _active, so nobody can jump the queue
+                self._waiters.pop(0)[2] = True
+                self._cond.notify_all()
+            else:
+                self._active -= 1
+            ADMISSION_ACTIVE.set(self._active, work=self.work)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                "active": self._active,
+                "queued": len(self._waiters),
+                "max_concurrent": self.max_concurrent,
+                "avg_service_seconds": round(self._service_time, 3) if self._service_time is not None else None
+            })
+        return stats
+
+
+def create_admission_controllers() -> Optional[Dict[str, AdmissionController]]:
+    """Separate controllers so ingestion can never take the slots interactive queries need"""
+    if not Config.ADMISSION_ENABLED:
+        return None
+    return {
+        "query": AdmissionController(
+            "query", Config.QUERY_MAX_CONCURRENT, Config.QUERY_MAX_QUEUE,
+            Config.QUERY_BATCH_MAX_QUEUE, Config.QUERY_MAX_WAIT
+        ),
+        "ingest": AdmissionController(
+            "ingest", Config.INGEST_MAX_CONCURRENT, Config.INGEST_MAX_QUEUE,
+            Config.INGEST_MAX_QUEUE, Config.INGEST_MAX_WAIT
+        )
+    }
@@ -1,23 +1,42 @@
 import os
 import time
 import logging
-from flask import Flask, request, jsonify
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, Request, Response, request, jsonify, g
 from flask_cors import CORS
-from werkzeug.utils import secure_filename
 from werkzeug.exceptions import RequestEntityTooLarge
 from pathlib import Path
 
-from rag_pipeline import LegalRAGPipeline
-from ingest import DocumentIngestionService
+from ingest import DocumentIngestionService, SUPPORTED_FORMATS
 from config import Config
-from utils.logger import setup_logger, log_request, log_response, log_error
+from admission import create_admission_controllers, AdmissionRejected, INTERACTIVE, BATCH
+from metrics import REGISTRY, HTTP_REQUEST_SECONDS, INDEX_VECTORS, INDEX_DOCUMENTS, get_uptime
+from utils.logger import (
+    setup_logger, log_request, log_response, log_error, request_id_var, should_sample, resolve_request_id
+)
+from utils.profiler import SamplingProfiler, ProfileStore, is_authorized
+from utils.upload_stream import open_upload_stream, UploadRejected
 from utils.helpers import (
-    generate_unique_filename, sanitize_filename, create_error_response, 
-    create_success_response, validate_json_structure
+    create_error_response, create_success_response, validate_json_structure, document_source_name, format_file_size
 )
 
+class StreamingUploadRequest(Request):
+    """Spools uploaded files straight to disk, hashing them and enforcing limits as the body arrives"""
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if not filename:
+            raise UploadRejected("No file selected", 400)
+        stream = open_upload_stream(
+            Config.UPLOAD_FOLDER, filename, SUPPORTED_FORMATS, Config.MAX_INGEST_FILE_SIZE
+        )
+        # Spooled files are removed in teardown whatever happens to the request
+        self.__dict__.setdefault('upload_streams', []).append(stream)
+        return stream
+
 # Initialize Flask app
 app = Flask(__name__)
+app.request_class = StreamingUploadRequest
 CORS(app)  # Enable CORS for frontend
 
 # Configure Flask
@@ -31,36 +50,210 @@ os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 # Setup logger
 logger = setup_logger('legal_ai_api', Config.LOG_FILE, Config.LOG_LEVEL)
 
-# Initialize services
-try:
-    rag_pipeline = LegalRAGPipeline()
-    ingestion_service = DocumentIngestionService(rag_pipeline)
-    logger.info("Services initialized successfully")
-except Exception as e:
-    logger.error(f"Failed to initialize services: {str(e)}")
-    rag_pipeline = None
-    ingestion_service = None
+# Admission control: queries and ingestion queue separately, so uploads never take query slots
+admission = create_admission_controllers()
+# Priority is the server's call: a whole-document summary never waits ahead of a chat question
+ADMISSION_WORK = {
+    'ask_question': ('query', INTERACTIVE),
+    'summarize_document': ('query', BATCH),
+    'upload_document': ('ingest', INTERACTIVE),
+    'delete_document': ('ingest', INTERACTIVE)
+}
+
+# Request profiling is opt-in; when disabled the request hooks only check this flag
+PROFILED_ENDPOINTS = {'ask_question', 'upload_document', 'summarize_document'}
+profile_store = ProfileStore(Config.PROFILING_PATH, Config.PROFILING_MAX_FILES) if Config.PROFILING_ENABLED else None
+
+# One background summary at a time, so precomputing never crowds out interactive LLM calls
+summary_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='summary') if Config.SUMMARY_PRECOMPUTE else None
+
+# Services are built by the first request that needs them, so /health, /config and /metrics
+# answer without importing langchain, FAISS or the model libraries
+rag_pipeline = None
+ingestion_service = None
+collections = None
+services_state = "not_loaded"  # not_loaded | ready | failed
+services_lock = threading.Lock()
+
+def load_services() -> bool:
+    """Initialize the RAG pipeline and the services built on it once; True when they are available"""
+    global rag_pipeline, ingestion_service, collections, services_state
+    if services_state == "not_loaded":
+        with services_lock:
+            if services_state == "not_loaded":
+                try:
+                    from rag_pipeline import LegalRAGPipeline
+                    from collection_manager import CollectionManager
+                    
+                    pipeline = LegalRAGPipeline()
+                    ingestion_service = DocumentIngestionService(pipeline)
+                    # Per-tenant collections share the default pipeline's models; the default collection is the global index
+                    collections = CollectionManager(pipeline)
+                    rag_pipeline = pipeline
+                    services_state = "ready"
+                    logger.info("Services initialized successfully")
+                except Exception as e:
+                    # Not retried per request: a broken configuration would reload the models every time
+                    logger.error(f"Failed to initialize services: {str(e)}")
+                    services_state = "failed"
+    return rag_pipeline is not None
+
+if Config.PRELOAD_PIPELINE:
+    load_services()
 
 @app.before_request
 def log_request_info():
     """Log incoming requests"""
     start_time = time.time()
     request.start_time = start_time
-    log_request(logger, request.method, request.endpoint, request.remote_addr)
+    
+    # Correlate every log record of this request; honour a well-formed id set by the caller or proxy
+    g.request_id = resolve_request_id(request.headers.get('X-Request-ID'))
+    g.request_id_token = request_id_var.set(g.request_id)
+    
+    # Sample high-volume request logs; the decision covers both lines of the request
+    g.log_sampled = should_sample(Config.LOG_REQUEST_SAMPLE_RATE)
+    if g.log_sampled:
+        log_request(logger, request.method, request.endpoint, request.remote_addr)
+    
+    if admission and request.endpoint in ADMISSION_WORK:
+        rejection = admit_request(*ADMISSION_WORK[request.endpoint])
+        if rejection is not None:
+            return rejection
+    
+    if profile_store and request.endpoint in PROFILED_ENDPOINTS:
+        g.profile_forced = is_authorized(request.headers.get('X-Profile'), Config.PROFILING_TOKEN)
+        g.profiler = SamplingProfiler(interval=Config.PROFILING_INTERVAL_MS / 1000)
+        g.profiler.start()
 
 @app.after_request
 def log_response_info(response):
     """Log outgoing responses"""
     if hasattr(request, 'start_time'):
         response_time = time.time() - request.start_time
-        log_response(logger, request.method, request.endpoint, response.status_code, response_time)
+        if 'profiler' in g:
+            save_request_profile(response, response_time)
+        # Failed requests are always logged, whatever the sampling rate
+        if g.get('log_sampled', True) or response.status_code >= 400:
+            log_response(
+                logger, request.method, request.endpoint, response.status_code, response_time,
+                timings=g.get('timings')
+            )
+        # Unmatched paths share one label to keep the series count bounded
+        HTTP_REQUEST_SECONDS.observe(
+            response_time,
+            method=request.method,
+            endpoint=request.endpoint or "unmatched",
+            status=response.status_code
+        )
+    if 'request_id' in g:
+        response.headers['X-Request-ID'] = g.request_id
     return response
 
+def admit_request(work: str, priority: str):
+    """Queue the request for a slot; returns a 429 response when it is shed"""
+    # Scripts and API clients may mark themselves X-Priority: batch; a header can only lower the priority
+    if request.headers.get('X-Priority', '').lower() == BATCH:
+        priority = BATCH
+    try:
+        g.admission_ticket = admission[work].acquire(priority)
+        g.admission_work = work
+        return None
+    except AdmissionRejected as e:
+        response = jsonify(create_error_response(
+            f"Server busy: {str(e)}. Please retry later.",
+            429
+        ))
+        response.status_code = 429
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response
+
+def precompute_summary(pipeline, source: str):
+    """Build a summary in the background, admitted as batch query work like any other LLM-heavy request"""
+    from summarizer import DocumentSummarizer
+    ticket = None
+    if admission:
+        try:
+            ticket = admission["query"].acquire(BATCH)
+        except AdmissionRejected as e:
+            # Built on demand by the first /summarize instead
+            logger.info(f"Skipped precomputing the summary of {source}: {str(e)}")
+            return
+    try:
+        DocumentSummarizer(pipeline).summarize(source)
+    finally:
+        if ticket is not None:
+            admission["query"].release(ticket)
+
+def save_request_profile(response, response_time: float):
+    """Stop the request's profiler and keep the profile if the request was slow or asked for one"""
+    profiler = g.pop('profiler')
+    profiler.stop()
+    
+    slow = response_time * 1000 >= Config.PROFILING_SLOW_MS
+    if not (slow or g.get('profile_forced')):
+        return
+    
+    details = {
+        "reason": "slow" if slow else "requested",
+        "method": request.method,
+        "endpoint": request.endpoint,
+        "status": response.status_code,
+        "duration_ms": round(response_time * 1000, 2),
+        "timings": g.get('timings')
+    }
+    details.update(g.get('profile_details', {}))
+    path = profile_store.save(profiler, g.request_id, details)
+    if path:
+        logger.info(f"Saved request profile: {path}", extra={"profile": path})
+        response.headers['X-Profile-File'] = os.path.basename(path)
+
+def get_collection_name(data=None) -> str:
+    """Collection named in the body, query string or X-Collection header; the global index otherwise"""
+    return (
+        (data or {}).get('collection')
+        or request.args.get('collection')
+        or request.headers.get('X-Collection')
+        or Config.DEFAULT_COLLECTION
+    )
+
+def resolve_collection(name: str):
+    """Return (pipeline, None), or (None, error response) for a bad, unknown or unauthorized collection"""
+    from collection_manager import CollectionNotFound
+    # Checked first and answered alike for unknown names, so tenants cannot probe for each other's collections
+    if not collections.is_authorized(name, request.headers.get('X-Collection-Token')):
+        return None, (jsonify(create_error_response(f"Not authorized for collection: {name}", 403)), 403)
+    try:
+        return collections.get(name), None
+    except CollectionNotFound as e:
+        return None, (jsonify(create_error_response(str(e), 404)), 404)
+    except ValueError as e:
+        return None, (jsonify(create_error_response(str(e), 400)), 400)
+
+@app.teardown_request
+def clear_request_context(exc):
+    """Forget the request id once the request is finished"""
+    for stream in request.__dict__.get('upload_streams', []):
+        stream.discard()
+    
+    ticket = g.pop('admission_ticket', None)
+    if ticket is not None:
+        admission[g.admission_work].release(ticket)
+    
+    # A profiler still attached here means after_request never ran; don't leave it sampling
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.stop()
+    
+    token = g.pop('request_id_token', None)
+    if token is not None:
+        request_id_var.reset(token)
+
 @app.errorhandler(RequestEntityTooLarge)
 def handle_file_too_large(e):
     """Handle file size exceeded error"""
     return jsonify(create_error_response(
-        f"File too large. Maximum size is {Config.MAX_CONTENT_LENGTH / (1024*1024)}MB",
+        f"File too large. Maximum size is {format_file_size(Config.MAX_INGEST_FILE_SIZE)}",
         413
     )), 413
 
@@ -81,12 +274,13 @@ def health_check():
             "status": "healthy",
             "services": {
                 "rag_pipeline": rag_pipeline is not None,
-                "ingestion_service": ingestion_service is not None
+                "ingestion_service": ingestion_service is not None,
+                "state": services_state
             },
             "config": {
                 "embedding_model": Config.EMBEDDING_MODEL,
                 "llm_model": Config.LLM_MODEL,
-                "max_file_size": f"{Config.MAX_CONTENT_LENGTH / (1024*1024)}MB"
+                "max_file_size": format_file_size(Config.MAX_INGEST_FILE_SIZE)
             }
         }
         
@@ -107,55 +301,81 @@ def health_check():
 def upload_document():
     """Upload and ingest legal documents"""
     try:
-        if not ingestion_service:
+        if not load_services():
             return jsonify(create_error_response(
                 "Service not available",
                 503
             )), 503
         
-        # Check if file is in request
-        if 'file' not in request.files:
+        if Config.INDEX_READ_ONLY:
             return jsonify(create_error_response(
-                "No file provided",
-                400
-            )), 400
+                "This instance serves queries only; send uploads to the ingestion writer",
+                503
+            )), 503
         
-        file = request.files['file']
-        if file.filename == '':
+        # Parsing the body spools the file to disk, hashing it and rejecting bad uploads early
+        try:
+            files = request.files
+        except UploadRejected as e:
             return jsonify(create_error_response(
-                "No file selected",
+                str(e),
+                e.status_code
+            )), e.status_code
+        
+        # Check if file is in request
+        if 'file' not in files:
+            return jsonify(create_error_response(
+                "No file provided",
                 400
             )), 400
         
-        # Validate and save file
-        original_filename = secure_filename(file.filename)
-        sanitized_filename = sanitize_filename(original_filename)
-        unique_filename = generate_unique_filename(sanitized_filename)
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
+        file = files['file']
+        upload = file.stream
+        upload.finish()
+        # Re-uploading a name replaces that document, so the key must stay distinct for non-ASCII names
+        source = document_source_name(file.filename, upload.sha256)
         
-        # Save file
-        file.save(file_path)
+        # Collections are created with POST /collections, never by an upload
+        collection_name = get_collection_name(request.form)
+        pipeline, error = resolve_collection(collection_name)
+        if error:
+            return error
+        g.profile_details = {"filename": source, "collection": collection_name}
         
-        # Validate file before ingestion
-        validation = ingestion_service.validate_file(file_path)
-        if not validation["valid"]:
-            # Clean up invalid file
-            os.remove(file_path)
-            return jsonify(create_error_response(
-                validation["error"],
-                400
-            )), 400
+        # Identical content is already indexed in this collection: the transfer is all this upload costs
+        existing_source = pipeline.registry.find_by_hash(upload.sha256)
+        if existing_source:
+            return jsonify(create_success_response(
+                {
+                    "filename": file.filename,
+                    "source": existing_source,
+                    "collection": collection_name,
+                    "file_size": upload.size,
+                    "replaced": False,
+                    "duplicate": True,
+                    "existing_source": existing_source,
+                    "ingestion_time": time.time()
+                },
+                f"Document already indexed as: {existing_source}"
+            ))
         
-        # Ingest document
-        result = ingestion_service.ingest_file(file_path)
+        # Ingest document; re-uploading the same filename replaces the earlier version
+        result = DocumentIngestionService(pipeline).ingest_file(
+            upload.path, source_name=source, content_hash=upload.sha256
+        )
+        collections.update_size(collection_name)
         
         if result["success"]:
-            # Clean up uploaded file after successful ingestion
-            os.remove(file_path)
+            if summary_executor:
+                summary_executor.submit(precompute_summary, pipeline, result["source"])
             
             response_data = {
-                "filename": original_filename,
-                "file_size": result.get("file_size", 0),
+                "filename": file.filename,
+                "source": result["source"],
+                "collection": collection_name,
+                "file_size": upload.size,
+                "replaced": result.get("replaced", False),
+                "duplicate": False,
                 "ingestion_time": time.time()
             }
             
@@ -164,13 +384,13 @@ def upload_document():
                 result["message"]
             ))
         else:
-            # Clean up file on failed ingestion
-            os.remove(file_path)
             return jsonify(create_error_response(
                 result["error"],
                 500
             )), 500
             
+    except RequestEntityTooLarge:
+        raise
     except Exception as e:
         log_error(logger, e, "Document upload failed")
         return jsonify(create_error_response(
@@ -178,11 +398,81 @@ def upload_document():
             500
         )), 500
 
+@app.route('/documents', methods=['GET'])
+def list_documents():
+    """List indexed documents"""
+    try:
+        if not load_services():
+            return jsonify(create_error_response(
+                "RAG service not available",
+                503
+            )), 503
+        
+        collection_name = get_collection_name()
+        pipeline, error = resolve_collection(collection_name)
+        if error:
+            return error
+        
+        documents = pipeline.list_documents()
+        return jsonify(create_success_response(
+            {"collection": collection_name, "documents": documents, "total": len(documents)},
+            "Documents retrieved successfully"
+        ))
+        
+    except Exception as e:
+        log_error(logger, e, "Failed to list documents")
+        return jsonify(create_error_response(
+            "Failed to list documents",
+            500
+        )), 500
+
+@app.route('/documents/<path:source>', methods=['DELETE'])
+def delete_document(source):
+    """Remove a document and all of its chunks from the index"""
+    try:
+        if not load_services():
+            return jsonify(create_error_response(
+                "RAG service not available",
+                503
+            )), 503
+        
+        if Config.INDEX_READ_ONLY:
+            return jsonify(create_error_response(
+                "This instance serves queries only; send deletions to the ingestion writer",
+                503
+            )), 503
+        
+        collection_name = get_collection_name()
+        pipeline, error = resolve_collection(collection_name)
+        if error:
+            return error
+        
+        result = pipeline.delete_document(source)
+        collections.update_size(collection_name)
+        if not result["success"]:
+            status_code = 404 if result["error"].startswith("Document not found") else 500
+            return jsonify(create_error_response(
+                result["error"],
+                status_code
+            )), status_code
+        
+        return jsonify(create_success_response(
+            {"collection": collection_name, "source": source, "deleted_chunks": result["deleted_chunks"]},
+            f"Deleted document: {source}"
+        ))
+        
+    except Exception as e:
+        log_error(logger, e, "Document deletion failed")
+        return jsonify(create_error_response(
+            "Failed to delete document",
+            500
+        )), 500
+
 @app.route('/ask', methods=['POST'])
 def ask_question():
     """Ask legal questions to the AI"""
     try:
-        if not rag_pipeline:
+        if not load_services():
             return jsonify(create_error_response(
                 "RAG service not available",
                 503
@@ -215,20 +505,42 @@ def ask_question():
         k = data.get('k', Config.RETRIEVAL_K)
         if isinstance(k, str) and k.isdigit():
             k = int(k)
+        if not isinstance(k, int) or isinstance(k, bool) or not 1 <= k <= 50:
+            return jsonify(create_error_response(
+                "k must be an integer between 1 and 50",
+                400
+            )), 400
+        
+        collection_name = get_collection_name(data)
+        pipeline, error = resolve_collection(collection_name)
+        if error:
+            return error
         
         # Query the RAG system
-        result = rag_pipeline.query(question)
+        g.profile_details = {"question": question, "k": k, "collection": collection_name}
+        result = pipeline.query(question, k=k)
+        g.timings = result.get("timings")
         
         # Format response
         response_data = {
             "question": question,
+            "collection": collection_name,
             "answer": result["answer"],
             "sources": result.get("sources", []),
+            "context_tokens": result.get("context_tokens", 0),
             "timestamp": time.time()
         }
         
         if "error" in result:
             response_data["error"] = result["error"]
+        if result.get("degraded"):
+            response_data["degraded"] = True
+        if "rerank_ms" in result:
+            response_data["rerank_ms"] = result["rerank_ms"]
+        if result.get("coalesced"):
+            response_data["coalesced"] = True
+        if "route" in result:
+            response_data["route"] = result["route"]
         
         return jsonify(create_success_response(
             response_data,
@@ -242,23 +554,105 @@ def ask_question():
             500
         )), 500
 
+@app.route('/summarize', methods=['POST'])
+def summarize_document():
+    """Summarize a whole indexed document with map-reduce over all of its chunks"""
+    try:
+        if not load_services():
+            return jsonify(create_error_response(
+                "RAG service not available",
+                503
+            )), 503
+        
+        data = request.get_json(silent=True)
+        if not data:
+            return jsonify(create_error_response(
+                "No JSON data provided",
+                400
+            )), 400
+        
+        validation = validate_json_structure(data, ['source'])
+        if not validation["valid"]:
+            return jsonify(create_error_response(
+                f"Missing required fields: {validation['missing_fields']}",
+                400
+            )), 400
+        
+        collection_name = get_collection_name(data)
+        pipeline, error = resolve_collection(collection_name)
+        if error:
+            return error
+        
+        source = data['source']
+        if not isinstance(source, str):
+            return jsonify(create_error_response(
+                "source must be a string",
+                400
+            )), 400
+        
+        g.profile_details = {"source": source, "collection": collection_name}
+        from summarizer import DocumentSummarizer
+        result = DocumentSummarizer(pipeline).summarize(source, refresh=bool(data.get('refresh')))
+        
+        if not result["success"]:
+            if result.get("unavailable"):
+                status_code = 503
+            elif result["error"].startswith("Document not found"):
+                status_code = 404
+            else:
+                status_code = 500
+            return jsonify(create_error_response(
+                result["error"],
+                status_code
+            )), status_code
+        
+        response_data = {
+            "collection": collection_name,
+            "source": source,
+            "summary": result["summary"],
+            "sections": result["sections"],
+            "chunks": result["chunks"],
+            "llm_calls": result["llm_calls"],
+            "cached": result["cached"],
+            "coalesced": result["coalesced"],
+            "generated_at": result["generated_at"]
+        }
+        
+        return jsonify(create_success_response(
+            response_data,
+            "Summary generated successfully" if not result["cached"] else "Summary retrieved successfully"
+        ))
+        
+    except Exception as e:
+        log_error(logger, e, "Summarization failed")
+        return jsonify(create_error_response(
+            "Failed to summarize document",
+            500
+        )), 500
+
 @app.route('/sources', methods=['GET'])
 def get_sources():
     """Get information about document sources"""
     try:
-        if not rag_pipeline:
+        if not load_services():
             return jsonify(create_error_response(
                 "RAG service not available",
                 503
             )), 503
         
+        collection_name = get_collection_name()
+        pipeline, error = resolve_collection(collection_name)
+        if error:
+            return error
+        
         # Get vector store information
-        info = rag_pipeline.get_vector_store_info()
+        info = pipeline.get_vector_store_info()
         
         # Get supported formats
-        supported_formats = ingestion_service.get_supported_formats() if ingestion_service else []
+        supported_formats = ingestion_service.get_supported_formats()
         
         response_data = {
+            "collection": collection_name,
             "vector_store": info,
             "supported_formats": supported_formats,
             "config": {
@@ -280,21 +674,86 @@ def get_sources():
             500
         )), 500
 
+@app.route('/collections', methods=['POST'])
+def create_collection():
+    """Create a collection, or re-issue its token; returns the token the collection's requests must send"""
+    try:
+        if not is_authorized(request.headers.get('X-Admin-Token'), Config.COLLECTIONS_ADMIN_TOKEN):
+            return jsonify(create_error_response(
+                "Admin token required",
+                403
+            )), 403
+        if not load_services():
+            return jsonify(create_error_response(
+                "RAG service not available",
+                503
+            )), 503
+        
+        data = request.get_json(silent=True) or {}
+        name = data.get('name')
+        try:
+            existed = collections.exists(name) if isinstance(name, str) else False
+            token = collections.create(name)
+        except ValueError as e:
+            return jsonify(create_error_response(str(e), 400)), 400
+        
+        return jsonify(create_success_response(
+            {"collection": name, "token": token, "created": not existed},
+            "Collection token issued" if existed else "Collection created successfully"
+        )), 200 if existed else 201
+        
+    except Exception as e:
+        log_error(logger, e, "Failed to create collection")
+        return jsonify(create_error_response(
+            "Failed to create collection",
+            500
+        )), 500
+
+@app.route('/collections', methods=['GET'])
+def list_collections():
+    """List document collections and which of them are loaded"""
+    try:
+        # Collection names identify tenants
+        if not is_authorized(request.headers.get('X-Admin-Token'), Config.COLLECTIONS_ADMIN_TOKEN):
+            return jsonify(create_error_response(
+                "Admin token required",
+                403
+            )), 403
+        if not load_services():
+            return jsonify(create_error_response(
+                "RAG service not available",
+                503
+            )), 503
+        
+        return jsonify(create_success_response(
+            {"collections": collections.list_collections(), "manager": collections.get_stats()},
+            "Collections retrieved successfully"
+        ))
+        
+    except Exception as e:
+        log_error(logger, e, "Failed to list collections")
+        return jsonify(create_error_response(
+            "Failed to list collections",
+            500
+        )), 500
+
 @app.route('/config', methods=['GET'])
 def get_config():
     """Get public configuration information"""
     try:
         public_config = {
-            "supported_formats": ingestion_service.get_supported_formats() if ingestion_service else [],
-            "max_file_size": f"{Config.MAX_CONTENT_LENGTH / (1024*1024)}MB",
+            "supported_formats": list(SUPPORTED_FORMATS),
+            "max_file_size": format_file_size(Config.MAX_INGEST_FILE_SIZE),
             "models": {
                 "embedding": Config.EMBEDDING_MODEL,
-                "llm": Config.LLM_MODEL
+                "llm": Config.LLM_MODEL,
+                "llm_backend": Config.LLM_BACKEND
             },
             "rag_config": {
                 "chunk_size": Config.CHUNK_SIZE,
                 "chunk_overlap": Config.CHUNK_OVERLAP,
-                "retrieval_k": Config.RETRIEVAL_K
+                "retrieval_k": Config.RETRIEVAL_K,
+                "context_token_budget": Config.CONTEXT_TOKEN_BUDGET
             }
         }
         
@@ -317,12 +776,13 @@ def get_stats():
         stats = {
             "system": {
                 "status": "running",
-                "uptime": time.time(),
+                "uptime": round(get_uptime(), 1),
                 "version": "1.0.0"
             },
             "services": {
                 "rag_pipeline": rag_pipeline is not None,
-                "ingestion_service": ingestion_service is not None
+                "ingestion_service": ingestion_service is not None,
+                "state": services_state
             }
         }
         
@@ -333,6 +793,27 @@ def get_stats():
             # Get conversation history length
             if hasattr(rag_pipeline, 'conversation_history'):
                 stats["conversation_history_length"] = len(rag_pipeline.conversation_history)
+            
+            stats["llm_client"] = rag_pipeline.llm_client.get_stats()
+            
+            # Summed over every loaded collection; the index figures are listed per collection
+            loaded = collections.loaded_pipelines()
+            coalescing = {}
+            for pipeline in loaded.values():
+                for key, value in pipeline.get_coalescing_stats().items():
+                    coalescing[key] = coalescing.get(key, 0) + value
+            stats["query_coalescing"] = coalescing
+            stats["collections"] = collections.get_stats()
+            stats["collections"]["indexes"] = {
+                name: {
+                    "vectors": pipeline.vector_store.index.ntotal if pipeline.vector_store is not None else 0,
+                    "documents": len(pipeline.registry.sources)
+                }
+                for name, pipeline in loaded.items()
+            }
+        
+        if admission:
+            stats["admission"] = {work: controller.get_stats() for work, controller in admission.items()}
         
         return jsonify(create_success_response(
             stats,
@@ -346,12 +827,35 @@ def get_stats():
             500
         )), 500
 
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Export counters and latency histograms in the Prometheus text format"""
+    try:
+        if collections is not None:
+            # Re-set from scratch, so evicted collections drop out of the series
+            loaded = collections.loaded_pipelines()
+            INDEX_VECTORS.clear()
+            INDEX_DOCUMENTS.clear()
+            for name, pipeline in loaded.items():
+                if pipeline.vector_store is not None:
+                    INDEX_VECTORS.set(pipeline.vector_store.index.ntotal, collection=name)
+                INDEX_DOCUMENTS.set(len(pipeline.registry.sources), collection=name)
+        
+        return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+        
+    except Exception as e:
+        log_error(logger, e, "Failed to render metrics")
+        return jsonify(create_error_response(
+            "Failed to retrieve metrics",
+            500
+        )), 500
+
 if __name__ == '__main__':
     try:
         logger.info("Starting Legal AI Advisor API Server")
         logger.info(f"Debug mode: {app.debug}")
         logger.info(f"Upload folder: {app.config['UPLOAD_FOLDER']}")
-        logger.info(f"Max file size: {Config.MAX_CONTENT_LENGTH / (1024*1024)}MB")
+        logger.info(f"Max file size: {format_file_size(Config.MAX_INGEST_FILE_SIZE)}")
         
         app.run(
             host='0.0.0.0',
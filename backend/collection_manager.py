@@ -0,0 +1,216 @@
+import os
+import re
+import json
+import hmac
+import hashlib
+import logging
+import secrets
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List
+
+from config import Config
+from rag_pipeline import LegalRAGPipeline
+from single_flight import SingleFlight
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# Names become directory names, so no separators, dot-dot or leading dots
+COLLECTION_NAME_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_.-]{0,63}$')
+
+# Hash of the collection's access token, next to its index files
+ACCESS_FILE = "access.json"
+
+COLLECTIONS_LOADED = REGISTRY.gauge("legal_ai_collections_loaded", "Collection indexes held in memory")
+COLLECTION_LOADS_TOTAL = REGISTRY.counter("legal_ai_collection_loads_total", "Collection indexes loaded from disk")
+COLLECTION_EVICTIONS_TOTAL = REGISTRY.counter(
+    "legal_ai_collection_evictions_total", "Collection indexes dropped from memory", ("reason",)
+)
+
+
+class CollectionNotFound(Exception):
+    """Raised when a collection that was never created is used"""
+
+
+def is_valid_collection_name(name: str) -> bool:
+    return isinstance(name, str) and bool(COLLECTION_NAME_PATTERN.match(name)) and '..' not in name
+
+
+def _token_hash(token: str) -> str:
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+class CollectionManager:
+    """Loads per-collection indexes on demand and evicts the least recently used ones past the memory budget"""
+
+    def __init__(self, default_pipeline: LegalRAGPipeline, root: str = None,
+                 max_loaded: int = None, max_memory_mb: float = None):
+        # The default collection is the original global index; it stays loaded and supplies the shared models
+        self.default = default_pipeline
+        self.root = root or Config.COLLECTIONS_PATH
+        self.max_loaded = max(max_loaded or Config.COLLECTIONS_MAX_LOADED, 1)
+        self.max_bytes = (max_memory_mb or Config.COLLECTIONS_MAX_MEMORY_MB) * 1024 * 1024
+
+        self._lock = threading.Lock()
+        self._loaded: "OrderedDict[str, LegalRAGPipeline]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        # Concurrent first requests for a cold collection share one load
+        self._single_flight = SingleFlight()
+        self._stats = {"hits": 0, "loads": 0, "evictions": 0}
+
+    def index_path(self, name: str) -> str:
+        if name == Config.DEFAULT_COLLECTION:
+            return self.default.index_path
+        return os.path.join(self.root, name)
+
+    def exists(self, name: str) -> bool:
+        return name == Config.DEFAULT_COLLECTION or os.path.isdir(self.index_path(name))
+
+    def create(self, name: str) -> str:
+        """Create the collection if needed and issue a new access token; an earlier token stops working"""
+        if name == Config.DEFAULT_COLLECTION or not is_valid_collection_name(name):
+            raise ValueError(f"Invalid collection name: {name}")
+        path = self.index_path(name)
+        os.makedirs(path, exist_ok=True)
+        token = secrets.token_urlsafe(32)
+        # Only the hash is stored, so a copy of the index directory grants no access
+        fd, temp_path = tempfile.mkstemp(dir=path, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({"token_sha256": _token_hash(token)}, f)
+        os.replace(temp_path, os.path.join(path, ACCESS_FILE))
+        logger.info(f"Issued an access token for collection '{name}'")
+        return token
+
+    def is_authorized(self, name: str, token: str) -> bool:
+        """The default collection is open; every other one needs the token issued when it was created"""
+        if name == Config.DEFAULT_COLLECTION:
+            return True
+        if not token or not is_valid_collection_name(name):
+            return False
+        try:
+            with open(os.path.join(self.index_path(name), ACCESS_FILE), 'r', encoding='utf-8') as f:
+                expected = json.load(f).get("token_sha256", "")
+        except (OSError, ValueError):
+            return False
+        return bool(expected) and hmac.compare_digest(_token_hash(token), expected)
+
+    def get(self, name: str) -> LegalRAGPipeline:
+        """Return the collection's pipeline, loading it if needed"""
+        if name == Config.DEFAULT_COLLECTION:
+            return self.default
+        if not is_valid_collection_name(name):
+            raise ValueError(f"Invalid collection name: {name}")
+
+        with self._lock:
+            pipeline = self._loaded.get(name)
+            if pipeline is not None:
+                self._loaded.move_to_end(name)
+                self._stats["hits"] += 1
+                return pipeline
+
+        if not self.exists(name):
+            raise CollectionNotFound(f"Collection not found: {name}")
+        pipeline, _ = self._single_flight.do(name, lambda: self._load(name))
+        return pipeline
+
+    def _load(self, name: str) -> LegalRAGPipeline:
+        with self._lock:
+            pipeline = self._loaded.get(name)
+            if pipeline is not None:
+                return pipeline
+
+        path = self.index_path(name)
+        # Built outside the lock so hits on warm collections never wait for a cold load
+        pipeline = LegalRAGPipeline(
+            embeddings=self.default.base_embeddings,
+            llm_backend=self.default.llm_backend,
+            index_path=path,
+            llm_client=self.default.llm_client,
+            reranker=self.default.reranker,
+            text_cache=self.default.text_cache
+        )
+        COLLECTION_LOADS_TOTAL.inc()
+
+        with self._lock:
+            self._loaded[name] = pipeline
+            self._sizes[name] = self._estimate_bytes(pipeline)
+            self._stats["loads"] += 1
+            self._evict()
+        logger.info(f"Loaded collection '{name}' ({self._sizes.get(name, 0) / (1024*1024):.1f}MB estimated)")
+        return pipeline
+
+    @staticmethod
+    def _estimate_bytes(pipeline: LegalRAGPipeline) -> int:
+        """Vectors plus the pickled docstore size as a stand-in for its in-memory footprint"""
+        if pipeline.vector_store is None:
+            return 0
+        index = pipeline.vector_store.index
+        pkl_file = os.path.join(pipeline.index_path, "index.pkl")
+        docstore = os.path.getsize(pkl_file) if os.path.exists(pkl_file) else 0
+        return index.ntotal * index.d * 4 + docstore
+
+    def _evict(self):
+        """Drop cold collections until under both limits; call with the lock held"""
+        # The most recently used collection always stays, even if it alone exceeds the budget
+        while len(self._loaded) > 1:
+            if len(self._loaded) > self.max_loaded:
+                reason = "count"
+            elif sum(self._sizes.values()) > self.max_bytes:
+                reason = "memory"
+            else:
+                break
+            # Requests already holding the pipeline finish with it; it is freed once they let go
+            name, _ = self._loaded.popitem(last=False)
+            self._sizes.pop(name, None)
+            self._stats["evictions"] += 1
+            COLLECTION_EVICTIONS_TOTAL.inc(reason=reason)
+            logger.info(f"Evicted collection '{name}' ({reason} limit)")
+        COLLECTIONS_LOADED.set(len(self._loaded))
+
+    def update_size(self, name: str):
+        """Re-estimate a collection's footprint after documents were added or removed"""
+        with self._lock:
+            pipeline = self._loaded.get(name)
+            if pipeline is None:
+                return
+            self._sizes[name] = self._estimate_bytes(pipeline)
+            self._evict()
+
+    def loaded_pipelines(self) -> Dict[str, LegalRAGPipeline]:
+        """Every collection currently in memory, the default one included"""
+        with self._lock:
+            loaded = dict(self._loaded)
+        return {Config.DEFAULT_COLLECTION: self.default, **loaded}
+
+    def list_collections(self) -> List[Dict[str, Any]]:
+        """Every collection on disk, with document counts for the ones in memory"""
+        names = [Config.DEFAULT_COLLECTION]
+        if os.path.isdir(self.root):
+            names.extend(sorted(
+                entry for entry in os.listdir(self.root)
+                if is_valid_collection_name(entry) and os.path.isdir(os.path.join(self.root, entry))
+            ))
+        loaded = self.loaded_pipelines()
+
+        collections = []
+        for name in names:
+            pipeline = loaded.get(name)
+            collections.append({
+                "name": name,
+                "loaded": pipeline is not None,
+                "documents": len(pipeline.registry.sources) if pipeline is not None else None
+            })
+        return collections
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                "loaded": len(self._loaded),
+                "max_loaded": self.max_loaded,
+                "estimated_memory_mb": round(sum(self._sizes.values()) / (1024 * 1024), 2),
+                "max_memory_mb": round(self.max_bytes / (1024 * 1024), 2)
+            })
+        return stats
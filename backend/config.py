@@ -12,32 +12,156 @@ class Config:
     
     # Model Configuration
     EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+    EMBEDDING_BACKEND = os.getenv('EMBEDDING_BACKEND', 'torch')  # torch or onnx
+    ONNX_EMBEDDING_PATH = os.path.abspath(os.getenv(
+        'ONNX_EMBEDDING_PATH', os.path.join(os.path.dirname(__file__), "..", "database", "models", "all-MiniLM-L6-v2-onnx")
+    ))
+    ONNX_QUANTIZED = os.getenv('ONNX_QUANTIZED', 'true').lower() == 'true'  # prefer the int8 export when present
+    EMBEDDING_THREADS = int(os.getenv('EMBEDDING_THREADS', str(os.cpu_count() or 1)))
+    EMBEDDING_BATCH_SIZE = int(os.getenv('EMBEDDING_BATCH_SIZE', '32'))
+    EMBEDDING_MAX_LENGTH = int(os.getenv('EMBEDDING_MAX_LENGTH', '256'))  # all-MiniLM-L6-v2 max_seq_length
     LLM_MODEL = "llama-3.3-70b-versatile"  # Groq model
     
+    # Answer generation backend: groq (hosted), llamacpp (local GGUF) or extractive (no model)
+    LLM_BACKEND = os.getenv('LLM_BACKEND', 'groq').lower()
+    LOCAL_LLM_MODEL_PATH = os.getenv('LOCAL_LLM_MODEL_PATH')  # GGUF file for the llamacpp backend
+    LOCAL_LLM_CONTEXT_SIZE = int(os.getenv('LOCAL_LLM_CONTEXT_SIZE', '4096'))
+    LOCAL_LLM_THREADS = int(os.getenv('LOCAL_LLM_THREADS', str(os.cpu_count() or 4)))
+    LOCAL_LLM_MAX_TOKENS = int(os.getenv('LOCAL_LLM_MAX_TOKENS', '512'))
+    EXTRACTIVE_MAX_SENTENCES = int(os.getenv('EXTRACTIVE_MAX_SENTENCES', '5'))
+    
     # RAG Configuration
+    CHUNKER = os.getenv('CHUNKER', 'legal').lower()  # legal (structure aware) or recursive (fixed size)
     CHUNK_SIZE = 1000
     CHUNK_OVERLAP = 200
     RETRIEVAL_K = 5
+    INGEST_BATCH_SIZE = int(os.getenv('INGEST_BATCH_SIZE', '64'))  # chunks embedded per batch while streaming
+    PDF_EXTRACTOR = os.getenv('PDF_EXTRACTOR', 'auto').lower()  # auto | pdfium | pymupdf | pdfplumber
+    PDF_FALLBACK_ON_POOR_TEXT = os.getenv('PDF_FALLBACK_ON_POOR_TEXT', 'true').lower() == 'true'
+    PDF_MIN_PAGE_CHARS = 20  # pages with less text are re-extracted with pdfplumber
+    MAX_INGEST_FILE_SIZE = int(os.getenv('MAX_INGEST_FILE_SIZE', str(50 * 1024 * 1024)))  # raise for bulk ingestion
+    CONTEXT_TOKEN_BUDGET = int(os.getenv('CONTEXT_TOKEN_BUDGET', '1500'))  # max prompt context tokens
+    CONTEXT_DEDUP_THRESHOLD = float(os.getenv('CONTEXT_DEDUP_THRESHOLD', '0.85'))  # shingle overlap ratio
+    QUERY_COALESCING = os.getenv('QUERY_COALESCING', 'true').lower() == 'true'  # identical in-flight questions share one answer
+    
+    # Query routing: answer small talk, provision lookups and off-topic questions without the full pipeline
+    QUERY_ROUTING = os.getenv('QUERY_ROUTING', 'true').lower() == 'true'
+    ROUTER_MIN_SIMILARITY = float(os.getenv('ROUTER_MIN_SIMILARITY', '0.2'))  # best-match cosine below this skips the LLM; 0 disables
+    ROUTER_PROVISION_LOOKUP = os.getenv('ROUTER_PROVISION_LOOKUP', 'true').lower() == 'true'  # "what does Section 302 say" answered verbatim
+    
+    # Document summaries (/summarize): map-reduce over all chunks, stored until the document is re-ingested
+    SUMMARY_MAX_PARALLEL = int(os.getenv('SUMMARY_MAX_PARALLEL', '4'))  # concurrent LLM calls per summary
+    SUMMARY_MAP_TOKENS = int(os.getenv('SUMMARY_MAP_TOKENS', '2500'))  # document text per map call
+    SUMMARY_MAX_SENTENCES = int(os.getenv('SUMMARY_MAX_SENTENCES', '10'))
+    SUMMARY_PRECOMPUTE = os.getenv('SUMMARY_PRECOMPUTE', 'false').lower() == 'true'  # summarize in the background after upload
+    
+    # Optional cross-encoder reranking of over-fetched candidates
+    RERANK_ENABLED = os.getenv('RERANK_ENABLED', 'false').lower() == 'true'
+    RERANK_MODEL = os.getenv('RERANK_MODEL', 'cross-encoder/ms-marco-MiniLM-L-6-v2')
+    RERANK_CANDIDATES = int(os.getenv('RERANK_CANDIDATES', '20'))  # FAISS candidates scored per query
+    RERANK_BUDGET_MS = float(os.getenv('RERANK_BUDGET_MS', '150'))  # skip reranking above this
+    RERANK_MAX_LENGTH = int(os.getenv('RERANK_MAX_LENGTH', '256'))  # tokens per (query, chunk) pair
+    RERANK_CACHE_SIZE = int(os.getenv('RERANK_CACHE_SIZE', '10000'))
+    RERANK_RECALIBRATE_EVERY = 50  # re-measure cost after this many budget skips
+    
+    # LLM Client Configuration
+    LLM_BASE_URL = os.getenv('GROQ_BASE_URL')  # Point at a local fake server for testing
+    LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT', '30'))  # seconds per call
+    LLM_CONNECT_TIMEOUT = float(os.getenv('LLM_CONNECT_TIMEOUT', '5'))
+    LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', '3'))
+    LLM_RETRY_BASE_DELAY = float(os.getenv('LLM_RETRY_BASE_DELAY', '0.5'))
+    LLM_RETRY_MAX_DELAY = float(os.getenv('LLM_RETRY_MAX_DELAY', '8'))
+    LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '8'))
+    LLM_QUEUE_TIMEOUT = float(os.getenv('LLM_QUEUE_TIMEOUT', '10'))  # max wait for a free slot
+    LLM_POOL_CONNECTIONS = int(os.getenv('LLM_POOL_CONNECTIONS', '16'))
+    LLM_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('LLM_CIRCUIT_FAILURE_THRESHOLD', '5'))
+    LLM_CIRCUIT_RESET_TIMEOUT = float(os.getenv('LLM_CIRCUIT_RESET_TIMEOUT', '30'))
+    
+    # Admission control: bounded queues per kind of work; overflow is shed with 429 + Retry-After
+    ADMISSION_ENABLED = os.getenv('ADMISSION_ENABLED', 'true').lower() == 'true'
+    QUERY_MAX_CONCURRENT = int(os.getenv('QUERY_MAX_CONCURRENT', os.getenv('LLM_MAX_CONCURRENCY', '8')))
+    QUERY_MAX_QUEUE = int(os.getenv('QUERY_MAX_QUEUE', '32'))
+    QUERY_BATCH_MAX_QUEUE = int(os.getenv('QUERY_BATCH_MAX_QUEUE', '8'))  # batch/API clients get a smaller share
+    QUERY_MAX_WAIT = float(os.getenv('QUERY_MAX_WAIT', '10'))  # seconds; longer expected waits are rejected up front
+    INGEST_MAX_CONCURRENT = int(os.getenv('INGEST_MAX_CONCURRENT', '1'))
+    INGEST_MAX_QUEUE = int(os.getenv('INGEST_MAX_QUEUE', '4'))
+    INGEST_MAX_WAIT = float(os.getenv('INGEST_MAX_WAIT', '60'))
     
     # FAISS Configuration
     FAISS_INDEX_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "database", "faiss_index"))
+    INDEX_RELOAD_INTERVAL = float(os.getenv('INDEX_RELOAD_INTERVAL', '2'))  # seconds between checks for a newer index; 0 disables
+    INDEX_READ_ONLY = os.getenv('INDEX_READ_ONLY', 'false').lower() == 'true'  # serve queries only; uploads go to the writer
+    INDEX_SNAPSHOT_PATH = os.getenv('INDEX_SNAPSHOT_PATH')  # bundle imported at startup when no index exists (see snapshot.py)
+    INDEX_MMAP = os.getenv('INDEX_MMAP', 'false').lower() == 'true'  # map index.faiss instead of reading it into RAM
+    EMBEDDING_REDUCED_DIM = int(os.getenv('EMBEDDING_REDUCED_DIM', '0'))  # index vectors reduced to this many dimensions; 0 keeps the model's
+    EMBEDDING_REDUCTION = os.getenv('EMBEDDING_REDUCTION', 'pca').lower()  # pca | random
+    EMBEDDING_REDUCTION_MAX_SAMPLES = int(os.getenv('EMBEDDING_REDUCTION_MAX_SAMPLES', '50000'))  # vectors PCA is fitted on
+    EMBEDDING_REDUCTION_MIN_VECTORS = int(os.getenv('EMBEDDING_REDUCTION_MIN_VECTORS', '2000'))  # vectors an uploaded-to index needs before it is reduced
+    
+    # Collections: per-tenant indexes loaded on demand; the global index above is the "default" collection
+    DEFAULT_COLLECTION = "default"
+    COLLECTIONS_PATH = os.path.abspath(os.getenv(
+        'COLLECTIONS_PATH', os.path.join(os.path.dirname(__file__), "..", "database", "collections")
+    ))
+    COLLECTIONS_MAX_LOADED = int(os.getenv('COLLECTIONS_MAX_LOADED', '100'))  # cold collections beyond this are evicted
+    COLLECTIONS_MAX_MEMORY_MB = float(os.getenv('COLLECTIONS_MAX_MEMORY_MB', '2048'))  # estimated, excluding the default
+    COLLECTIONS_ADMIN_TOKEN = os.getenv('COLLECTIONS_ADMIN_TOKEN', '')  # X-Admin-Token that creates and lists collections; empty disables both
+    
+    # Extracted text cache: re-chunking experiments skip PDF/DOCX parsing
+    TEXT_CACHE_ENABLED = os.getenv('TEXT_CACHE_ENABLED', 'true').lower() == 'true'
+    TEXT_CACHE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "database", "text_cache"))
+    
+    # Bulk ingestion (ingest_documents.py): save the index and progress every N files or seconds
+    INGEST_CHECKPOINT_PATH = os.path.abspath(os.getenv(
+        'INGEST_CHECKPOINT_PATH', os.path.join(os.path.dirname(__file__), "..", "database", "ingest_checkpoint")
+    ))
+    INGEST_CHECKPOINT_FILES = int(os.getenv('INGEST_CHECKPOINT_FILES', '50'))
+    INGEST_CHECKPOINT_SECONDS = float(os.getenv('INGEST_CHECKPOINT_SECONDS', '300'))
     
     # Flask Configuration
     SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key-here')
     UPLOAD_FOLDER = 'uploads'
-    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
+    MAX_CONTENT_LENGTH = MAX_INGEST_FILE_SIZE + 1024 * 1024  # request body: the largest upload plus multipart overhead
+    PRELOAD_PIPELINE = os.getenv('PRELOAD_PIPELINE', 'false').lower() == 'true'  # load models at import instead of on first use
     
     # Logging Configuration
-    LOG_LEVEL = 'INFO'
-    LOG_FILE = 'legal_ai_advisor.log'
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_FILE = os.getenv('LOG_FILE', 'legal_ai_advisor.log')
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')  # json or text
+    LOG_ASYNC = os.getenv('LOG_ASYNC', 'true').lower() == 'true'  # write records from a background thread
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))  # records waiting for the writer; newer ones are dropped beyond this
+    LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', str(10 * 1024 * 1024)))  # rotate the log file at this size
+    LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', '5'))
+    LOG_REQUEST_SAMPLE_RATE = float(os.getenv('LOG_REQUEST_SAMPLE_RATE', '1.0'))  # share of successful requests logged
+    
+    # Request profiling (opt-in): sample stacks of /ask and /upload, keep slow or explicitly requested ones
+    PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'false').lower() == 'true'
+    PROFILING_SLOW_MS = float(os.getenv('PROFILING_SLOW_MS', '2000'))  # save profiles of requests slower than this
+    PROFILING_INTERVAL_MS = float(os.getenv('PROFILING_INTERVAL_MS', '5'))
+    PROFILING_TOKEN = os.getenv('PROFILING_TOKEN', '')  # X-Profile header value that forces a profile; empty disables
+    PROFILING_PATH = os.path.abspath(os.getenv(
+        'PROFILING_PATH', os.path.join(os.path.dirname(__file__), "..", "database", "profiles")
+    ))
+    PROFILING_MAX_FILES = int(os.getenv('PROFILING_MAX_FILES', '200'))
     
     @classmethod
     def validate_config(cls):
         """Validate required configuration"""
-        required_vars = [
-            'HUGGINGFACEHUB_API_TOKEN',
-            'GROQ_API_KEY'
-        ]
+        required_vars = []
+        
+        # The ONNX export is read from disk, so only the PyTorch backend downloads from the Hub
+        if cls.EMBEDDING_BACKEND == 'torch':
+            required_vars.append('HUGGINGFACEHUB_API_TOKEN')
+        elif cls.EMBEDDING_BACKEND != 'onnx':
+            raise ValueError(f"Unknown EMBEDDING_BACKEND: {cls.EMBEDDING_BACKEND}")
+        
+        if cls.LLM_BACKEND == 'groq':
+            required_vars.append('GROQ_API_KEY')
+        elif cls.LLM_BACKEND == 'llamacpp':
+            if not cls.LOCAL_LLM_MODEL_PATH or not os.path.exists(cls.LOCAL_LLM_MODEL_PATH):
+                raise ValueError("LOCAL_LLM_MODEL_PATH must point to a GGUF model file for the llamacpp backend")
+        elif cls.LLM_BACKEND != 'extractive':
+            raise ValueError(f"Unknown LLM_BACKEND: {cls.LLM_BACKEND}")
         
         missing_vars = []
         for var in required_vars:
@@ -0,0 +1,200 @@
+import re
+import logging
+from typing import List, Tuple, Dict, Any, Optional
+
+from langchain_core.documents import Document
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+WORD_PATTERN = re.compile(r'\w+')
+
+
+class TokenCounter:
+    """Counts prompt tokens with tiktoken when available, otherwise a characters-per-token estimate"""
+
+    CHARS_PER_TOKEN = 4
+
+    def __init__(self):
+        try:
+            import tiktoken
+            self._encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            self._encoding = None
+
+    def count(self, text: str) -> int:
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return (len(text) + self.CHARS_PER_TOKEN - 1) // self.CHARS_PER_TOKEN
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut text to at most max_tokens tokens"""
+        if self._encoding is not None:
+            tokens = self._encoding.encode(text, disallowed_special=())
+            return self._encoding.decode(tokens[:max_tokens])
+        return text[:max_tokens * self.CHARS_PER_TOKEN]
+
+
+class Passage:
+    """A span of contiguous text from one source built from one or more retrieved chunks"""
+
+    def __init__(self, document: Document, score: float, rank: int):
+        self.text = document.page_content
+        self.metadata = dict(document.metadata)
+        self.score = score
+        self.rank = rank
+        self.start = document.metadata.get('start_index')
+        self.end = self.start + len(self.text) if self.start is not None else None
+        self.chunk_count = 1
+
+    @property
+    def location(self) -> Tuple[Any, Any]:
+        return (
+            self.metadata.get('source_file', self.metadata.get('source')),
+            self.metadata.get('page', 0)
+        )
+
+    def try_merge(self, other: 'Passage') -> bool:
+        """Merge an adjacent or overlapping passage from the same page into this one"""
+        if self.location != other.location:
+            return False
+
+        if self.start is not None and other.start is not None:
+            first, second = (self, other) if self.start <= other.start else (other, self)
+            if second.start > first.end:
+                return False
+            merged = first.text + second.text[first.end - second.start:] if second.end > first.end else first.text
+            self.start, self.end = first.start, max(first.end, second.end)
+        else:
+            merged = _join_overlapping(self.text, other.text) or _join_overlapping(other.text, self.text)
+            if merged is None:
+                return False
+
+        self.text = merged
+        self.score = min(self.score, other.score)
+        self.rank = min(self.rank, other.rank)
+        self.chunk_count += other.chunk_count
+        return True
+
+    def to_document(self) -> Document:
+        metadata = dict(self.metadata)
+        if self.start is not None:
+            metadata['start_index'] = self.start
+        if self.chunk_count > 1:
+            metadata['merged_chunks'] = self.chunk_count
+        return Document(page_content=self.text, metadata=metadata)
+
+
+def _join_overlapping(first: str, second: str, min_overlap: int = 50) -> Optional[str]:
+    """Join two texts when the end of first repeats the start of second (splitter overlap)"""
+    if first.endswith(second) or second in first:
+        return first
+    probe = second[:min_overlap]
+    if len(probe) < min_overlap:
+        return None
+    position = first.find(probe, max(0, len(first) - Config.CHUNK_OVERLAP - min_overlap))
+    while position != -1:
+        if second.startswith(first[position:]):
+            return first[:position] + second
+        position = first.find(probe, position + 1)
+    return None
+
+
+def _shingles(text: str, size: int = 3) -> set:
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < size:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+class ContextBuilder:
+    """Packs retrieved chunks into a token-budgeted, deduplicated prompt context"""
+
+    def __init__(self, token_budget: int = None, dedup_threshold: float = None,
+                 token_counter: TokenCounter = None):
+        self.token_budget = token_budget or Config.CONTEXT_TOKEN_BUDGET
+        self.dedup_threshold = dedup_threshold or Config.CONTEXT_DEDUP_THRESHOLD
+        self.token_counter = token_counter or TokenCounter()
+        self.separator = "\n\n"
+
+    def build(self, scored_documents: List[Tuple[Document, float]]) -> Dict[str, Any]:
+        """Build the prompt context from (document, distance) pairs in relevance order"""
+        passages = [Passage(doc, score, rank) for rank, (doc, score) in enumerate(scored_documents)]
+
+        merged = self._merge_adjacent(passages)
+        unique = self._drop_near_duplicates(merged)
+        packed, context_tokens = self._pack(unique)
+
+        documents = [passage.to_document() for passage in packed]
+        return {
+            "documents": documents,
+            "context": self.separator.join(doc.page_content for doc in documents),
+            "context_tokens": context_tokens,
+            "stats": {
+                "candidates": len(passages),
+                "merged": len(passages) - len(merged),
+                "near_duplicates": len(merged) - len(unique),
+                "over_budget": len(unique) - len(packed),
+                "token_budget": self.token_budget
+            }
+        }
+
+    def _merge_adjacent(self, passages: List[Passage]) -> List[Passage]:
+        merged: List[Passage] = []
+        for passage in passages:
+            for existing in merged:
+                if existing.try_merge(passage):
+                    break
+            else:
+                merged.append(passage)
+
+        # A merge can bridge two previously separate passages; repeat until stable
+        changed = True
+        while changed and len(merged) > 1:
+            changed = False
+            for i in range(len(merged)):
+                for j in range(i + 1, len(merged)):
+                    if merged[i].try_merge(merged[j]):
+                        del merged[j]
+                        changed = True
+                        break
+                if changed:
+                    break
+
+        merged.sort(key=lambda p: p.rank)
+        return merged
+
+    def _drop_near_duplicates(self, passages: List[Passage]) -> List[Passage]:
+        kept, kept_shingles = [], []
+        for passage in passages:
+            shingles = _shingles(passage.text)
+            duplicate = False
+            for other in kept_shingles:
+                # Overlap coefficient, so a chunk contained in a merged passage also counts as duplicate
+                smaller = min(len(shingles), len(other))
+                if smaller and len(shingles & other) / smaller >= self.dedup_threshold:
+                    duplicate = True
+                    break
+            if not duplicate:
+                kept.append(passage)
+                kept_shingles.append(shingles)
+        return kept
+
+    def _pack(self, passages: List[Passage]) -> Tuple[List[Passage], int]:
+        separator_tokens = self.token_counter.count(self.separator)
+        packed, used = [], 0
+
+        for passage in passages:
+            tokens = self.token_counter.count(passage.text)
+            cost = tokens + (separator_tokens if packed else 0)
+            if used + cost <= self.token_budget:
+                packed.append(passage)
+                used += cost
+            elif not packed:
+                # Never send an empty context: keep the head of the most relevant passage
+                passage.text = self.token_counter.truncate(passage.text, self.token_budget)
+                packed.append(passage)
+                used = self.token_counter.count(passage.text)
+
+        return packed, used
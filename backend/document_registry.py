@@ -0,0 +1,107 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+REGISTRY_FILE = "registry.json"
+
+
+def make_chunk_id(source: str, position: int) -> str:
+    """Stable chunk identifier derived from the document source and chunk position"""
+    return hashlib.sha1(f"{source}\x00{position}".encode('utf-8')).hexdigest()
+
+
+class DocumentRegistry:
+    """Persistent source -> chunk id map stored next to the FAISS index"""
+
+    def __init__(self, index_path: str):
+        self.index_path = index_path
+        self.path = os.path.join(index_path, REGISTRY_FILE)
+        self._lock = threading.RLock()
+        self.sources: Dict[str, Dict[str, Any]] = {}
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def load(self):
+        """Load the registry from disk, leaving it empty if none was saved yet"""
+        with self._lock:
+            if not self.exists():
+                self.sources = {}
+                return
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.sources = data.get("sources", {})
+
+    def save(self):
+        """Atomically write the registry"""
+        with self._lock:
+            os.makedirs(self.index_path, exist_ok=True)
+            payload = {
+                "version": 1,
+                "sources": self.sources
+            }
+            fd, temp_path = tempfile.mkstemp(dir=self.index_path, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(payload, f)
+            os.replace(temp_path, self.path)
+
+    def get(self, source: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self.sources.get(source)
+
+    def find_by_hash(self, content_hash: str) -> Optional[str]:
+        """Return the source already indexed with this content hash, if any"""
+        with self._lock:
+            for source, entry in self.sources.items():
+                if entry.get("content_hash") == content_hash:
+                    return source
+        return None
+
+    def register(self, source: str, chunk_ids: List[str], content_hash: Optional[str] = None):
+        with self._lock:
+            self.sources[source] = {
+                "chunk_ids": chunk_ids,
+                "num_chunks": len(chunk_ids),
+                "content_hash": content_hash,
+                "ingested_at": datetime.now().isoformat()
+            }
+
+    def remove(self, source: str) -> List[str]:
+        """Forget a source and return the chunk ids that belonged to it"""
+        with self._lock:
+            entry = self.sources.pop(source, None)
+            if not entry:
+                return []
+            return entry["chunk_ids"]
+
+    def list_sources(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {
+                    "source": source,
+                    "num_chunks": entry["num_chunks"],
+                    "content_hash": entry.get("content_hash"),
+                    "ingested_at": entry.get("ingested_at")
+                }
+                for source, entry in sorted(self.sources.items())
+            ]
+
+    def rebuild_from_docstore(self, docstore: Dict[str, Any]):
+        """Recreate the map from docstore metadata for indexes built before the registry existed"""
+        with self._lock:
+            self.sources = {}
+            for chunk_id, document in docstore.items():
+                source = document.metadata.get('source_file', document.metadata.get('source', 'unknown'))
+                entry = self.sources.setdefault(source, {
+                    "chunk_ids": [], "num_chunks": 0, "content_hash": None, "ingested_at": None
+                })
+                entry["chunk_ids"].append(chunk_id)
+                entry["num_chunks"] += 1
+            logger.info(f"Rebuilt document registry for {len(self.sources)} sources")
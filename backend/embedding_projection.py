@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Dimension-reduced embeddings for smaller, faster indexes.
+
+A projection (PCA learned from the indexed vectors, or a seeded random
+orthonormal projection) maps the embedding model's vectors to
+EMBEDDING_REDUCED_DIM dimensions and re-normalizes them, so cosine ranking and
+the router's similarity threshold keep working. It is saved as projection.npz
+next to index.faiss, and every pipeline that loads the index wraps its
+embeddings with it, so query and document vectors always share one space.
+
+    python embedding_projection.py report --dims 96,128,192   # recall against the full index
+    python embedding_projection.py reduce --dim 192            # project the saved index in place
+
+Reducing needs the full-dimension vectors, which a flat index keeps; an index
+that is already reduced has to be rebuilt from the documents to change it.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import tempfile
+import argparse
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import Config
+from index_sync import IndexSync
+
+logger = logging.getLogger(__name__)
+
+PROJECTION_FILE = "projection.npz"
+METHODS = ("pca", "random")
+
+
+class EmbeddingProjection:
+    """Linear map from the model's embedding space to fewer dimensions, re-normalized for cosine search"""
+
+    def __init__(self, components: np.ndarray, method: str,
+                 explained_variance: Optional[float] = None, fitted_on: int = 0):
+        self.components = np.ascontiguousarray(components, dtype=np.float32)
+        self.method = method
+        self.explained_variance = explained_variance
+        self.fitted_on = fitted_on
+
+    @property
+    def input_dim(self) -> int:
+        return self.components.shape[0]
+
+    @property
+    def output_dim(self) -> int:
+        return self.components.shape[1]
+
+    @classmethod
+    def fit(cls, vectors, dim: int, method: str = "pca", seed: int = 0,
+            max_samples: int = None) -> "EmbeddingProjection":
+        """Learn a projection to dim dimensions; PCA uses at most max_samples of the vectors"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        count, input_dim = vectors.shape
+        if not 0 < dim < input_dim:
+            raise ValueError(f"Reduced dimension must be between 1 and {input_dim - 1}, got {dim}")
+        if method not in METHODS:
+            raise ValueError(f"Unknown reduction method: {method} (expected one of {', '.join(METHODS)})")
+
+        rng = np.random.default_rng(seed)
+        if method == "random":
+            # Orthonormal columns preserve distances better than a raw Gaussian matrix at the same size
+            components, _ = np.linalg.qr(rng.standard_normal((input_dim, dim)))
+            return cls(components, method, fitted_on=0)
+
+        if count <= dim:
+            raise ValueError(f"PCA to {dim} dimensions needs more than {dim} vectors, got {count}")
+        max_samples = max_samples or Config.EMBEDDING_REDUCTION_MAX_SAMPLES
+        if count > max_samples:
+            vectors = vectors[rng.choice(count, max_samples, replace=False)]
+
+        # Uncentered: the axes that keep the most of each vector preserve inner products best, while
+        # centering would drop the shared mean direction and reorder cosine matches after re-normalizing.
+        # Eigenvectors of the d x d second-moment matrix: cheap however many vectors are sampled
+        sample = vectors.astype(np.float64)
+        eigenvalues, eigenvectors = np.linalg.eigh(sample.T @ sample)
+        kept = np.argsort(eigenvalues)[::-1][:dim]
+        explained = float(eigenvalues[kept].sum() / max(eigenvalues.sum(), 1e-12))
+        return cls(eigenvectors[:, kept], method, explained_variance=explained, fitted_on=len(vectors))
+
+    def transform(self, vectors) -> np.ndarray:
+        """Project one vector or a batch, then L2-normalize each result"""
+        reduced = np.asarray(vectors, dtype=np.float32) @ self.components
+        norms = np.linalg.norm(reduced, axis=-1, keepdims=True)
+        return reduced / np.maximum(norms, 1e-12)
+
+    def save(self, path: str):
+        """Write atomically, so a reader never loads a half-written projection"""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(
+                    f, components=self.components, method=np.array(self.method),
+                    explained_variance=np.array(np.nan if self.explained_variance is None else self.explained_variance),
+                    fitted_on=np.array(self.fitted_on)
+                )
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> Optional["EmbeddingProjection"]:
+        if not os.path.exists(path):
+            return None
+        with np.load(path, allow_pickle=False) as data:
+            explained = float(data["explained_variance"])
+            return cls(
+                data["components"], str(data["method"]),
+                explained_variance=None if np.isnan(explained) else explained,
+                fitted_on=int(data["fitted_on"])
+            )
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "method": self.method,
+            "input_dim": self.input_dim,
+            "output_dim": self.output_dim,
+            "explained_variance": round(self.explained_variance, 4) if self.explained_variance is not None else None,
+            "fitted_on": self.fitted_on
+        }
+
+
+class ProjectedEmbeddings(Embeddings):
+    """The model's embeddings passed through an index's projection"""
+
+    def __init__(self, base: Embeddings, projection: EmbeddingProjection):
+        self.base = base
+        self.projection = projection
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        return self.projection.transform(self.base.embed_documents(texts)).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.projection.transform(self.base.embed_query(text)).tolist()
+
+
+def read_index_vectors(index_path: str) -> np.ndarray:
+    """Every stored vector of a saved full-dimension index, in index order"""
+    import faiss
+
+    if os.path.exists(os.path.join(index_path, PROJECTION_FILE)):
+        raise ValueError("The index is already reduced; its full-dimension vectors are no longer stored")
+    index = faiss.read_index(os.path.join(index_path, "index.faiss"))
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def reduce_index(index_path: str, dim: int = None, method: str = None,
+                 sync: Optional[IndexSync] = None) -> Dict[str, Any]:
+    """Fit a projection on the saved index's own vectors and replace the index with the projected one"""
+    import faiss
+
+    dim = dim or Config.EMBEDDING_REDUCED_DIM
+    method = method or Config.EMBEDDING_REDUCTION
+    index_file = os.path.join(index_path, "index.faiss")
+    if not os.path.exists(index_file):
+        return {"success": False, "error": f"No saved index found at {index_path}"}
+
+    # Pass the pipeline's IndexSync when it already holds the writer lock: flock does not nest across files
+    sync = sync or IndexSync(index_path)
+    start = time.perf_counter()
+    try:
+        with sync.writer():
+            vectors = read_index_vectors(index_path)
+            projection = EmbeddingProjection.fit(vectors, dim, method)
+            reduced = faiss.IndexFlatL2(projection.output_dim)
+            # Same order as before, so index.pkl's position -> chunk id map stays valid
+            reduced.add(projection.transform(vectors))
+
+            with sync.saving():
+                fd, temp_index = tempfile.mkstemp(dir=index_path, suffix='.tmp')
+                os.close(fd)
+                try:
+                    faiss.write_index(reduced, temp_index)
+                    projection.save(os.path.join(index_path, PROJECTION_FILE))
+                    os.replace(temp_index, index_file)
+                finally:
+                    if os.path.exists(temp_index):
+                        os.remove(temp_index)
+                version = sync.bump_version()
+    except ValueError as e:
+        logger.error(f"Failed to reduce index at {index_path}: {str(e)}")
+        return {"success": False, "error": str(e)}
+
+    result = {
+        "success": True,
+        "index_path": index_path,
+        "index_version": version,
+        "vectors": int(reduced.ntotal),
+        "projection": projection.describe(),
+        "index_mb_before": round(vectors.nbytes / (1024 * 1024), 2),
+        "index_mb_after": round(reduced.ntotal * reduced.d * 4 / (1024 * 1024), 2),
+        "seconds": round(time.perf_counter() - start, 2)
+    }
+    logger.info(
+        f"Reduced index at {index_path} from {projection.input_dim} to {projection.output_dim} dimensions "
+        f"({method}, {result['vectors']} vectors)"
+    )
+    return result
+
+
+def _search(corpus: np.ndarray, queries: np.ndarray, k: int) -> tuple:
+    """Exact top-k with a flat index, and the mean search time per query in milliseconds"""
+    import faiss
+
+    index = faiss.IndexFlatL2(corpus.shape[1])
+    index.add(np.ascontiguousarray(corpus, dtype=np.float32))
+    start = time.perf_counter()
+    _, ids = index.search(np.ascontiguousarray(queries, dtype=np.float32), k)
+    return ids, (time.perf_counter() - start) * 1000 / max(len(queries), 1)
+
+
+def recall_report(vectors: np.ndarray, dims: List[int], methods: List[str], k: int = 10,
+                  queries: int = 200, query_vectors: np.ndarray = None, seed: int = 0) -> Dict[str, Any]:
+    """Recall@k of reduced indexes against the full-dimension index on held-out queries
+
+    Without query_vectors, a random sample of chunks is held out and used as the queries:
+    they are left out of both the fitted projection and the searched corpus.
+    """
+    rng = np.random.default_rng(seed)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if query_vectors is None:
+        held_out = min(queries, len(vectors) // 5)
+        if held_out == 0:
+            raise ValueError(f"Too few vectors ({len(vectors)}) to hold out queries")
+        order = rng.permutation(len(vectors))
+        query_vectors, corpus = vectors[order[:held_out]], vectors[order[held_out:]]
+        query_source = "held-out chunks"
+    else:
+        query_vectors, corpus = np.asarray(query_vectors, dtype=np.float32), vectors
+        query_source = "queries file"
+    k = min(k, len(corpus))
+
+    truth, full_ms = _search(corpus, query_vectors, k)
+    report = {
+        "vectors": len(corpus),
+        "queries": len(query_vectors),
+        "query_source": query_source,
+        "k": k,
+        "full": {"dim": corpus.shape[1], "index_mb": round(corpus.nbytes / (1024 * 1024), 2),
+                 "search_ms": round(full_ms, 3)},
+        "reduced": []
+    }
+    for method in methods:
+        for dim in dims:
+            try:
+                projection = EmbeddingProjection.fit(corpus, dim, method, seed=seed)
+            except ValueError as e:
+                report["reduced"].append({"method": method, "dim": dim, "error": str(e)})
+                continue
+            reduced_corpus = projection.transform(corpus)
+            found, search_ms = _search(reduced_corpus, projection.transform(query_vectors), k)
+            recall = np.mean([len(set(expected) & set(got)) / k for expected, got in zip(truth, found)])
+            report["reduced"].append({
+                "method": method,
+                "dim": dim,
+                "recall_at_k": round(float(recall), 4),
+                "explained_variance": projection.describe()["explained_variance"],
+                "index_mb": round(reduced_corpus.nbytes / (1024 * 1024), 2),
+                "search_ms": round(search_ms, 3)
+            })
+    return report
+
+
+def _embed_queries(path: str) -> np.ndarray:
+    """Embed a file of real questions, one per line, with the configured model"""
+    from rag_pipeline import create_embeddings
+
+    with open(path, 'r', encoding='utf-8') as f:
+        questions = [line.strip() for line in f if line.strip()]
+    embeddings = create_embeddings()
+    return np.asarray([embeddings.embed_query(question) for question in questions], dtype=np.float32)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Dimension-reduced embeddings for the FAISS index")
+    parser.add_argument("--index-path", default=Config.FAISS_INDEX_PATH)
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    commands = parser.add_subparsers(dest="command", required=True)
+    report_parser = commands.add_parser("report", help="Recall of reduced dimensions against the full index")
+    report_parser.add_argument("--dims", default="64,96,128,192,256", help="Comma-separated target dimensions")
+    report_parser.add_argument("--methods", default="pca,random", help="Comma-separated: pca, random")
+    report_parser.add_argument("--k", type=int, default=Config.RETRIEVAL_K * 2)
+    report_parser.add_argument("--queries", type=int, default=200, help="Chunks held out as queries")
+    report_parser.add_argument("--queries-file", help="Real questions, one per line, instead of held-out chunks")
+    report_parser.add_argument("--seed", type=int, default=0)
+    reduce_parser = commands.add_parser("reduce", help="Project the saved index to fewer dimensions")
+    reduce_parser.add_argument("--dim", type=int, default=Config.EMBEDDING_REDUCED_DIM or 192)
+    reduce_parser.add_argument("--method", choices=METHODS, default=Config.EMBEDDING_REDUCTION)
+    args = parser.parse_args(argv)
+
+    if args.command == "reduce":
+        result = reduce_index(args.index_path, args.dim, args.method)
+        if args.json:
+            print(json.dumps(result, indent=2))
+        elif not result["success"]:
+            print(f"❌ Reduce failed: {result['error']}")
+        else:
+            projection = result["projection"]
+            print(f"✅ Reduced {result['vectors']} vectors from {projection['input_dim']} to "
+                  f"{projection['output_dim']} dimensions ({projection['method']}) in {result['seconds']}s")
+            print(f"📦 {result['index_mb_before']} MB -> {result['index_mb_after']} MB, "
+                  f"index version {result['index_version']}")
+        return 0 if result["success"] else 1
+
+    try:
+        vectors = read_index_vectors(args.index_path)
+        query_vectors = _embed_queries(args.queries_file) if args.queries_file else None
+        report = recall_report(
+            vectors, [int(dim) for dim in args.dims.split(",")], args.methods.split(","),
+            k=args.k, queries=args.queries, query_vectors=query_vectors, seed=args.seed
+        )
+    except (OSError, RuntimeError, ValueError) as e:
+        print(f"❌ Report failed: {str(e)}")
+        return 1
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    full = report["full"]
+    print(f"📐 Recall@{report['k']} vs the full {full['dim']}-dim index: {report['vectors']} vectors, "
+          f"{report['queries']} {report['query_source']}")
+    print(f"{'method':8}{'dim':>6}{'recall':>9}{'variance':>10}{'index MB':>10}{'ms/query':>10}")
+    print(f"{'full':8}{full['dim']:>6}{1.0:>9}{'':>10}{full['index_mb']:>10}{full['search_ms']:>10}")
+    for row in report["reduced"]:
+        if "error" in row:
+            print(f"{row['method']:8}{row['dim']:>6}  ❌ {row['error']}")
+            continue
+        variance = row["explained_variance"] if row["explained_variance"] is not None else "-"
+        print(f"{row['method']:8}{row['dim']:>6}{row['recall_at_k']:>9}{variance:>10}"
+              f"{row['index_mb']:>10}{row['search_ms']:>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    from utils.logger import configure_logging
+    configure_logging()
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""
+Gunicorn configuration for multi-process serving.
+
+    gunicorn -c gunicorn.conf.py app:app
+
+The app (embedding model, FAISS index, reranker) is loaded once in the master
+and shared copy-on-write with the forked workers, so each additional worker
+costs a small fraction of the first. Any worker may ingest: writers take an
+exclusive file lock on the index directory, and every save bumps the index
+VERSION file that the other workers poll (INDEX_RELOAD_INTERVAL) to reload.
+
+Set INDEX_READ_ONLY=true on query-only deployments that share the index
+directory with a separate ingestion writer.
+"""
+
+import gc
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('WEB_CONCURRENCY', '4'))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+graceful_timeout = 30
+
+# Load the models and index before forking so workers share their memory pages; the app
+# itself defers them to the first request unless PRELOAD_PIPELINE is set
+preload_app = True
+os.environ.setdefault('PRELOAD_PIPELINE', 'true')
+
+# Tokenizer and torch thread pools do not survive fork; keep the master single-threaded
+os.environ.setdefault('TOKENIZERS_PARALLELISM', 'false')
+try:
+    import torch
+    torch.set_num_threads(1)
+except ImportError:
+    torch = None
+
+TORCH_THREADS_PER_WORKER = int(os.getenv('TORCH_THREADS_PER_WORKER', '1'))
+
+
+def pre_fork(server, worker):
+    # Move everything loaded so far into the permanent generation: the cyclic GC
+    # would otherwise touch (and so copy) the shared pages in every worker
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    if torch is not None:
+        torch.set_num_threads(TORCH_THREADS_PER_WORKER)
+    server.log.info(f"Worker {worker.pid} started with {TORCH_THREADS_PER_WORKER} torch thread(s)")
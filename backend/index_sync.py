@@ -0,0 +1,108 @@
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: locks are process-local only, so run a single server process there
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+VERSION_FILE = "VERSION"
+WRITER_LOCK_FILE = ".writer.lock"
+SAVE_LOCK_FILE = ".save.lock"
+
+
+@contextmanager
+def file_lock(path: str, exclusive: bool = True) -> Iterator[None]:
+    """Advisory flock shared by every process (and thread) that opens the same lock file"""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class IndexSync:
+    """Coordinates processes serving one on-disk index: one writer at a time, versioned saves, lazy reloads"""
+
+    def __init__(self, index_path: str, check_interval: float = 2.0):
+        self.index_path = index_path
+        self.check_interval = check_interval
+        self.version_path = os.path.join(index_path, VERSION_FILE)
+        self._last_check = time.monotonic()
+        self._check_lock = threading.Lock()
+        self._writer_lock = threading.RLock()
+        self._writer_depth = 0
+
+    @contextmanager
+    def writer(self) -> Iterator[None]:
+        """Held for a whole ingestion or deletion so writers in other processes queue up; reentrant"""
+        with self._writer_lock:
+            # flock is per open file, so only the outermost holder in this process takes it
+            if self._writer_depth:
+                self._writer_depth += 1
+                try:
+                    yield
+                finally:
+                    self._writer_depth -= 1
+                return
+            with file_lock(os.path.join(self.index_path, WRITER_LOCK_FILE), exclusive=True):
+                self._writer_depth = 1
+                try:
+                    yield
+                finally:
+                    self._writer_depth = 0
+
+    def saving(self):
+        """Held while index files are rewritten; short, so readers are never blocked for long"""
+        return file_lock(os.path.join(self.index_path, SAVE_LOCK_FILE), exclusive=True)
+
+    def loading(self):
+        """Shared lock so readers never load a half-written index"""
+        return file_lock(os.path.join(self.index_path, SAVE_LOCK_FILE), exclusive=False)
+
+    def read_version(self) -> int:
+        try:
+            with open(self.version_path, 'r', encoding='utf-8') as f:
+                return int(json.load(f).get("version", 0))
+        except (OSError, ValueError):
+            return 0
+
+    def bump_version(self) -> int:
+        """Publish a new index version; call while holding the save lock"""
+        version = self.read_version() + 1
+        os.makedirs(self.index_path, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.index_path, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({"version": version, "updated_at": datetime.now().isoformat(), "pid": os.getpid()}, f)
+        os.replace(temp_path, self.version_path)
+        return version
+
+    def check_due(self) -> bool:
+        """Rate-limit version checks on the query path to one file read per interval"""
+        if self.check_interval <= 0:
+            return False
+        now = time.monotonic()
+        with self._check_lock:
+            if now - self._last_check < self.check_interval:
+                return False
+            self._last_check = now
+            return True
+
+    def newer_version(self, loaded_version: Optional[int]) -> Optional[int]:
+        """Return the published version if it differs from the loaded one"""
+        version = self.read_version()
+        return version if version != loaded_version else None
@@ -1,21 +1,26 @@
 import os
 import logging
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, TYPE_CHECKING
 
-from rag_pipeline import LegalRAGPipeline
+from config import Config
+
+if TYPE_CHECKING:
+    from rag_pipeline import LegalRAGPipeline
 
 logger = logging.getLogger(__name__)
 
+SUPPORTED_FORMATS = ['.pdf', '.docx', '.txt']
+
 class DocumentIngestionService:
     """Service for ingesting legal documents into the RAG system"""
     
-    def __init__(self, pipeline: LegalRAGPipeline):
+    def __init__(self, pipeline: "LegalRAGPipeline"):
         self.pipeline = pipeline
-        self.supported_formats = ['.pdf', '.docx', '.txt']
+        self.supported_formats = list(SUPPORTED_FORMATS)
     
-    def ingest_file(self, file_path: str) -> Dict[str, Any]:
-        """Ingest a single file into the RAG system"""
+    def ingest_file(self, file_path: str, source_name: str = None, content_hash: str = None) -> Dict[str, Any]:
+        """Ingest a single file into the RAG system, replacing an earlier version of the same source"""
         try:
             # Validate file exists
             if not os.path.exists(file_path):
@@ -33,13 +38,18 @@ class DocumentIngestionService:
                 }
             
             # Add documents to pipeline
-            success = self.pipeline.add_documents(file_path)
+            source = source_name or file_path
+            replaced = self.pipeline.registry.get(source) is not None
+            success = self.pipeline.add_documents(file_path, source_name=source, content_hash=content_hash)
             
             if success:
+                action = "replaced" if replaced else "ingested"
                 return {
                     "success": True,
-                    "message": f"Successfully ingested: {Path(file_path).name}",
+                    "message": f"Successfully {action}: {source_name or Path(file_path).name}",
                     "file_path": file_path,
+                    "source": source,
+                    "replaced": replaced,
                     "file_size": os.path.getsize(file_path)
                 }
             else:
@@ -123,7 +133,7 @@ class DocumentIngestionService:
                 }
             
             file_size = os.path.getsize(file_path)
-            max_size = 50 * 1024 * 1024  # 50MB limit
+            max_size = Config.MAX_INGEST_FILE_SIZE
             
             if file_size > max_size:
                 return {
@@ -0,0 +1,169 @@
+import os
+import json
+import pickle
+import logging
+import tempfile
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+STATE_FILE = "state.json"
+SPOOL_FILE = "embeddings.spool"
+
+
+def fsync_directory(directory: str):
+    """Persist renames and removals in a directory (a no-op where directories cannot be opened)"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class EmbeddingSpool:
+    """Append-only log of embedded batches that are not yet covered by a saved index"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def append(self, file_path: str, content_hash: str, ids: List[str], texts: List[str],
+               vectors: List[List[float]]):
+        """Write one batch and fsync it, so an interruption loses at most the batch being embedded"""
+        if self._file is None:
+            self._file = open(self.path, 'ab')
+        record = {
+            "path": file_path,
+            "content_hash": content_hash,
+            "ids": ids,
+            "texts": texts,
+            "vectors": np.asarray(vectors, dtype=np.float32)
+        }
+        pickle.dump(record, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Return {file path: {"content_hash", "embedded": {chunk id: (text, vector)}}}, ignoring a torn tail"""
+        files: Dict[str, Dict[str, Any]] = {}
+        if not os.path.exists(self.path):
+            return files
+        with open(self.path, 'rb') as f:
+            while True:
+                try:
+                    record = pickle.load(f)
+                except EOFError:
+                    break
+                except Exception as e:
+                    # The process died mid-write; everything before this record is intact
+                    logger.warning(f"Ignoring truncated embedding spool record: {str(e)}")
+                    break
+                entry = files.get(record["path"])
+                if entry is None or entry["content_hash"] != record["content_hash"]:
+                    entry = files[record["path"]] = {"content_hash": record["content_hash"], "embedded": {}}
+                for chunk_id, text, vector in zip(record["ids"], record["texts"], record["vectors"]):
+                    entry["embedded"][chunk_id] = (text, vector)
+        return files
+
+    def reset(self):
+        """Drop spooled batches once a saved index covers them"""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class IngestionCheckpoint:
+    """Progress of one bulk ingestion run: completed files, failures and spooled embeddings"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.state_path = os.path.join(directory, STATE_FILE)
+        os.makedirs(directory, exist_ok=True)
+        self.spool = EmbeddingSpool(os.path.join(directory, SPOOL_FILE))
+        self.state: Dict[str, Any] = self._empty_state(None)
+
+    @staticmethod
+    def _empty_state(folder: Optional[str]) -> Dict[str, Any]:
+        return {
+            "version": 1,
+            "folder": folder,
+            "started_at": datetime.now().isoformat(),
+            "completed": {},
+            "failed": {},
+            "checkpoints": 0
+        }
+
+    def load(self, folder: str) -> bool:
+        """Load a checkpoint left by an earlier run over the same folder; returns True when resuming"""
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = None
+        if state and state.get("folder") == folder:
+            self.state = state
+            return True
+        self.reset(folder)
+        return False
+
+    def reset(self, folder: str):
+        """Start a fresh run, discarding any earlier checkpoint"""
+        self.state = self._empty_state(folder)
+        self.spool.reset()
+        if os.path.exists(self.state_path):
+            os.remove(self.state_path)
+
+    @staticmethod
+    def file_signature(file_path: str) -> Dict[str, Any]:
+        stat = os.stat(file_path)
+        return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+    def is_completed(self, file_path: str) -> bool:
+        """True when the file was indexed by a saved checkpoint and has not changed since"""
+        entry = self.state["completed"].get(file_path)
+        if entry is None:
+            return False
+        signature = self.file_signature(file_path)
+        return entry["size"] == signature["size"] and entry["mtime"] == signature["mtime"]
+
+    def mark_completed(self, file_path: str, content_hash: str, num_chunks: int):
+        entry = self.file_signature(file_path)
+        entry.update({"content_hash": content_hash, "num_chunks": num_chunks})
+        self.state["failed"].pop(file_path, None)
+        self.state["completed"][file_path] = entry
+
+    def mark_failed(self, file_path: str, error: str):
+        self.state["failed"][file_path] = error
+
+    def save(self):
+        """Atomically write the state; call only after the index covering it has been saved"""
+        self.state["checkpoints"] += 1
+        self.state["updated_at"] = datetime.now().isoformat()
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.state_path)
+        # The spool is the only other record of this progress: make the new state durable before dropping it
+        fsync_directory(self.directory)
+        self.spool.reset()
+
+    def clear(self):
+        """Remove the checkpoint after a run finishes"""
+        self.spool.reset()
+        if os.path.exists(self.state_path):
+            os.remove(self.state_path)
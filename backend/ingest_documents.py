@@ -1,113 +1,331 @@
 #!/usr/bin/env python3
 """
 Script to ingest legal documents from a folder into the RAG system
+
+Large corpora are ingested in one pass with periodic checkpoints: every
+--checkpoint-files files (or --checkpoint-seconds) the index and the list of
+completed files are saved, and embedded batches in between are spooled to
+disk. Re-running the same command after an interruption resumes from the
+last checkpoint and reuses spooled embeddings instead of recomputing them.
 """
 
 import os
 import sys
+import time
+import argparse
 from pathlib import Path
+from typing import List, Dict, Any
 
 # Add the backend directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from rag_pipeline import LegalRAGPipeline
-from ingest import DocumentIngestionService
+# The pipeline (langchain, FAISS, the embedding model) is imported once there is work to do,
+# so usage errors and --help return immediately
+from config import Config
+from ingest import DocumentIngestionService, SUPPORTED_FORMATS
+from utils.helpers import calculate_file_hash
+from utils.logger import configure_logging
+
+DEFAULT_FOLDERS = [
+    "legal_documents",
+    "documents",
+    "legal_docs",
+    "indian_legal_docs"
+]
+
+def collect_files(folder_path: str) -> List[str]:
+    """Supported files under a folder, in a stable order so checkpoints line up across runs"""
+    files = []
+    for root, dirs, names in os.walk(folder_path):
+        dirs.sort()
+        for name in sorted(names):
+            if Path(name).suffix.lower() in SUPPORTED_FORMATS:
+                files.append(os.path.join(root, name))
+    return files
+
+def format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+class ProgressReporter:
+    """Prints throughput and an ETA based on the bytes still to be processed"""
+
+    def __init__(self, total_files: int, total_bytes: int, interval: float):
+        self.total_files = total_files
+        self.total_bytes = total_bytes
+        self.interval = interval
+        self.start = time.monotonic()
+        self._last_report = 0.0
+        self.done_files = 0
+        self.done_bytes = 0
+        self.processed_bytes = 0  # bytes actually ingested this run; skipped files don't count toward the rate
+        self.chunks = 0
 
-def ingest_legal_documents(folder_path: str):
+    def advance(self, file_size: int, processed: bool):
+        self.done_files += 1
+        self.done_bytes += file_size
+        if processed:
+            self.processed_bytes += file_size
+
+    def report(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._last_report < self.interval:
+            return
+        self._last_report = now
+        elapsed = max(now - self.start, 1e-6)
+        byte_rate = self.processed_bytes / elapsed
+        remaining = self.total_bytes - self.done_bytes
+        eta = format_duration(remaining / byte_rate) if byte_rate > 0 else "--:--"
+        percent = 100.0 * self.done_files / max(self.total_files, 1)
+        print(
+            f"⏳ [{self.done_files}/{self.total_files}] {percent:5.1f}% | "
+            f"{self.done_files / elapsed:.2f} files/s | {self.chunks / elapsed:.1f} chunks/s | "
+            f"{byte_rate / (1024*1024):.2f} MB/s | elapsed {format_duration(elapsed)} | ETA {eta}",
+            flush=True
+        )
+
+def ingest_legal_documents(folder_path: str, restart: bool = False,
+                           checkpoint_files: int = Config.INGEST_CHECKPOINT_FILES,
+                           checkpoint_seconds: float = Config.INGEST_CHECKPOINT_SECONDS,
+                           progress_interval: float = 5.0) -> Dict[str, Any]:
     """
-    Ingest all legal documents from a specified folder
-    
+    Ingest all legal documents from a specified folder, resuming an interrupted run
+
     Args:
         folder_path (str): Path to folder containing legal documents
+        restart (bool): Ignore any checkpoint and start from the first file
+        checkpoint_files (int): Save the index and progress after this many ingested files
+        checkpoint_seconds (float): ...or after this many seconds, whichever comes first
+        progress_interval (float): Seconds between progress lines
     """
     print("🏛️ Legal AI Advisor - Document Ingestion")
     print("=" * 50)
-    
+
     # Validate folder exists
-    if not os.path.exists(folder_path):
+    if not os.path.isdir(folder_path):
         print(f"❌ Error: Folder '{folder_path}' does not exist")
-        return
-    
+        return {"success": False, "error": f"Folder not found: {folder_path}"}
+
     print(f"📁 Scanning folder: {folder_path}")
-    
+    # Sources keep the path as given, like ingest_directory; the checkpoint is keyed by the absolute folder
+    files = collect_files(folder_path)
+    checkpoint_folder = os.path.abspath(folder_path)
+    sizes = {file_path: os.path.getsize(file_path) for file_path in files}
+    print(f"📄 Found {len(files)} supported files ({sum(sizes.values()) / (1024*1024):.2f} MB)")
+
+    summary = {
+        "success": True,
+        "total_files": len(files),
+        "ingested": 0,
+        "unchanged": 0,
+        "resumed": 0,
+        "failed_files": [],
+        "chunks": 0,
+        "reused_chunks": 0,
+        "checkpoints": 0
+    }
+    start = time.monotonic()
+
     try:
         # Initialize RAG pipeline
         print("🔄 Initializing RAG pipeline...")
+        from rag_pipeline import LegalRAGPipeline
+        from ingest_checkpoint import IngestionCheckpoint
         pipeline = LegalRAGPipeline()
         ingestion_service = DocumentIngestionService(pipeline)
-        
-        # Ingest all documents from folder
-        print("📚 Starting document ingestion...")
-        result = ingestion_service.ingest_directory(folder_path)
-        
-        if result["success"]:
-            print(f"✅ Ingestion completed successfully!")
-            print(f"📄 Total files processed: {result['total_files']}")
-            print(f"✅ Successfully ingested: {len(result['ingested_files'])}")
-            print(f"❌ Failed: {len(result['failed_files'])}")
-            print(f"💾 Total size: {result['total_size'] / (1024*1024):.2f} MB")
-            
-            if result['ingested_files']:
-                print("\n📋 Successfully ingested files:")
-                for file_path in result['ingested_files']:
-                    print(f"  ✓ {os.path.basename(file_path)}")
-            
-            if result['failed_files']:
-                print("\n❌ Failed files:")
-                for failed in result['failed_files']:
-                    print(f"  ✗ {os.path.basename(failed['file'])}: {failed['error']}")
+        checkpoint = IngestionCheckpoint(Config.INGEST_CHECKPOINT_PATH)
+
+        if restart:
+            checkpoint.reset(checkpoint_folder)
+            spooled = {}
+        elif checkpoint.load(checkpoint_folder):
+            spooled = checkpoint.spool.load()
+            print(
+                f"♻️ Resuming: {len(checkpoint.state['completed'])} files done at the last checkpoint, "
+                f"{sum(len(entry['embedded']) for entry in spooled.values())} spooled chunk embeddings to reuse"
+            )
         else:
-            print(f"❌ Ingestion failed: {result['error']}")
-            
+            spooled = {}
+
+        progress = ProgressReporter(len(files), sum(sizes.values()), progress_interval)
+        since_checkpoint = 0
+        last_checkpoint = time.monotonic()
+
+        def save_checkpoint():
+            nonlocal since_checkpoint, last_checkpoint
+            # The index goes first: a checkpoint must never list files the saved index lacks
+            pipeline.save_index()
+            checkpoint.save()
+            summary["checkpoints"] += 1
+            since_checkpoint, last_checkpoint = 0, time.monotonic()
+
+        print("📚 Starting document ingestion...")
+        # The writer lock is held for one checkpoint batch at a time: every batch ends saved, so server
+        # uploads and deletes wait at most one checkpoint interval, and the next batch reloads their saves
+        remaining = iter(files)
+        finished = False
+        while not finished:
+            with pipeline.index_sync.writer():
+                finished = True
+                for file_path in remaining:
+                    if checkpoint.is_completed(file_path):
+                        summary["resumed"] += 1
+                        progress.advance(sizes[file_path], processed=False)
+                        continue
+
+                    validation = ingestion_service.validate_file(file_path)
+                    if not validation["valid"]:
+                        summary["failed_files"].append({"file": file_path, "error": validation["error"]})
+                        checkpoint.mark_failed(file_path, validation["error"])
+                        progress.advance(sizes[file_path], processed=False)
+                        continue
+
+                    content_hash = calculate_file_hash(file_path)
+                    existing = pipeline.registry.get(file_path)
+                    if existing and existing.get("content_hash") == content_hash:
+                        # Indexed by an earlier run and unchanged since
+                        summary["unchanged"] += 1
+                        checkpoint.mark_completed(file_path, content_hash, existing.get("num_chunks", 0))
+                        progress.advance(sizes[file_path], processed=False)
+                        continue
+
+                    entry = spooled.pop(file_path, None)
+                    embedded = entry["embedded"] if entry and entry["content_hash"] == content_hash else None
+                    file_chunks = 0
+
+                    def spool_batch(chunks, vectors):
+                        nonlocal file_chunks
+                        checkpoint.spool.append(
+                            file_path, content_hash,
+                            [chunk.metadata['chunk_uid'] for chunk in chunks],
+                            [chunk.page_content for chunk in chunks],
+                            vectors
+                        )
+                        file_chunks += len(chunks)
+                        progress.chunks += len(chunks)
+
+                    success = pipeline.add_documents(
+                        file_path, source_name=file_path, content_hash=content_hash,
+                        save=False, embedded=embedded, on_batch=spool_batch
+                    )
+                    progress.advance(sizes[file_path], processed=True)
+
+                    if success:
+                        summary["ingested"] += 1
+                        summary["chunks"] += file_chunks
+                        if embedded:
+                            summary["reused_chunks"] += len(embedded)
+                        checkpoint.mark_completed(file_path, content_hash, file_chunks)
+                        since_checkpoint += 1
+                    else:
+                        error = f"Failed to ingest file: {file_path}"
+                        summary["failed_files"].append({"file": file_path, "error": error})
+                        checkpoint.mark_failed(file_path, error)
+
+                    if since_checkpoint and (since_checkpoint >= checkpoint_files
+                                             or time.monotonic() - last_checkpoint >= checkpoint_seconds):
+                        save_checkpoint()
+                        print(f"💾 Checkpoint saved ({summary['ingested']} files ingested so far)", flush=True)
+                        progress.report()
+                        finished = False
+                        break
+
+                    progress.report()
+
+                if finished and since_checkpoint:
+                    save_checkpoint()
+
+        # PCA needs the whole corpus, so a reduced index is built at full dimension and projected once here;
+        # later runs and uploads embed straight into the reduced space
+        if Config.EMBEDDING_REDUCED_DIM and pipeline.projection is None and pipeline.vector_store is not None:
+            print(f"📐 Reducing index vectors to {Config.EMBEDDING_REDUCED_DIM} dimensions ({Config.EMBEDDING_REDUCTION})...")
+            reduction = pipeline.reduce_if_configured(min_vectors=0)
+            if reduction["success"]:
+                summary["reduced_dimension"] = reduction["projection"]["output_dim"]
+                print(f"✅ Index reduced: {reduction['index_mb_before']} MB -> {reduction['index_mb_after']} MB")
+            else:
+                print(f"⚠️ Index kept at full dimension: {reduction['error']}")
+
+        progress.report(force=True)
+        # A finished run needs no resume state; unchanged files are skipped next time by content hash
+        checkpoint.clear()
+
+    except KeyboardInterrupt:
+        print("\n⏸️ Interrupted - run the same command again to resume from the last checkpoint")
+        summary.update({"success": False, "error": "interrupted"})
     except Exception as e:
         print(f"❌ Error during ingestion: {str(e)}")
-        return
-    
-    print("\n🎉 Document ingestion completed!")
-
-def main():
-    """Main function to run ingestion"""
-    # Default folder paths to check
-    default_folders = [
-        "legal_documents",
-        "documents", 
-        "legal_docs",
-        "indian_legal_docs"
-    ]
-    
-    # Check if user provided a folder path
-    if len(sys.argv) > 1:
-        folder_path = sys.argv[1]
-    else:
-        print("📂 Available folders:")
-        for i, folder in enumerate(default_folders, 1):
-            if os.path.exists(folder):
-                print(f"  {i}. {folder}/ (exists)")
-            else:
-                print(f"  {i}. {folder}/ (create this folder)")
-        
-        print("\n💡 Usage:")
-        print(f"  python {__file__} <folder_path>")
-        print(f"  python {__file__} legal_documents")
-        print(f"  python {__file__} C:\\path\\to\\your\\legal\\documents")
-        
-        # Try to find an existing folder
-        for folder in default_folders:
-            if os.path.exists(folder):
-                use_folder = input(f"\nUse existing folder '{folder}'? (y/n): ").lower()
-                if use_folder == 'y':
-                    folder_path = folder
-                    break
-        else:
+        summary.update({"success": False, "error": str(e)})
+
+    summary["elapsed_seconds"] = round(time.monotonic() - start, 2)
+    print_summary(summary)
+    return summary
+
+def print_summary(summary: Dict[str, Any]):
+    """Final timing and outcome summary"""
+    elapsed = max(summary["elapsed_seconds"], 1e-6)
+    print("\n📊 Ingestion summary")
+    print("-" * 50)
+    print(f"⏱️ Elapsed: {format_duration(elapsed)} ({elapsed:.1f}s)")
+    print(f"📄 Total files: {summary['total_files']}")
+    print(f"✅ Ingested: {summary['ingested']}")
+    print(f"⏭️ Unchanged (already indexed): {summary['unchanged']}")
+    print(f"♻️ Completed by an earlier run: {summary['resumed']}")
+    print(f"❌ Failed: {len(summary['failed_files'])}")
+    print(f"🧩 Chunks indexed: {summary['chunks']} ({summary['reused_chunks']} embeddings reused from the spool)")
+    print(f"🚀 Throughput: {summary['ingested'] / elapsed:.2f} files/s, {summary['chunks'] / elapsed:.1f} chunks/s")
+    print(f"💾 Checkpoints saved: {summary['checkpoints']}")
+
+    if summary['failed_files']:
+        print("\n❌ Failed files:")
+        for failed in summary['failed_files']:
+            print(f"  ✗ {os.path.basename(failed['file'])}: {failed['error']}")
+
+    if summary["success"]:
+        print("\n🎉 Document ingestion completed!")
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Ingest legal documents from a folder into the RAG system")
+    parser.add_argument("folder", nargs="?", help="Folder containing legal documents "
+                        f"(default: the first existing of {', '.join(DEFAULT_FOLDERS)})")
+    parser.add_argument("--restart", action="store_true", help="Ignore any checkpoint and start from the beginning")
+    parser.add_argument("--checkpoint-files", type=int, default=Config.INGEST_CHECKPOINT_FILES,
+                        help="Save the index and progress after this many ingested files")
+    parser.add_argument("--checkpoint-seconds", type=float, default=Config.INGEST_CHECKPOINT_SECONDS,
+                        help="Save the index and progress at least this often")
+    parser.add_argument("--progress-interval", type=float, default=5.0, help="Seconds between progress lines")
+    return parser.parse_args(argv)
+
+def main(argv: List[str] = None) -> int:
+    """Main function to run ingestion; never prompts, so it can run from cron or a job queue"""
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    folder_path = args.folder
+    if folder_path is None:
+        folder_path = next((folder for folder in DEFAULT_FOLDERS if os.path.isdir(folder)), None)
+        if folder_path is None:
             print("\n📁 Creating 'legal_documents' folder for you...")
             os.makedirs("legal_documents", exist_ok=True)
-            folder_path = "legal_documents"
-            print(f"✅ Created folder: {folder_path}")
-            print(f"📄 Please add your legal documents to this folder and run again.")
-            return
-    
+            print("✅ Created folder: legal_documents")
+            print("📄 Please add your legal documents to this folder and run again.")
+            print(f"\n💡 Usage: python {__file__} <folder_path> [--restart] [--checkpoint-files N]")
+            return 0
+        print(f"📂 No folder given, using '{folder_path}'")
+
     # Start ingestion
-    ingest_legal_documents(folder_path)
+    summary = ingest_legal_documents(
+        folder_path,
+        restart=args.restart,
+        checkpoint_files=max(args.checkpoint_files, 1),
+        checkpoint_seconds=args.checkpoint_seconds,
+        progress_interval=args.progress_interval
+    )
+    if not summary["success"]:
+        return 130 if summary.get("error") == "interrupted" else 1
+    return 1 if summary["failed_files"] else 0
 
 if __name__ == "__main__":
-    main()
+    configure_logging()
+    sys.exit(main())
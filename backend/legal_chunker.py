@@ -0,0 +1,180 @@
+import re
+import logging
+from typing import Iterable, Iterator, List, Dict, Any, Optional
+
+from langchain_core.documents import Document
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Structural headings found in Indian statutes, the Constitution, contracts and judgments.
+# Hard boundaries start a new chapter/part: chunks never span them.
+HARD_BOUNDARIES = [
+    ('chapter', re.compile(r'^\s*(CHAPTER|Chapter)\s+([IVXLC]+[A-Z]?|\d+[A-Z]?)\b.*$')),
+    ('part', re.compile(r'^\s*PART\s+([IVXLC]+[A-Z]?|\d+)\b.*$')),
+    ('schedule', re.compile(r'^\s*(THE\s+)?([A-Z]+\s+)?SCHEDULE\b.*$')),
+    ('judgment', re.compile(r'^\s*(JUDGMENT|JUDGEMENT|ORDER|HEADNOTE|ORAL JUDGMENT)\s*:?\s*$')),
+]
+
+# Provision headings: each one starts a new section unit and is kept as chunk metadata
+PROVISION_BOUNDARIES = [
+    ('Section', re.compile(r'^\s*(?:Section|SECTION|Sec\.)\s+(\d{1,4}[A-Z]{0,2})\b.*$')),
+    ('Article', re.compile(r'^\s*(?:Article|ARTICLE|Art\.)\s+(\d{1,3}[A-Z]{0,2})\b.*$')),
+    ('Clause', re.compile(r'^\s*(?:Clause|CLAUSE)\s+(\d{1,3}(?:\.\d+)*)\b.*$')),
+    ('Rule', re.compile(r'^\s*(?:Rule|RULE)\s+(\d{1,3}[A-Z]?)\b.*$')),
+    # Bare Act style: "302. Punishment for murder.—Whoever commits murder..."
+    ('Section', re.compile(r'^\s*(\d{1,4}[A-Z]{0,2})\.\s+[A-Z][^\n]{2,150}?\.?\s*[—–-]{1,2}')),
+]
+
+# Numbered paragraphs in judgments: split points that carry no heading
+PARAGRAPH_BOUNDARY = re.compile(r'^\s*\(?\d{1,3}\)?\.?\s+[A-Z]')
+
+# Marginal heading of a bare Act provision ends at the em dash before its text
+HEADING_END = re.compile(r'\s*(?:[—–]|\.-|\.\s*-)')
+
+
+class _Unit:
+    """A run of text between two detected boundaries"""
+
+    def __init__(self, kind: str, page: Any, heading: Optional[str] = None, provision: Optional[str] = None):
+        self.kind = kind
+        self.page = page
+        self.heading = heading
+        self.provision = provision
+        self.lines: List[str] = []
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines).strip()
+
+
+class LegalDocumentChunker:
+    """Splits legal documents on chapter/section/article/clause boundaries in one streaming pass"""
+
+    def __init__(self, chunk_size: int = None, chunk_overlap: int = None):
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+        self.chunk_size = chunk_size or Config.CHUNK_SIZE
+        # Overlap is only used when an oversized section has to be cut without a clean boundary
+        self.fallback_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=self.chunk_size,
+            chunk_overlap=Config.CHUNK_OVERLAP if chunk_overlap is None else chunk_overlap,
+            separators=["\n\n", "\n", ". ", " ", ""]
+        )
+
+    def split(self, pages: Iterable[Document]) -> Iterator[Document]:
+        """Yield chunks from an iterable of pages, reading each page once"""
+        current_source = None
+        base_metadata: Dict[str, Any] = {}
+        chapter = None
+        unit: Optional[_Unit] = None
+        pending: List[_Unit] = []
+        pending_chars = 0
+
+        for page in pages:
+            source = page.metadata.get('source')
+            if source != current_source:
+                # New file: flush everything from the previous one and reset structure
+                if unit is not None:
+                    pending.append(unit)
+                yield from self._pack(pending, base_metadata, chapter)
+                pending, pending_chars, unit, chapter = [], 0, None, None
+                current_source = source
+                base_metadata = dict(page.metadata)
+
+            page_number = page.metadata.get('page', 0)
+            for line in page.page_content.splitlines():
+                boundary = self._classify(line)
+
+                if boundary is None:
+                    if unit is None:
+                        unit = _Unit('preamble', page_number)
+                    unit.lines.append(line)
+                    continue
+
+                kind, provision = boundary
+                if unit is not None:
+                    pending.append(unit)
+                    pending_chars += sum(len(line) for line in unit.lines)
+
+                if kind in ('chapter', 'part', 'schedule', 'judgment'):
+                    # Chunks never cross a hard boundary
+                    yield from self._pack(pending, base_metadata, chapter)
+                    pending, pending_chars = [], 0
+                    chapter = line.strip()
+                    unit = _Unit(kind, page_number, heading=line.strip())
+                elif kind == 'paragraph':
+                    unit = _Unit(kind, page_number)
+                else:
+                    heading = HEADING_END.split(line.strip(), maxsplit=1)[0][:200]
+                    unit = _Unit(kind, page_number, heading=heading, provision=provision)
+                unit.lines.append(line)
+
+                # Bound memory: emit whatever already fills a chunk
+                if pending_chars > self.chunk_size * 4:
+                    yield from self._pack(pending, base_metadata, chapter)
+                    pending, pending_chars = [], 0
+
+        if unit is not None:
+            pending.append(unit)
+        yield from self._pack(pending, base_metadata, chapter)
+
+    def _classify(self, line: str) -> Optional[tuple]:
+        if not line.strip():
+            return None
+        for kind, pattern in HARD_BOUNDARIES:
+            if pattern.match(line):
+                return kind, None
+        for label, pattern in PROVISION_BOUNDARIES:
+            match = pattern.match(line)
+            if match:
+                return 'provision', f"{label} {match.group(1)}"
+        if PARAGRAPH_BOUNDARY.match(line):
+            return 'paragraph', None
+        return None
+
+    def _pack(self, units: List[_Unit], base_metadata: Dict[str, Any], chapter: Optional[str]) -> Iterator[Document]:
+        """Greedily combine consecutive small units up to chunk_size; split oversized ones"""
+        group: List[_Unit] = []
+        group_length = 0
+
+        for unit in units:
+            text = unit.text
+            if not text:
+                continue
+
+            if len(text) > self.chunk_size:
+                if group:
+                    yield self._make_chunk(group, base_metadata, chapter)
+                    group, group_length = [], 0
+                for piece in self.fallback_splitter.split_text(text):
+                    yield self._make_chunk([unit], base_metadata, chapter, text=piece)
+                continue
+
+            if group and group_length + len(text) + 2 > self.chunk_size:
+                yield self._make_chunk(group, base_metadata, chapter)
+                group, group_length = [], 0
+
+            group.append(unit)
+            group_length += len(text) + 2
+
+        if group:
+            yield self._make_chunk(group, base_metadata, chapter)
+
+    def _make_chunk(self, units: List[_Unit], base_metadata: Dict[str, Any], chapter: Optional[str],
+                    text: str = None) -> Document:
+        metadata = dict(base_metadata)
+        metadata['page'] = units[0].page
+        headings = [u.heading for u in units if u.heading]
+        provisions = [u.provision for u in units if u.provision]
+        if chapter:
+            metadata['chapter'] = chapter
+        if headings:
+            metadata['heading'] = headings[0]
+            metadata['headings'] = headings
+        if provisions:
+            metadata['provisions'] = provisions
+
+        if text is None:
+            text = "\n\n".join(u.text for u in units)
+        return Document(page_content=text, metadata=metadata)
@@ -0,0 +1,157 @@
+import os
+import re
+import math
+from abc import ABC, abstractmethod
+from typing import List, Dict
+
+from langchain_core.documents import Document
+
+from config import Config
+from llm_client import create_http_client
+
+NOT_FOUND_ANSWER = "I cannot find this information in the uploaded legal documents."
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'can', 'do', 'does', 'for', 'from',
+    'how', 'i', 'in', 'is', 'it', 'me', 'of', 'on', 'or', 'tell', 'that', 'the', 'this', 'to',
+    'under', 'was', 'what', 'when', 'where', 'which', 'who', 'why', 'with', 'about', 'explain',
+    'provision', 'provisions', 'say', 'says', 'law', 'legal'
+}
+
+# List items count as sentences too, so extractive answers and summaries can be re-extracted from
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.;:?!])\s+(?=[A-Z0-9(\[])|\n{2,}|\n(?=- )')
+WORD_PATTERN = re.compile(r'[a-z0-9]+')
+# Bullet and citation added by an earlier extractive pass (e.g. summaries of summaries)
+EXTRACTIVE_DECORATION = re.compile(r'^(?:-\s+)+|\s*\[[^\[\]]+, page [^\[\]]+\]$')
+
+
+class LLMBackend(ABC):
+    """Base class for answer generation backends"""
+
+    name = "base"
+    model_name = "none"
+
+    @abstractmethod
+    def generate(self, prompt: str, question: str, documents: List[Document]) -> str:
+        """Generate an answer from the formatted prompt or the retrieved documents"""
+
+
+class GroqBackend(LLMBackend):
+    """Hosted generation through the Groq API"""
+
+    name = "groq"
+
+    def __init__(self):
+        from langchain_groq import ChatGroq
+
+        self.model_name = Config.LLM_MODEL
+        self.llm = ChatGroq(
+            model=Config.LLM_MODEL,
+            temperature=0.1,  # Low temperature for legal accuracy
+            groq_api_key=Config.GROQ_API_KEY,
+            base_url=Config.LLM_BASE_URL,
+            request_timeout=Config.LLM_TIMEOUT,
+            max_retries=0,  # Retries are handled by ManagedLLMClient
+            http_client=create_http_client()
+        )
+
+    def generate(self, prompt: str, question: str, documents: List[Document]) -> str:
+        return self.llm.invoke(prompt).content
+
+
+class LlamaCppBackend(LLMBackend):
+    """Local CPU generation from a llama.cpp-compatible GGUF model"""
+
+    name = "llamacpp"
+
+    def __init__(self):
+        try:
+            from langchain_community.llms import LlamaCpp
+        except ImportError as e:
+            raise ImportError("The llamacpp backend requires llama-cpp-python: pip install llama-cpp-python") from e
+
+        self.model_name = os.path.basename(Config.LOCAL_LLM_MODEL_PATH)
+        self.llm = LlamaCpp(
+            model_path=Config.LOCAL_LLM_MODEL_PATH,
+            n_ctx=Config.LOCAL_LLM_CONTEXT_SIZE,
+            n_threads=Config.LOCAL_LLM_THREADS,
+            max_tokens=Config.LOCAL_LLM_MAX_TOKENS,
+            temperature=0.1,
+            verbose=False
+        )
+
+    def generate(self, prompt: str, question: str, documents: List[Document]) -> str:
+        return self.llm.invoke(prompt).strip()
+
+
+class ExtractiveBackend(LLMBackend):
+    """Model-free backend that answers with the retrieved sentences most relevant to the question"""
+
+    name = "extractive"
+    model_name = "extractive"
+
+    def __init__(self, max_sentences: int = None):
+        self.max_sentences = max_sentences or Config.EXTRACTIVE_MAX_SENTENCES
+
+    def generate(self, prompt: str, question: str, documents: List[Document]) -> str:
+        query_terms = [t for t in WORD_PATTERN.findall(question.lower()) if t not in STOPWORDS]
+        if not query_terms or not documents:
+            return NOT_FOUND_ANSWER
+
+        # Candidate sentences, remembering which retrieved document (rank) they came from
+        candidates = []
+        for rank, doc in enumerate(documents):
+            for position, sentence in enumerate(SENTENCE_BOUNDARY.split(doc.page_content)):
+                sentence = EXTRACTIVE_DECORATION.sub('', " ".join(sentence.split()))
+                if len(sentence) >= 20:
+                    candidates.append((rank, position, sentence, set(WORD_PATTERN.findall(sentence.lower()))))
+
+        if not candidates:
+            return NOT_FOUND_ANSWER
+
+        # Inverse document frequency over candidate sentences so rare terms (section numbers) dominate
+        document_frequency: Dict[str, int] = {}
+        for _, _, _, terms in candidates:
+            for term in terms:
+                document_frequency[term] = document_frequency.get(term, 0) + 1
+        total = len(candidates)
+
+        scored = []
+        for rank, position, sentence, terms in candidates:
+            score = sum(
+                math.log(1 + total / document_frequency[term])
+                for term in query_terms if term in terms
+            )
+            if score > 0:
+                # Prefer higher ranked documents on ties
+                scored.append((score / (1 + 0.1 * rank), rank, position, sentence))
+
+        if not scored:
+            return NOT_FOUND_ANSWER
+
+        best = sorted(scored, key=lambda item: item[0], reverse=True)[:self.max_sentences]
+        best.sort(key=lambda item: (item[1], item[2]))  # Restore reading order
+
+        lines = []
+        for _, rank, _, sentence in best:
+            metadata = documents[rank].metadata
+            source = os.path.basename(str(metadata.get('source_file', metadata.get('source', 'unknown'))))
+            lines.append(f"- {sentence} [{source}, page {metadata.get('page', 0)}]")
+
+        return "Relevant provisions from the uploaded legal documents:\n" + "\n".join(lines)
+
+
+LLM_BACKENDS = {
+    GroqBackend.name: GroqBackend,
+    LlamaCppBackend.name: LlamaCppBackend,
+    ExtractiveBackend.name: ExtractiveBackend
+}
+
+
+def create_llm_backend(name: str = None) -> LLMBackend:
+    """Create the answer generation backend selected in Config.LLM_BACKEND"""
+    name = (name or Config.LLM_BACKEND).lower()
+    if name not in LLM_BACKENDS:
+        raise ValueError(f"Unknown LLM backend: {name}. Available backends: {sorted(LLM_BACKENDS)}")
+
+    return LLM_BACKENDS[name]()
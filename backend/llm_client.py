@@ -0,0 +1,246 @@
+import time
+import random
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from config import Config
+from metrics import LLM_EVENTS_TOTAL, LLM_IN_FLIGHT
+
+logger = logging.getLogger(__name__)
+
+# Upstream responses worth retrying: request timeouts, conflicts, rate limits and server errors
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class LLMUnavailableError(Exception):
+    """Raised when the LLM cannot serve a request (saturated, failing or circuit open)"""
+
+
+class CircuitOpenError(LLMUnavailableError):
+    """Raised when the circuit breaker is rejecting calls"""
+
+
+class CircuitBreaker:
+    """Thread-safe closed/open/half-open circuit breaker"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        """Current breaker state"""
+        with self._lock:
+            return self._state_locked()
+
+    def _state_locked(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow_request(self) -> bool:
+        """Return True if a call may proceed; only one probe is let through when half-open"""
+        with self._lock:
+            state = self._state_locked()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        """Close the circuit after a successful call"""
+        with self._lock:
+            self._consecutive_failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        """Count a failed call and open the circuit once the threshold is reached"""
+        with self._lock:
+            self._consecutive_failures += 1
+            if self._probe_in_flight or self._consecutive_failures >= self.failure_threshold:
+                if self._opened_at is None or self._probe_in_flight:
+                    logger.warning(f"LLM circuit opened after {self._consecutive_failures} consecutive failures")
+                self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def release_probe(self):
+        """Release a half-open probe slot without judging upstream health"""
+        with self._lock:
+            self._probe_in_flight = False
+
+
+def create_http_client():
+    """Create a pooled HTTP client shared by all LLM calls"""
+    import httpx
+
+    return httpx.Client(
+        limits=httpx.Limits(
+            max_connections=Config.LLM_POOL_CONNECTIONS,
+            max_keepalive_connections=Config.LLM_POOL_CONNECTIONS,
+            keepalive_expiry=60.0
+        ),
+        timeout=httpx.Timeout(Config.LLM_TIMEOUT, connect=Config.LLM_CONNECT_TIMEOUT)
+    )
+
+
+def get_status_code(error: Exception) -> Optional[int]:
+    """Extract an HTTP status code from an SDK or transport exception"""
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    return status_code if isinstance(status_code, int) else None
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """Decide whether an LLM call failure is transient"""
+    status_code = get_status_code(error)
+    if status_code is not None:
+        return status_code in RETRYABLE_STATUS_CODES
+    # Transport level failures (groq.APITimeoutError, httpx.ConnectError, ...) carry no status
+    error_name = type(error).__name__
+    return "Timeout" in error_name or "Connection" in error_name or "Connect" in error_name
+
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """Read the Retry-After header from a rate limited response, if present"""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class ManagedLLMClient:
+    """Resilient wrapper around the answer backend: concurrency limit, retries and circuit breaker"""
+
+    def __init__(self, backend: Any,
+                 max_retries: int = None,
+                 max_concurrency: int = None,
+                 queue_timeout: float = None,
+                 retry_base_delay: float = None,
+                 retry_max_delay: float = None,
+                 circuit_breaker: CircuitBreaker = None):
+        self.backend = backend
+        self.max_retries = Config.LLM_MAX_RETRIES if max_retries is None else max_retries
+        self.max_concurrency = max_concurrency or Config.LLM_MAX_CONCURRENCY
+        self.queue_timeout = Config.LLM_QUEUE_TIMEOUT if queue_timeout is None else queue_timeout
+        self.retry_base_delay = Config.LLM_RETRY_BASE_DELAY if retry_base_delay is None else retry_base_delay
+        self.retry_max_delay = Config.LLM_RETRY_MAX_DELAY if retry_max_delay is None else retry_max_delay
+        self.circuit_breaker = circuit_breaker or CircuitBreaker(
+            Config.LLM_CIRCUIT_FAILURE_THRESHOLD,
+            Config.LLM_CIRCUIT_RESET_TIMEOUT
+        )
+
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrency)
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "calls": 0,
+            "successes": 0,
+            "failures": 0,
+            "retries": 0,
+            "rejected_circuit_open": 0,
+            "rejected_saturated": 0,
+            "in_flight": 0
+        }
+
+    def _increment(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self._stats[key] += amount
+        if key == "in_flight":
+            LLM_IN_FLIGHT.inc(amount)
+        else:
+            LLM_EVENTS_TOTAL.inc(amount, event=key)
+
+    def generate(self, prompt: str, question: str = None, documents: List[Any] = None) -> str:
+        """Generate an answer for the prompt, raising LLMUnavailableError when it cannot"""
+        self._increment("calls")
+
+        if not self.circuit_breaker.allow_request():
+            self._increment("rejected_circuit_open")
+            raise CircuitOpenError("LLM circuit breaker is open")
+
+        return self._generate_with_retries(prompt, question, documents or [])
+
+    def _acquire_slot(self):
+        if not self._semaphore.acquire(timeout=self.queue_timeout):
+            self._increment("rejected_saturated")
+            self.circuit_breaker.release_probe()
+            raise LLMUnavailableError(
+                f"LLM concurrency limit ({self.max_concurrency}) reached; waited {self.queue_timeout}s"
+            )
+        self._increment("in_flight")
+
+    def _release_slot(self):
+        self._increment("in_flight", -1)
+        self._semaphore.release()
+
+    def _generate_with_retries(self, prompt: str, question: str, documents: List[Any]) -> str:
+        attempt = 0
+        while True:
+            self._acquire_slot()
+            try:
+                answer = self.backend.generate(prompt, question, documents)
+            except Exception as e:
+                error = e
+            else:
+                self.circuit_breaker.record_success()
+                self._increment("successes")
+                return answer
+            finally:
+                # A slot is held only for the call itself, never through a backoff sleep
+                self._release_slot()
+
+            if not is_retryable_error(error):
+                # Client errors (bad request, auth) say nothing about upstream health
+                self.circuit_breaker.release_probe()
+                self._increment("failures")
+                raise error
+
+            if attempt >= self.max_retries:
+                self.circuit_breaker.record_failure()
+                self._increment("failures")
+                raise LLMUnavailableError(
+                    f"LLM call failed after {attempt + 1} attempts: {str(error)}"
+                ) from error
+
+            delay = self._backoff_delay(attempt, error)
+            logger.warning(
+                f"LLM call failed ({type(error).__name__}, status={get_status_code(error)}); "
+                f"retrying in {delay:.2f}s (attempt {attempt + 1}/{self.max_retries})"
+            )
+            self._increment("retries")
+            time.sleep(delay)
+            attempt += 1
+
+    def _backoff_delay(self, attempt: int, error: Exception) -> float:
+        """Exponential backoff with full jitter, honouring Retry-After when the server sends it"""
+        retry_after = get_retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.retry_max_delay)
+        ceiling = min(self.retry_max_delay, self.retry_base_delay * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get client counters and circuit breaker state"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["backend"] = getattr(self.backend, "name", type(self.backend).__name__)
+        stats["circuit_state"] = self.circuit_breaker.state
+        stats["max_concurrency"] = self.max_concurrency
+        return stats
@@ -0,0 +1,267 @@
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Tuple, Callable, Optional, Iterator
+
+# Latency buckets in seconds, from sub-millisecond FAISS searches to slow LLM calls
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+PROCESS_START_TIME = time.time()
+
+
+def _format_labels(labelnames: Tuple[str, ...], labelvalues: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Base for labelled metrics; one lock per metric keeps hot-path updates cheap"""
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    metric_type = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or is read from a callback at scrape time"""
+
+    metric_type = "gauge"
+
+    def __init__(self, *args, callback: Optional[Callable[[], float]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self.callback = callback
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def clear(self):
+        """Forget every labelled value, e.g. before re-setting the ones that still exist"""
+        with self._lock:
+            self._values.clear()
+
+    def _samples(self) -> List[str]:
+        if self.callback is not None:
+            return [f"{self.name} {_format_value(self.callback())}"]
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values]
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observations (cumulative buckets rendered at scrape time)"""
+
+    metric_type = "histogram"
+
+    def __init__(self, *args, buckets: Tuple[float, ...] = LATENCY_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts (+Inf last), sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, (list(entry[0]), entry[1], entry[2])) for key, entry in self._values.items())
+        lines = []
+        for key, (counts, total, count) in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric_class, name: str, *args, **kwargs):
+        with self._lock:
+            existing = self._metrics.get(name)
+            if existing is not None:
+                if not isinstance(existing, metric_class):
+                    raise ValueError(f"Metric {name} already registered as {existing.metric_type}")
+                return existing
+            metric = metric_class(name, *args, **kwargs)
+            self._metrics[name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+              callback: Optional[Callable[[], float]] = None) -> Gauge:
+        gauge = self._register(Gauge, name, documentation, labelnames, callback=callback)
+        if callback is not None:
+            gauge.callback = callback
+        return gauge
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class StageTimer:
+    """Times the named stages of one operation into a histogram and keeps the per-call breakdown"""
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.timings[name] = self.timings.get(name, 0.0) + elapsed
+            self.histogram.observe(elapsed, stage=name)
+
+    def as_ms(self) -> Dict[str, float]:
+        return {name: round(seconds * 1000, 2) for name, seconds in self.timings.items()}
+
+
+def get_uptime() -> float:
+    """Seconds since this process started"""
+    return time.time() - PROCESS_START_TIME
+
+
+# Process-wide registry exported on /metrics
+REGISTRY = MetricsRegistry()
+
+QUERY_STAGE_SECONDS = REGISTRY.histogram(
+    "legal_ai_query_stage_seconds", "Time spent in each stage of a query", ("stage",)
+)
+QUERY_SECONDS = REGISTRY.histogram("legal_ai_query_seconds", "End-to-end query latency")
+QUERIES_TOTAL = REGISTRY.counter("legal_ai_queries_total", "Queries processed by outcome", ("outcome",))
+CONTEXT_TOKENS = REGISTRY.histogram(
+    "legal_ai_context_tokens", "Tokens of retrieved context sent to the LLM", buckets=TOKEN_BUCKETS
+)
+ANSWER_TOKENS = REGISTRY.histogram(
+    "legal_ai_answer_tokens", "Tokens in generated answers", buckets=TOKEN_BUCKETS
+)
+INGEST_STAGE_SECONDS = REGISTRY.histogram(
+    "legal_ai_ingest_stage_seconds", "Time spent in each stage of document ingestion", ("stage",)
+)
+INGEST_CHUNKS = REGISTRY.histogram(
+    "legal_ai_ingest_chunks", "Chunks produced per ingested document", buckets=SIZE_BUCKETS
+)
+CHUNKS_INGESTED_TOTAL = REGISTRY.counter("legal_ai_chunks_ingested_total", "Chunks embedded and indexed")
+DOCUMENTS_INGESTED_TOTAL = REGISTRY.counter(
+    "legal_ai_documents_ingested_total", "Document ingestions by outcome", ("outcome",)
+)
+TEXT_CACHE_TOTAL = REGISTRY.counter(
+    "legal_ai_text_cache_requests_total", "Extracted-text cache lookups by result", ("result",)
+)
+RERANK_CACHE_TOTAL = REGISTRY.counter(
+    "legal_ai_rerank_cache_requests_total", "Reranker score cache lookups by result", ("result",)
+)
+LLM_EVENTS_TOTAL = REGISTRY.counter(
+    "legal_ai_llm_events_total", "LLM client events (calls, successes, failures, retries, rejections)", ("event",)
+)
+LOG_RECORDS_DROPPED_TOTAL = REGISTRY.counter(
+    "legal_ai_log_records_dropped_total", "Log records dropped because the background writer fell behind"
+)
+LLM_IN_FLIGHT = REGISTRY.gauge("legal_ai_llm_in_flight", "LLM calls currently in progress")
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "legal_ai_http_request_seconds", "HTTP request latency", ("method", "endpoint", "status")
+)
+INDEX_VECTORS = REGISTRY.gauge("legal_ai_index_vectors", "Vectors in each loaded collection's FAISS index", ("collection",))
+INDEX_DOCUMENTS = REGISTRY.gauge(
+    "legal_ai_index_documents", "Documents registered in each loaded collection's index", ("collection",)
+)
+UPTIME_SECONDS = REGISTRY.gauge("legal_ai_uptime_seconds", "Seconds since the process started", callback=get_uptime)
@@ -0,0 +1,172 @@
+import logging
+from typing import Iterator, Optional, Dict, Any, List
+
+from langchain_core.documents import Document
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+FAST_EXTRACTORS = ['pdfium', 'pymupdf']
+
+
+def available_extractors() -> List[str]:
+    """List the PDF text extractors importable in this environment, fastest first"""
+    extractors = []
+    for name, module in (('pdfium', 'pypdfium2'), ('pymupdf', 'fitz'), ('pdfplumber', 'pdfplumber')):
+        try:
+            __import__(module)
+            extractors.append(name)
+        except ImportError:
+            continue
+    return extractors
+
+
+def resolve_extractor(name: str = None) -> str:
+    """Resolve 'auto' to the fastest installed extractor"""
+    name = (name or Config.PDF_EXTRACTOR).lower()
+    available = available_extractors()
+    if name == 'auto':
+        for candidate in FAST_EXTRACTORS + ['pdfplumber']:
+            if candidate in available:
+                return candidate
+        raise ImportError("No PDF extractor installed: pip install pypdfium2 or pdfplumber")
+    if name not in available:
+        raise ImportError(f"PDF extractor '{name}' is not installed")
+    return name
+
+
+def is_poor_text(text: str) -> bool:
+    """Heuristic for pages a fast extractor handled badly (tables, broken encodings, lost spacing)"""
+    stripped = text.strip()
+    if len(stripped) < Config.PDF_MIN_PAGE_CHARS:
+        return True
+
+    # Unmapped glyphs and control characters point at font encoding problems
+    garbage = sum(1 for ch in stripped if ch == '�' or (ord(ch) < 32 and ch not in '\n\r\t'))
+    if garbage / len(stripped) > 0.02:
+        return True
+
+    # Table cells come out as runs of very short lines
+    lines = [line for line in stripped.splitlines() if line.strip()]
+    short_lines = sum(1 for line in lines if len(line.strip()) <= 3)
+    if len(lines) >= 10 and short_lines / len(lines) > 0.4:
+        return True
+
+    # Missing inter-word spacing produces implausibly long "words"
+    words = stripped.split()
+    if words and sum(len(word) for word in words) / len(words) > 20:
+        return True
+
+    return False
+
+
+class _PdfPlumberPages:
+    """Lazily opened pdfplumber document used for slow-path page extraction"""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._pdf = None
+
+    def page_count(self) -> int:
+        return len(self._open().pages)
+
+    def extract(self, index: int) -> str:
+        page = self._open().pages[index]
+        try:
+            return page.extract_text() or ""
+        finally:
+            # pdfplumber caches parsed layout objects per page; drop them to keep memory flat
+            page.flush_cache()
+
+    def _open(self):
+        if self._pdf is None:
+            import pdfplumber
+            self._pdf = pdfplumber.open(self.file_path)
+        return self._pdf
+
+    def close(self):
+        if self._pdf is not None:
+            self._pdf.close()
+            self._pdf = None
+
+
+def _iter_pdfium(file_path: str) -> Iterator[str]:
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(file_path)
+    try:
+        for index in range(len(pdf)):
+            page = pdf[index]
+            textpage = page.get_textpage()
+            try:
+                yield textpage.get_text_range().replace("\r\n", "\n")
+            finally:
+                textpage.close()
+                page.close()
+    finally:
+        pdf.close()
+
+
+def _iter_pymupdf(file_path: str) -> Iterator[str]:
+    import fitz
+
+    with fitz.open(file_path) as pdf:
+        for page in pdf:
+            yield page.get_text("text")
+
+
+def _iter_pdfplumber(file_path: str) -> Iterator[str]:
+    pages = _PdfPlumberPages(file_path)
+    try:
+        for index in range(pages.page_count()):
+            yield pages.extract(index)
+    finally:
+        pages.close()
+
+
+PAGE_ITERATORS = {
+    'pdfium': _iter_pdfium,
+    'pymupdf': _iter_pymupdf,
+    'pdfplumber': _iter_pdfplumber
+}
+
+
+def iter_pdf_pages(file_path: str, extractor: str = None, fallback: Optional[bool] = None,
+                   stats: Optional[Dict[str, Any]] = None) -> Iterator[Document]:
+    """Yield one Document per PDF page, re-extracting poor fast-path pages with pdfplumber"""
+    extractor = resolve_extractor(extractor)
+    fallback = Config.PDF_FALLBACK_ON_POOR_TEXT if fallback is None else fallback
+    slow_path = _PdfPlumberPages(file_path) if fallback and extractor != 'pdfplumber' else None
+    if stats is not None:
+        stats.update({"extractor": extractor, "pages": 0, "fallback_pages": 0})
+
+    try:
+        for index, text in enumerate(PAGE_ITERATORS[extractor](file_path)):
+            used = extractor
+            if slow_path is not None and is_poor_text(text):
+                try:
+                    slow_text = slow_path.extract(index)
+                except ImportError:
+                    logger.warning("pdfplumber not installed; keeping fast-path text for poor pages")
+                    slow_path = None
+                    slow_text = ""
+                if slow_text.strip() and (not is_poor_text(slow_text) or len(slow_text.strip()) > len(text.strip())):
+                    text, used = slow_text, 'pdfplumber'
+
+            if stats is not None:
+                stats["pages"] += 1
+                stats["fallback_pages"] += used != extractor
+
+            yield Document(
+                page_content=text,
+                metadata={
+                    'source': file_path,
+                    'file_path': file_path,
+                    'page': index,
+                    'extractor': used
+                }
+            )
+    finally:
+        if slow_path is not None:
+            slow_path.close()
@@ -0,0 +1,189 @@
+import re
+import os
+import threading
+from typing import List, Dict, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from config import Config
+
+CHITCHAT = "chitchat"
+LOOKUP = "lookup"
+NOT_FOUND = "not_found"
+RAG = "rag"
+
+# Whole-message patterns only: "hi, what is section 420?" still goes to retrieval
+CHITCHAT_PATTERNS = [
+    ('greeting', re.compile(
+        r"^(hi+|hello+|hey+|hiya|namaste|namaskar|greetings|good\s+(morning|afternoon|evening|day))"
+        r"(\s+(there|all|everyone|sir|madam))?$"
+    )),
+    ('thanks', re.compile(
+        r"^((ok(ay)?|great|cool|perfect)\s+)?(thanks?|thank\s+you|thx|ty|much\s+appreciated)"
+        r"(\s+(a\s+lot|so\s+much|very\s+much))?$"
+    )),
+    ('farewell', re.compile(r"^(bye+|goodbye|good\s+night|see\s+you(\s+later)?|take\s+care)$")),
+    ('help', re.compile(
+        r"^(who\s+are\s+you|what\s+are\s+you|what\s+can\s+you\s+do|how\s+can\s+you\s+help(\s+me)?|help(\s+me)?|"
+        r"how\s+does\s+this\s+work)$"
+    )),
+]
+
+CHITCHAT_REPLIES = {
+    'greeting': "Hello! I'm your AI legal assistant for Indian law. Ask me a question about the uploaded "
+                "legal documents, for example \"What is the punishment under Section 302?\"",
+    'thanks': "You're welcome! Let me know if you have any other questions about the uploaded legal documents.",
+    'farewell': "Goodbye! Remember that my answers are for information only and are not legal advice.",
+    'help': "I answer questions about Indian law using the legal documents uploaded to this system. Ask about "
+            "a provision (\"What does Article 21 say?\"), a legal concept, or the contents of a judgment, and "
+            "I'll answer with citations to the relevant documents.",
+}
+
+# Provision references as people type them: "Section 420", "sec. 302", "s. 34", "u/s 498A", "Art. 21"
+PROVISION_REFERENCES = [
+    ('Section', re.compile(r"\b(?:sections?|secs?\.?|s\.|u/s\.?)\s*(\d{1,4}[a-z]{0,2})\b", re.IGNORECASE)),
+    ('Article', re.compile(r"\b(?:articles?|arts?\.)\s*(\d{1,3}[a-z]{0,2})\b", re.IGNORECASE)),
+    ('Rule', re.compile(r"\brules?\s+(\d{1,3}[a-z]?)\b", re.IGNORECASE)),
+    ('Clause', re.compile(r"\bclauses?\s+(\d{1,3}(?:\.\d+)*)\b", re.IGNORECASE)),
+]
+
+# Words that, next to a provision reference, still mean "show me the text"
+LOOKUP_WORDS = {
+    'what', 'whats', 'is', 'does', 'do', 'say', 'says', 'state', 'states', 'text', 'of', 'the', 'a', 'show', 'me',
+    'read', 'quote', 'full', 'provision', 'provisions', 'print', 'display', 'give', 'get', 'under', 'in', 'please',
+    'act', 'code', 'constitution', 'india', 'indian', 'penal', 'criminal', 'civil', 'procedure', 'evidence',
+    'ipc', 'crpc', 'cpc', 'bns', 'bnss', 'section', 'sections', 'sec', 'article', 'articles', 'art', 'rule',
+    'rules', 'clause', 'clauses', 'us', 's', 'and', 'contents', 'wording', 'exact', 'verbatim'
+}
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Bare Act headings repeat the number: "302. Punishment for murder."
+HEADING_NUMBER = re.compile(r"^\s*\d{1,4}[A-Z]{0,2}\.\s*")
+
+
+def similarity_from_distance(distance: float) -> float:
+    """Cosine similarity from the squared L2 distance FAISS returns for normalized embeddings"""
+    return 1.0 - float(distance) / 2.0
+
+
+class QueryRouter:
+    """Cheap checks that let a question skip retrieval, the LLM, or both"""
+
+    def __init__(self, min_similarity: float = None, provision_lookup: bool = None):
+        self.min_similarity = Config.ROUTER_MIN_SIMILARITY if min_similarity is None else min_similarity
+        self.provision_lookup = Config.ROUTER_PROVISION_LOOKUP if provision_lookup is None else provision_lookup
+        self._lock = threading.Lock()
+        self._provision_index: Optional[Dict[str, List[str]]] = None
+        self._indexed_docstore = None
+
+    @staticmethod
+    def _normalize(question: str) -> str:
+        return " ".join(WORD_PATTERN.findall(question.lower().replace("'", "")))
+
+    def chitchat_reply(self, question: str) -> Optional[str]:
+        """Canned reply when the whole message is small talk"""
+        text = self._normalize(question)
+        for kind, pattern in CHITCHAT_PATTERNS:
+            if pattern.match(text):
+                return CHITCHAT_REPLIES[kind]
+        return None
+
+    def provision_references(self, question: str) -> List[str]:
+        """Provision labels in the chunker's metadata format, e.g. "Section 498A" """
+        if not self.provision_lookup:
+            return []
+        references = []
+        for label, pattern in PROVISION_REFERENCES:
+            for match in pattern.finditer(question):
+                reference = f"{label} {match.group(1).upper()}"
+                if reference not in references:
+                    references.append(reference)
+        return references
+
+    def invalidate(self):
+        """Drop the provision index after the vector store changed"""
+        with self._lock:
+            self._provision_index = None
+
+    def _index_for(self, docstore: Dict[str, Document]) -> Dict[str, List[str]]:
+        with self._lock:
+            if self._provision_index is None or self._indexed_docstore is not docstore:
+                index: Dict[str, List[str]] = {}
+                # Snapshot the items: a concurrent ingest may be adding chunks
+                for chunk_id, document in list(docstore.items()):
+                    for provision in document.metadata.get('provisions', []):
+                        index.setdefault(provision, []).append(chunk_id)
+                self._provision_index = index
+                self._indexed_docstore = docstore
+            return self._provision_index
+
+    def find_provisions(self, references: List[str], docstore: Dict[str, Document],
+                        question: str) -> List[Document]:
+        """Chunks that contain the referenced provisions in document order, preferring the act the question names"""
+        if not references:
+            return []
+        index = self._index_for(docstore)
+        documents = [docstore[chunk_id] for reference in references
+                     for chunk_id in index.get(reference, []) if chunk_id in docstore]
+        if not documents:
+            return []
+
+        # "Section 302 IPC" exists in several acts: keep the sources whose name shares words with the question
+        question_words = set(WORD_PATTERN.findall(question.lower())) - LOOKUP_WORDS
+        by_source: Dict[str, List[Document]] = {}
+        for document in documents:
+            by_source.setdefault(self._source_name(document), []).append(document)
+        overlap = {
+            source: len(question_words & set().union(*(self._source_words(doc) for doc in docs)))
+            for source, docs in by_source.items()
+        }
+        best = max(overlap.values())
+        if best > 0:
+            documents = [doc for source, docs in by_source.items() if overlap[source] == best for doc in docs]
+        return sorted(documents, key=lambda doc: (self._source_name(doc), doc.metadata.get('chunk_id', 0)))
+
+    def is_lookup(self, question: str, documents: List[Document]) -> bool:
+        """True when the question asks for nothing beyond the provision's text"""
+        if not documents:
+            return False
+        words = set(WORD_PATTERN.findall(question.lower()))
+        for _, pattern in PROVISION_REFERENCES:
+            for match in pattern.finditer(question):
+                words.discard(match.group(1).lower())
+        source_words = set().union(*(self._source_words(document) for document in documents))
+        return not (words - LOOKUP_WORDS - source_words)
+
+    def is_relevant(self, scored_documents: List[Tuple[Document, float]]) -> bool:
+        """False when even the best match is too far from the question to support an answer"""
+        if not scored_documents:
+            return False
+        if self.min_similarity <= 0:
+            return True
+        best = max(similarity_from_distance(score) for _, score in scored_documents)
+        return best >= self.min_similarity
+
+    @staticmethod
+    def _source_name(document: Document) -> str:
+        return os.path.basename(str(document.metadata.get('source_file', document.metadata.get('source', 'unknown'))))
+
+    @staticmethod
+    def _source_words(document: Document) -> set:
+        """Words of the source name and file name, e.g. {"indian", "penal", "code", "pdf"}"""
+        names = f"{document.metadata.get('source', '')} {document.metadata.get('source_file', '')}"
+        return set(WORD_PATTERN.findall(os.path.basename(names).lower()) + WORD_PATTERN.findall(names.lower()))
+
+    def format_lookup(self, references: List[str], documents: List[Document]) -> str:
+        """The provision text itself, with citations"""
+        sections = []
+        for document in documents:
+            metadata = document.metadata
+            heading = metadata.get('heading')
+            title = ", ".join(p for p in metadata.get('provisions', []) if p in references) or references[0]
+            if heading:
+                title = f"{title} - {HEADING_NUMBER.sub('', heading)}"
+            sections.append(
+                f"{title} ({self._source_name(document)}, page {metadata.get('page', 0)}):\n"
+                f"{document.page_content.strip()}"
+            )
+        return "Text of the requested provision from the uploaded legal documents:\n\n" + "\n\n".join(sections)
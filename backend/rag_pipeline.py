@@ -1,44 +1,154 @@
 import os
+import pickle
+import shutil
 import logging
-from typing import List, Dict, Any, Optional
+import tempfile
+import time
+import threading
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Callable, TYPE_CHECKING
+from itertools import islice
 from pathlib import Path
 
-from langchain_community.document_loaders import PDFPlumberLoader, Docx2txtLoader, TextLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.vectorstores import FAISS
-from langchain_groq import ChatGroq
-from langchain.chains import RetrievalQA
-from langchain.prompts import PromptTemplate
-from langchain.schema import Document
+from langchain_core.documents import Document
 
 from config import Config
+from llm_client import ManagedLLMClient, LLMUnavailableError
+from llm_backends import LLMBackend, create_llm_backend, NOT_FOUND_ANSWER
+from context_builder import ContextBuilder
+from reranker import CrossEncoderReranker
+from legal_chunker import LegalDocumentChunker
+from pdf_extraction import iter_pdf_pages
+from text_cache import ExtractedTextCache
+from utils.helpers import calculate_file_hash
+from document_registry import DocumentRegistry, make_chunk_id
+from index_sync import IndexSync
+from single_flight import SingleFlight
+from summarizer import SummaryStore
+from query_router import QueryRouter, CHITCHAT, LOOKUP, NOT_FOUND, RAG
 
-# Configure logging
-logging.basicConfig(
-    level=getattr(logging, Config.LOG_LEVEL),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(Config.LOG_FILE),
-        logging.StreamHandler()
-    ]
+# Loaders, splitters, FAISS and the model libraries are imported by the stage that first needs them,
+# so importing this module (and serving endpoints that never query) stays cheap
+if TYPE_CHECKING:
+    from langchain_community.vectorstores import FAISS
+    from langchain_core.embeddings import Embeddings
+from metrics import (
+    StageTimer, QUERY_STAGE_SECONDS, QUERY_SECONDS, QUERIES_TOTAL, CONTEXT_TOKENS, ANSWER_TOKENS,
+    INGEST_STAGE_SECONDS, INGEST_CHUNKS, CHUNKS_INGESTED_TOTAL, DOCUMENTS_INGESTED_TOTAL
 )
+
 logger = logging.getLogger(__name__)
 
+def normalize_question(question: str) -> str:
+    """Case- and whitespace-insensitive form used to recognise identical questions"""
+    return " ".join(question.casefold().split()).rstrip("?.! ")
+
+def create_embeddings() -> "Embeddings":
+    """Initialize sentence embeddings with PyTorch or the exported ONNX model"""
+    try:
+        if Config.EMBEDDING_BACKEND == 'onnx':
+            from onnx_embeddings import OnnxEmbeddings
+            embeddings = OnnxEmbeddings()
+        else:
+            from langchain_community.embeddings import HuggingFaceEmbeddings
+            embeddings = HuggingFaceEmbeddings(
+                model_name=Config.EMBEDDING_MODEL,
+                model_kwargs={'device': 'cpu'},
+                encode_kwargs={'normalize_embeddings': True, 'batch_size': Config.EMBEDDING_BATCH_SIZE}
+            )
+        logger.info(f"Embeddings initialized with model: {Config.EMBEDDING_MODEL} ({Config.EMBEDDING_BACKEND})")
+        return embeddings
+    except Exception as e:
+        logger.error(f"Failed to initialize embeddings: {str(e)}")
+        raise
+
+def extract_pages(file_path: str) -> Iterator[Document]:
+    """Parse a document into pages with the extractor for its format"""
+    file_extension = Path(file_path).suffix.lower()
+    
+    if file_extension == '.pdf':
+        # Fast extractor per page, pdfplumber only for pages with poor text
+        yield from iter_pdf_pages(file_path)
+        return
+    
+    from langchain_community.document_loaders import Docx2txtLoader, TextLoader
+    if file_extension == '.docx':
+        loader = Docx2txtLoader(file_path)
+    else:
+        loader = TextLoader(file_path, encoding='utf-8')
+    
+    yield from loader.lazy_load()
+
+def iter_chunks(pages: Iterable[Document], chunker: Optional[str] = None,
+                source_name: Optional[str] = None) -> Iterator[Document]:
+    """Lazily split a stream of pages into chunks, numbering chunks per source file"""
+    chunker = chunker or Config.CHUNKER
+    if chunker == 'legal':
+        # Section/article/clause aware chunks, overlap only inside oversized sections
+        chunks = LegalDocumentChunker().split(pages)
+    elif chunker == 'recursive':
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=Config.CHUNK_SIZE,
+            chunk_overlap=Config.CHUNK_OVERLAP,
+            separators=["\n\n", "\n", ". ", " ", ""],
+            add_start_index=True  # Lets the context builder merge overlapping neighbours
+        )
+        chunks = (chunk for page in pages for chunk in text_splitter.split_documents([page]))
+    else:
+        raise ValueError(f"Unknown chunker: {chunker}")
+    
+    # Add metadata to chunks
+    next_chunk_id: Dict[str, int] = {}
+    for chunk in chunks:
+        source = source_name or chunk.metadata.get('source', 'unknown')
+        chunk_id = next_chunk_id.get(source, 0)
+        next_chunk_id[source] = chunk_id + 1
+        chunk.metadata.update({
+            'chunk_id': chunk_id,
+            'chunk_uid': make_chunk_id(source, chunk_id),
+            'source_file': source,
+            'page': chunk.metadata.get('page', 0)
+        })
+        yield chunk
+
 class LegalRAGPipeline:
     """Production-ready RAG pipeline for Legal AI Advisor"""
     
-    def __init__(self):
-        """Initialize the RAG pipeline"""
+    def __init__(self, embeddings: Optional["Embeddings"] = None, llm_backend: Optional[LLMBackend] = None,
+                 index_path: Optional[str] = None, llm_client: Optional[ManagedLLMClient] = None,
+                 reranker: Optional[CrossEncoderReranker] = None, text_cache: Optional[ExtractedTextCache] = None):
+        """Initialize the RAG pipeline; components can be injected for offline use, benchmarks and
+        for collections that share one set of models"""
         try:
-            Config.validate_config()
-            self.embeddings = self._initialize_embeddings()
-            self.llm = self._initialize_llm()
+            if embeddings is None or llm_backend is None:
+                Config.validate_config()
+            self.index_path = index_path or Config.FAISS_INDEX_PATH
+            # The model's own embeddings; self.embeddings adds the index's projection when it was built reduced
+            self.base_embeddings = embeddings or self._initialize_embeddings()
+            self.embeddings = self.base_embeddings
+            self.projection = None
+            self.llm_backend = llm_backend or self._initialize_llm()
+            # One client per backend, so collections share its concurrency limit and circuit breaker
+            self.llm_client = llm_client or ManagedLLMClient(self.llm_backend)
+            self.context_builder = ContextBuilder()
+            self.reranker = reranker or self._initialize_reranker()
+            self.text_cache = text_cache or (ExtractedTextCache() if Config.TEXT_CACHE_ENABLED else None)
             self.vector_store = None
-            self.qa_chain = None
+            self.registry = DocumentRegistry(self.index_path)
+            self.summary_store = SummaryStore(self.index_path)
+            self.index_sync = IndexSync(self.index_path, Config.INDEX_RELOAD_INTERVAL)
+            self.index_version = None
+            self._index_mapped = False
+            self._write_lock = threading.RLock()
+            self.single_flight = SingleFlight()
+            self._stats_lock = threading.Lock()
+            self._llm_calls_saved = 0
+            self.router = QueryRouter() if Config.QUERY_ROUTING else None
+            self.prompt = None
             self.conversation_history = []
             
-            # Try to load existing vector store
+            # Try to load existing vector store, seeding an empty node from a snapshot bundle first
+            self._bootstrap_from_snapshot()
             self.load_vector_store()
             
             logger.info("RAG Pipeline initialized successfully")
@@ -46,49 +156,38 @@ class LegalRAGPipeline:
             logger.error(f"Failed to initialize RAG Pipeline: {str(e)}")
             raise
     
-    def _initialize_embeddings(self) -> HuggingFaceEmbeddings:
-        """Initialize HuggingFace embeddings"""
+    def _initialize_embeddings(self) -> "Embeddings":
+        """Initialize sentence embeddings with PyTorch or the exported ONNX model"""
+        return create_embeddings()
+    
+    def _initialize_llm(self) -> LLMBackend:
+        """Initialize the configured answer generation backend"""
         try:
-            embeddings = HuggingFaceEmbeddings(
-                model_name=Config.EMBEDDING_MODEL,
-                model_kwargs={'device': 'cpu'},
-                encode_kwargs={'normalize_embeddings': True}
-            )
-            logger.info(f"Embeddings initialized with model: {Config.EMBEDDING_MODEL}")
-            return embeddings
+            backend = create_llm_backend(Config.LLM_BACKEND)
+            logger.info(f"LLM initialized with backend: {backend.name} ({backend.model_name})")
+            return backend
         except Exception as e:
-            logger.error(f"Failed to initialize embeddings: {str(e)}")
+            logger.error(f"Failed to initialize LLM: {str(e)}")
             raise
     
-    def _initialize_llm(self) -> ChatGroq:
-        """Initialize Groq LLM"""
+    def _initialize_reranker(self) -> Optional[CrossEncoderReranker]:
+        """Initialize the optional cross-encoder reranking stage"""
+        if not Config.RERANK_ENABLED:
+            return None
         try:
-            llm = ChatGroq(
-                model=Config.LLM_MODEL,
-                temperature=0.1,  # Low temperature for legal accuracy
-                groq_api_key=Config.GROQ_API_KEY
-            )
-            logger.info(f"LLM initialized with model: {Config.LLM_MODEL}")
-            return llm
+            reranker = CrossEncoderReranker()
+            reranker.warm_up()
+            logger.info(f"Reranker enabled: {Config.RERANK_CANDIDATES} candidates, {Config.RERANK_BUDGET_MS}ms budget")
+            return reranker
         except Exception as e:
-            logger.error(f"Failed to initialize LLM: {str(e)}")
-            raise
+            # Reranking is an optimisation; serve plain FAISS order rather than failing startup
+            logger.error(f"Failed to initialize reranker, continuing without it: {str(e)}")
+            return None
     
     def load_documents(self, file_path: str) -> List[Document]:
         """Load documents from various file formats"""
         try:
-            file_extension = Path(file_path).suffix.lower()
-            
-            if file_extension == '.pdf':
-                loader = PDFPlumberLoader(file_path)
-            elif file_extension == '.docx':
-                loader = Docx2txtLoader(file_path)
-            elif file_extension == '.txt':
-                loader = TextLoader(file_path, encoding='utf-8')
-            else:
-                raise ValueError(f"Unsupported file format: {file_extension}")
-            
-            documents = loader.load()
+            documents = list(self.iter_documents(file_path))
             logger.info(f"Loaded {len(documents)} pages from {file_path}")
             return documents
             
@@ -96,66 +195,89 @@ class LegalRAGPipeline:
             logger.error(f"Failed to load documents from {file_path}: {str(e)}")
             raise
     
-    def split_documents(self, documents: List[Document]) -> List[Document]:
+    def iter_documents(self, file_path: str, content_hash: Optional[str] = None) -> Iterator[Document]:
+        """Lazily yield the pages of a document one at a time, from the text cache when possible"""
+        file_extension = Path(file_path).suffix.lower()
+        if file_extension not in ('.pdf', '.docx', '.txt'):
+            raise ValueError(f"Unsupported file format: {file_extension}")
+        
+        if self.text_cache is None:
+            yield from extract_pages(file_path)
+            return
+        
+        content_hash = content_hash or calculate_file_hash(file_path)
+        cached_pages = self.text_cache.get(content_hash, file_path)
+        if cached_pages is not None:
+            logger.info(f"Using cached text for {file_path}")
+            yield from cached_pages
+        else:
+            yield from self.text_cache.write_through(content_hash, file_path, extract_pages(file_path))
+    
+    def split_documents(self, documents: List[Document], chunker: Optional[str] = None) -> List[Document]:
         """Split documents into chunks using intelligent chunking"""
         try:
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=Config.CHUNK_SIZE,
-                chunk_overlap=Config.CHUNK_OVERLAP,
-                separators=["\n\n", "\n", ". ", " ", ""]
-            )
-            
-            chunks = text_splitter.split_documents(documents)
+            chunker = chunker or Config.CHUNKER
+            chunks = list(self.iter_chunks(documents, chunker))
             
-            # Add metadata to chunks
-            for i, chunk in enumerate(chunks):
-                chunk.metadata.update({
-                    'chunk_id': i,
-                    'source_file': chunk.metadata.get('source', 'unknown'),
-                    'page': chunk.metadata.get('page', 0)
-                })
-            
-            logger.info(f"Split documents into {len(chunks)} chunks")
+            logger.info(f"Split documents into {len(chunks)} chunks using {chunker} chunker")
             return chunks
             
         except Exception as e:
             logger.error(f"Failed to split documents: {str(e)}")
             raise
     
-    def create_vector_store(self, chunks: List[Document]) -> FAISS:
-        """Create and save FAISS vector store"""
-        try:
-            # Create FAISS index
-            vector_store = FAISS.from_documents(chunks, self.embeddings)
-            
-            # Save to disk
-            os.makedirs(Config.FAISS_INDEX_PATH, exist_ok=True)
-            vector_store.save_local(Config.FAISS_INDEX_PATH)
-            
-            self.vector_store = vector_store
-            logger.info(f"Created and saved vector store with {len(chunks)} chunks")
-            return vector_store
-            
-        except Exception as e:
-            logger.error(f"Failed to create vector store: {str(e)}")
-            raise
+    def iter_chunks(self, pages: Iterable[Document], chunker: Optional[str] = None,
+                    source_name: Optional[str] = None) -> Iterator[Document]:
+        """Lazily split a stream of pages into chunks, numbering chunks per source file"""
+        return iter_chunks(pages, chunker, source_name)
     
-    def load_vector_store(self) -> FAISS:
+    def _load_projection(self):
+        """Embed with the saved index's projection, or with the plain model when it has none"""
+        from embedding_projection import EmbeddingProjection, ProjectedEmbeddings, PROJECTION_FILE
+        projection = EmbeddingProjection.load(os.path.join(self.index_path, PROJECTION_FILE))
+        self.projection = projection
+        self.embeddings = ProjectedEmbeddings(self.base_embeddings, projection) if projection else self.base_embeddings
+    
+    def reduce_dimensions(self, dim: Optional[int] = None, method: Optional[str] = None) -> Dict[str, Any]:
+        """Project the saved full-dimension index to fewer dimensions in place and reload it"""
+        from embedding_projection import reduce_index
+        with self._write_lock, self.index_sync.writer():
+            result = reduce_index(self.index_path, dim, method, sync=self.index_sync)
+            if result["success"]:
+                self.load_vector_store()
+                self.create_qa_chain()
+            return result
+    
+    def reduce_if_configured(self, min_vectors: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Reduce a full-dimension index to EMBEDDING_REDUCED_DIM once it holds min_vectors; None when not due"""
+        if not Config.EMBEDDING_REDUCED_DIM or self.projection is not None or self.vector_store is None:
+            return None
+        min_vectors = Config.EMBEDDING_REDUCTION_MIN_VECTORS if min_vectors is None else min_vectors
+        if self.vector_store.index.ntotal < max(min_vectors, 1):
+            return None
+        return self.reduce_dimensions()
+    
+    def load_vector_store(self) -> "FAISS":
         """Load existing FAISS vector store"""
         try:
-            index_file = os.path.join(Config.FAISS_INDEX_PATH, "index.faiss")
-            pkl_file = os.path.join(Config.FAISS_INDEX_PATH, "index.pkl")
+            index_file = os.path.join(self.index_path, "index.faiss")
+            pkl_file = os.path.join(self.index_path, "index.pkl")
             
             if os.path.exists(index_file) and os.path.exists(pkl_file):
-                vector_store = FAISS.load_local(
-                    Config.FAISS_INDEX_PATH, 
-                    self.embeddings,
-                    allow_dangerous_deserialization=True
-                )
+                # Another process may be saving; wait for it so we never read half-written files
+                with self.index_sync.loading():
+                    self._load_projection()
+                    vector_store = self._read_faiss(index_file, pkl_file)
+                    self.registry.load()
+                    self.index_version = self.index_sync.read_version()
                 self.vector_store = vector_store
+                if not self.registry.exists():
+                    self.registry.rebuild_from_docstore(vector_store.docstore._dict)
                 logger.info("Loaded existing vector store")
                 return vector_store
             else:
+                self.registry.load()
+                self.index_version = self.index_sync.read_version()
                 logger.warning("No existing vector store found")
                 return None
                 
@@ -164,6 +286,35 @@ class LegalRAGPipeline:
             # If loading fails, try to continue without existing store
             return None
     
+    def _read_faiss(self, index_file: str, pkl_file: str) -> "FAISS":
+        """Load the saved index, memory-mapping the vectors when INDEX_MMAP is set"""
+        import faiss
+        from langchain_community.vectorstores import FAISS
+        mmap_flag = getattr(faiss, 'IO_FLAG_MMAP_IFC', None)
+        if not Config.INDEX_MMAP or mmap_flag is None:
+            self._index_mapped = False
+            return FAISS.load_local(self.index_path, self.embeddings, allow_dangerous_deserialization=True)
+        
+        # Vectors stay in the page cache, shared by every worker and process mapping the same file
+        index = faiss.read_index(index_file, mmap_flag)
+        with open(pkl_file, 'rb') as f:
+            docstore, index_to_docstore_id = pickle.load(f)
+        self._index_mapped = True
+        return FAISS(self.embeddings, index, docstore, index_to_docstore_id)
+    
+    def _bootstrap_from_snapshot(self):
+        """Import INDEX_SNAPSHOT_PATH when this node has no saved default index yet"""
+        if not Config.INDEX_SNAPSHOT_PATH or self.index_path != Config.FAISS_INDEX_PATH:
+            return
+        if os.path.exists(os.path.join(self.index_path, "index.faiss")):
+            return
+        from snapshot import import_snapshot
+        
+        result = import_snapshot(Config.INDEX_SNAPSHOT_PATH, self.index_path)
+        if not result["success"]:
+            # Serving starts empty, as it would without a snapshot; uploads still work
+            logger.error(f"Snapshot bootstrap failed: {result['error']}")
+    
     def create_qa_chain(self):
         """Create RAG QA chain with legal-specific prompt"""
         try:
@@ -185,107 +336,420 @@ class LegalRAGPipeline:
             
             Answer:"""
             
-            prompt = PromptTemplate(
+            from langchain_core.prompts import PromptTemplate
+            self.prompt = PromptTemplate(
                 template=template,
                 input_variables=["context", "question"]
             )
             
-            # Create retriever
-            retriever = self.vector_store.as_retriever(
-                search_type="similarity",
-                search_kwargs={"k": Config.RETRIEVAL_K}
-            )
-            
-            # Create QA chain
-            self.qa_chain = RetrievalQA.from_chain_type(
-                llm=self.llm,
-                chain_type="stuff",
-                retriever=retriever,
-                chain_type_kwargs={"prompt": prompt},
-                return_source_documents=True
-            )
-            
             logger.info("QA chain created successfully")
             
         except Exception as e:
             logger.error(f"Failed to create QA chain: {str(e)}")
             raise
     
-    def query(self, question: str) -> Dict[str, Any]:
-        """Query the RAG system"""
+    def query(self, question: str, k: Optional[int] = None) -> Dict[str, Any]:
+        """Query the RAG system; identical concurrent questions share one retrieval and LLM call"""
+        k = k or Config.RETRIEVAL_K
+        if not Config.QUERY_COALESCING:
+            return self._answer(question, k)
+        
+        result, shared = self.single_flight.do(
+            (normalize_question(question), k), lambda: self._answer(question, k)
+        )
+        if not shared:
+            return result
+        
+        QUERIES_TOTAL.inc(outcome="coalesced")
+        # Only a leader that actually got an answer from the LLM saved its followers a call
+        if result.get("route") == RAG and not result.get("error") and not result.get("degraded"):
+            with self._stats_lock:
+                self._llm_calls_saved += 1
+        response = dict(result)
+        response["question"] = question
+        response["coalesced"] = True
+        return response
+    
+    def _answer(self, question: str, k: int) -> Dict[str, Any]:
+        """Retrieve, pack and generate the answer for one question"""
+        start = time.perf_counter()
+        timer = StageTimer(QUERY_STAGE_SECONDS)
         try:
-            if not self.qa_chain:
-                self.load_vector_store()
-                self.create_qa_chain()
-            
             # Add to conversation history
             self.conversation_history.append({"question": question})
             
-            # Get response
-            result = self.qa_chain({"query": question})
+            # Small talk needs neither the index nor the LLM
+            if self.router:
+                reply = self.router.chitchat_reply(question)
+                if reply is not None:
+                    return self._routed_response(question, reply, [], CHITCHAT, timer)
             
-            # Extract sources
-            sources = []
-            if "source_documents" in result:
-                for doc in result["source_documents"]:
-                    sources.append({
-                        "content": doc.page_content[:200] + "...",
-                        "metadata": doc.metadata
-                    })
+            if not self.prompt:
+                self.load_vector_store()
+                if self.vector_store is None and self.router:
+                    return self._routed_response(question, NOT_FOUND_ANSWER, [], NOT_FOUND, timer)
+                self.create_qa_chain()
+            self.refresh_if_stale()
+            
+            # Bare provision lookups are answered with the provision's own text
+            provision_documents = []
+            if self.router:
+                with timer.stage("route"):
+                    references = self.router.provision_references(question)
+                    provision_documents = self.router.find_provisions(
+                        references, self.vector_store.docstore._dict, question
+                    )[:k]
+                if self.router.is_lookup(question, provision_documents):
+                    answer = self.router.format_lookup(references, provision_documents)
+                    return self._routed_response(question, answer, provision_documents, LOOKUP, timer)
+            
+            # Retrieve relevant chunks, over-fetching when a reranker will pick the best few
+            fetch_k = max(k, Config.RERANK_CANDIDATES) if self.reranker else k
+            with timer.stage("embed"):
+                query_vector = self.embeddings.embed_query(question)
+            with timer.stage("search"):
+                scored_documents = self.vector_store.similarity_search_with_score_by_vector(query_vector, k=fetch_k)
+            
+            # Nothing close enough to answer from: say so without spending an LLM call
+            if self.router and not provision_documents and not self.router.is_relevant(scored_documents):
+                return self._routed_response(question, NOT_FOUND_ANSWER, [], NOT_FOUND, timer)
+            
+            rerank_info = None
+            if self.reranker:
+                with timer.stage("rerank"):
+                    scored_documents, rerank_info = self.reranker.rerank(question, scored_documents, top_n=k)
+            
+            # The provisions the question names go first, ahead of whatever the search found
+            if provision_documents:
+                best_score = min((score for _, score in scored_documents), default=0.0)
+                named = {doc.metadata.get('chunk_uid') for doc in provision_documents}
+                scored_documents = [(doc, best_score) for doc in provision_documents] + [
+                    (doc, score) for doc, score in scored_documents if doc.metadata.get('chunk_uid') not in named
+                ]
+            
+            # Pack the chunks into the token budget
+            with timer.stage("context"):
+                context = self.context_builder.build(scored_documents)
+                prompt = self.prompt.format(context=context["context"], question=question)
+            source_documents = context["documents"]
+            CONTEXT_TOKENS.observe(context["context_tokens"])
+            
+            degraded = False
+            try:
+                with timer.stage("llm"):
+                    answer = self.llm_client.generate(prompt, question, source_documents)
+                ANSWER_TOKENS.observe(self.context_builder.token_counter.count(answer))
+            except LLMUnavailableError as e:
+                logger.warning(f"LLM unavailable, returning retrieved passages only: {str(e)}")
+                answer = self._passages_only_answer(source_documents)
+                degraded = True
             
             response = {
-                "answer": result["result"],
-                "sources": sources,
-                "question": question
+                "answer": answer,
+                "sources": self._format_sources(source_documents),
+                "question": question,
+                "context_tokens": context["context_tokens"],
+                "timings": timer.as_ms(),
+                "route": RAG
             }
+            if rerank_info:
+                response["rerank_ms"] = rerank_info["rerank_ms"]
+                response["reranked"] = rerank_info["reranked"]
+            if degraded:
+                response["degraded"] = True
             
             # Add to conversation history
             self.conversation_history.append({"answer": response["answer"]})
             
-            logger.info(f"Query processed successfully: {question[:50]}...")
+            QUERIES_TOTAL.inc(outcome="degraded" if degraded else "ok")
+            logger.info(f"Query processed successfully: {question[:50]}...", extra={"timings": response["timings"]})
             return response
             
         except Exception as e:
+            QUERIES_TOTAL.inc(outcome="error")
             logger.error(f"Failed to process query: {str(e)}")
             return {
                 "answer": "I apologize, but I encountered an error processing your question. Please try again.",
                 "sources": [],
                 "question": question,
-                "error": str(e)
+                "error": str(e),
+                "timings": timer.as_ms()
             }
+        finally:
+            QUERY_SECONDS.observe(time.perf_counter() - start)
     
-    def add_documents(self, file_path: str) -> bool:
-        """Add new documents to the vector store"""
-        try:
-            # Load and split documents
-            documents = self.load_documents(file_path)
-            chunks = self.split_documents(documents)
-            
-            if len(chunks) == 0:
-                logger.warning(f"No chunks created from {file_path}")
-                return False
-            
-            # Load existing vector store or create new one
-            if self.vector_store is None:
+    def _routed_response(self, question: str, answer: str, documents: List[Document],
+                         route: str, timer: StageTimer) -> Dict[str, Any]:
+        """Response for a question the router answered without the full retrieval and LLM path"""
+        response = {
+            "answer": answer,
+            "sources": self._format_sources(documents),
+            "question": question,
+            "context_tokens": 0,
+            "timings": timer.as_ms(),
+            "route": route
+        }
+        self.conversation_history.append({"answer": answer})
+        QUERIES_TOTAL.inc(outcome=route)
+        logger.info(f"Query routed to {route}: {question[:50]}...", extra={"timings": response["timings"]})
+        return response
+    
+    def _format_sources(self, documents: List[Document]) -> List[Dict[str, Any]]:
+        """Format retrieved documents as source citations"""
+        return [
+            {
+                "content": doc.page_content[:200] + "...",
+                "metadata": doc.metadata
+            }
+            for doc in documents
+        ]
+    
+    def _passages_only_answer(self, documents: List[Document]) -> str:
+        """Fallback answer listing retrieved passages when the LLM cannot be reached"""
+        if not documents:
+            return "I cannot find this information in the uploaded legal documents."
+        
+        passages = []
+        for i, doc in enumerate(documents, 1):
+            source = os.path.basename(str(doc.metadata.get('source_file', doc.metadata.get('source', 'unknown'))))
+            passages.append(f"[{i}] {source} (page {doc.metadata.get('page', 0)}):\n{doc.page_content.strip()}")
+        
+        return (
+            "The AI answer service is temporarily unavailable. "
+            "These are the most relevant passages from the uploaded legal documents:\n\n"
+            + "\n\n".join(passages)
+        )
+    
+    def add_documents(self, file_path: str, source_name: Optional[str] = None,
+                      content_hash: Optional[str] = None, save: bool = True,
+                      embedded: Optional[Dict[str, tuple]] = None,
+                      on_batch: Optional[Callable[[List[Document], List[List[float]]], None]] = None) -> bool:
+        """Add new documents to the vector store, replacing any earlier version of the same source
+        
+        Bulk ingestion passes save=False and persists with save_index() at its own checkpoints;
+        embedded maps chunk ids to (text, vector) pairs computed before an interruption, and
+        on_batch receives every freshly indexed batch with its vectors.
+        """
+        source = source_name or file_path
+        chunk_ids = []
+        with self._write_lock, self.index_sync.writer():
+            try:
+                # Start from the latest saved index, which another process may have written
+                self._sync_before_write()
+                
+                content_hash = content_hash or calculate_file_hash(file_path)
+                
+                # Replace-on-reupload: drop the previous version's vectors in place
+                replaced = self._remove_source(source)
+                
+                # Stream pages -> chunks -> embeddings in bounded batches
+                timer = StageTimer(INGEST_STAGE_SECONDS)
+                chunks = self.iter_chunks(self.iter_documents(file_path, content_hash), source_name=source)
+                while True:
+                    # Pages are extracted and split lazily, so pulling a batch times both
+                    with timer.stage("extract_split"):
+                        batch = list(islice(chunks, Config.INGEST_BATCH_SIZE))
+                    if not batch:
+                        break
+                    vectors = self._index_chunks(batch, timer, embedded)
+                    chunk_ids.extend(chunk.metadata['chunk_uid'] for chunk in batch)
+                    if on_batch is not None:
+                        on_batch(batch, vectors)
+                
+                if not chunk_ids:
+                    logger.warning(f"No chunks created from {file_path}")
+                    if replaced and save:
+                        self._save_index()
+                    DOCUMENTS_INGESTED_TOTAL.inc(outcome="empty")
+                    return False
+                
+                self.registry.register(source, chunk_ids, content_hash)
+                if save:
+                    with timer.stage("save"):
+                        self._save_index()
+                    # PCA is fitted on the saved vectors, so the index is projected once it is large enough;
+                    # later uploads embed straight into the reduced space
+                    reduction = self.reduce_if_configured()
+                    if reduction is not None and not reduction["success"]:
+                        logger.warning(f"Index kept at full dimension: {reduction['error']}")
+                
+                # Recreate QA chain with updated vector store
+                self.create_qa_chain()
+                
+                CHUNKS_INGESTED_TOTAL.inc(len(chunk_ids))
+                INGEST_CHUNKS.observe(len(chunk_ids))
+                DOCUMENTS_INGESTED_TOTAL.inc(outcome="replaced" if replaced else "added")
+                
+                action = "Replaced" if replaced else "Added"
+                logger.info(f"{action} {len(chunk_ids)} chunks from {file_path} as '{source}'")
+                return True
+                
+            except Exception as e:
+                DOCUMENTS_INGESTED_TOTAL.inc(outcome="error")
+                logger.error(f"Failed to add documents: {str(e)}")
+                if not save and self.vector_store is not None:
+                    # Reloading would also discard other unsaved files; drop only this file's partial chunks
+                    partial = [chunk_id for chunk_id in chunk_ids if chunk_id in self.vector_store.docstore._dict]
+                    if partial:
+                        self.vector_store.delete(partial)
+                    return False
+                # Discard partial in-memory changes by reloading the last saved index
+                self.vector_store = None
                 self.load_vector_store()
-            
+                return False
+    
+    def _index_chunks(self, chunks: List[Document], timer: Optional[StageTimer] = None,
+                      embedded: Optional[Dict[str, tuple]] = None) -> List[List[float]]:
+        """Embed one batch of chunks and add it to the in-memory vector store; returns the vectors"""
+        timer = timer or StageTimer(INGEST_STAGE_SECONDS)
+        texts = [chunk.page_content for chunk in chunks]
+        metadatas = [chunk.metadata for chunk in chunks]
+        ids = [chunk.metadata['chunk_uid'] for chunk in chunks]
+        
+        # Reuse vectors embedded before an interruption when the chunk text is unchanged,
+        # unless the index was reduced since and they no longer fit it
+        vectors = [None] * len(chunks)
+        if embedded:
+            dimension = self.vector_store.index.d if self.vector_store is not None else None
+            for i, (chunk_id, text) in enumerate(zip(ids, texts)):
+                previous = embedded.get(chunk_id)
+                if previous is not None and previous[0] == text and dimension in (None, len(previous[1])):
+                    vectors[i] = list(previous[1])
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            with timer.stage("embed"):
+                fresh = self.embeddings.embed_documents([texts[i] for i in missing])
+            for i, vector in zip(missing, fresh):
+                vectors[i] = vector
+        
+        with timer.stage("index"):
             if self.vector_store is None:
-                # Create new vector store
-                self.create_vector_store(chunks)
+                from langchain_community.vectorstores import FAISS
+                self.vector_store = FAISS.from_embeddings(
+                    list(zip(texts, vectors)), self.embeddings, metadatas=metadatas, ids=ids
+                )
             else:
-                # Add to existing vector store
-                self.vector_store.add_documents(chunks)
-                self.vector_store.save_local(Config.FAISS_INDEX_PATH)
-            
-            # Recreate QA chain with updated vector store
-            self.create_qa_chain()
-            
-            logger.info(f"Successfully added {len(chunks)} chunks from {file_path}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to add documents: {str(e)}")
+                self.vector_store.add_embeddings(list(zip(texts, vectors)), metadatas=metadatas, ids=ids)
+        if self.router:
+            self.router.invalidate()
+        return vectors
+    
+    def _remove_source(self, source: str) -> int:
+        """Remove a source's chunks from the in-memory index and registry; returns chunks removed"""
+        chunk_ids = self.registry.remove(source)
+        self.summary_store.invalidate(source)
+        if not chunk_ids or self.vector_store is None:
+            return 0
+        
+        present = [chunk_id for chunk_id in chunk_ids if chunk_id in self.vector_store.docstore._dict]
+        if present:
+            self.vector_store.delete(present)
+            if self.router:
+                self.router.invalidate()
+        return len(present)
+    
+    def delete_document(self, source: str) -> Dict[str, Any]:
+        """Delete every chunk of a source from the vector store"""
+        with self._write_lock, self.index_sync.writer():
+            try:
+                self._sync_before_write()
+                
+                if self.registry.get(source) is None:
+                    return {"success": False, "error": f"Document not found: {source}"}
+                
+                deleted = self._remove_source(source)
+                self._save_index()
+                
+                logger.info(f"Deleted {deleted} chunks of '{source}'")
+                return {"success": True, "source": source, "deleted_chunks": deleted}
+                
+            except Exception as e:
+                logger.error(f"Failed to delete document {source}: {str(e)}")
+                self.vector_store = None
+                self.load_vector_store()
+                return {"success": False, "error": str(e)}
+    
+    def list_documents(self) -> List[Dict[str, Any]]:
+        """List indexed sources with their chunk counts"""
+        if self.vector_store is None:
+            self.load_vector_store()
+        return self.registry.list_sources()
+    
+    def save_index(self):
+        """Persist in-memory changes made with add_documents(save=False)"""
+        with self._write_lock, self.index_sync.writer():
+            self._save_index()
+            if self.vector_store is not None:
+                self.create_qa_chain()
+    
+    def _save_index(self):
+        """Persist the index and registry
+        
+        Deletes need no compaction: the flat index shifts the remaining vectors down in remove_ids, and
+        FAISS.delete drops the docstore entries and renumbers index_to_docstore_id with them.
+        """
+        if self.vector_store is None:
+            return
+        
+        with self.index_sync.saving():
+            self._write_index_files(self.vector_store)
+            self.registry.save()
+            # Other processes see the new version and reload on their next query
+            self.index_version = self.index_sync.bump_version()
+    
+    def _write_index_files(self, vector_store: "FAISS"):
+        """Save into a staging directory and rename into place, so processes mapping the old files never see them truncated"""
+        os.makedirs(self.index_path, exist_ok=True)
+        staging_dir = tempfile.mkdtemp(dir=self.index_path, prefix='.save_')
+        from embedding_projection import PROJECTION_FILE
+        try:
+            vector_store.save_local(staging_dir)
+            names = ["index.faiss", "index.pkl"]
+            if self.projection is not None:
+                self.projection.save(os.path.join(staging_dir, PROJECTION_FILE))
+                names.append(PROJECTION_FILE)
+            elif os.path.exists(os.path.join(self.index_path, PROJECTION_FILE)):
+                # Rebuilt at full dimension: a leftover projection would garble every query
+                os.remove(os.path.join(self.index_path, PROJECTION_FILE))
+            for name in names:
+                os.replace(os.path.join(staging_dir, name), os.path.join(self.index_path, name))
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+    
+    def _sync_before_write(self):
+        """Reload the index if it is missing or another process saved a newer version"""
+        if self.vector_store is None or self.index_sync.newer_version(self.index_version) is not None:
+            self.load_vector_store()
+        if self._index_mapped and self.vector_store is not None:
+            # A mapped index is read-only and FAISS aborts the process on add or remove; clones stay mapped too
+            import faiss
+            self.vector_store.index = faiss.deserialize_index(faiss.serialize_index(self.vector_store.index))
+            self._index_mapped = False
+    
+    def refresh_if_stale(self) -> bool:
+        """Pick up an index version saved by another process (at most one check per interval)"""
+        if not self.index_sync.check_due() or self.index_sync.newer_version(self.index_version) is None:
+            return False
+        # This process is writing; its own save will publish the newest version
+        if not self._write_lock.acquire(blocking=False):
             return False
+        try:
+            if self.index_sync.newer_version(self.index_version) is None:
+                return False
+            previous = self.index_version
+            if self.load_vector_store() is None:
+                return False
+            logger.info(f"Reloaded vector store: version {previous} -> {self.index_version}")
+            return True
+        finally:
+            self._write_lock.release()
+    
+    def get_coalescing_stats(self) -> Dict[str, int]:
+        """Single-flight counters plus the LLM calls that coalesced questions really avoided"""
+        stats = self.single_flight.get_stats()
+        with self._stats_lock:
+            stats["llm_calls_saved"] = self._llm_calls_saved
+        return stats
     
     def get_vector_store_info(self) -> Dict[str, Any]:
         """Get information about the vector store"""
@@ -300,8 +764,17 @@ class LegalRAGPipeline:
             info = {
                 "status": "Vector store loaded",
                 "embedding_model": Config.EMBEDDING_MODEL,
-                "llm_model": Config.LLM_MODEL,
-                "retrieval_k": Config.RETRIEVAL_K
+                "embedding_backend": Config.EMBEDDING_BACKEND,
+                "total_chunks": self.vector_store.index.ntotal,
+                "dimension": self.vector_store.index.d,
+                "embedding_projection": self.projection.describe() if self.projection else None,
+                "total_documents": len(self.registry.sources),
+                "index_version": self.index_version,
+                "llm_backend": self.llm_backend.name,
+                "llm_model": self.llm_backend.model_name,
+                "retrieval_k": Config.RETRIEVAL_K,
+                "context_token_budget": self.context_builder.token_budget,
+                "reranker": self.reranker.model_name if self.reranker else None
             }
             
             return info
@@ -309,6 +782,3 @@ class LegalRAGPipeline:
         except Exception as e:
             logger.error(f"Failed to get vector store info: {str(e)}")
             return {"status": "Error", "error": str(e)}
-
-# Global pipeline instance
-rag_pipeline = LegalRAGPipeline()
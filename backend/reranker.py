@@ -0,0 +1,123 @@
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Tuple, Dict, Any
+
+from langchain_core.documents import Document
+
+from config import Config
+from metrics import RERANK_CACHE_TOTAL
+
+logger = logging.getLogger(__name__)
+
+
+def _fingerprint(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class CrossEncoderReranker:
+    """Reorders over-fetched FAISS candidates with a small cross-encoder under a latency budget"""
+
+    def __init__(self, model_name: str = None, budget_ms: float = None, cache_size: int = None):
+        self.model_name = model_name or Config.RERANK_MODEL
+        self.budget_ms = Config.RERANK_BUDGET_MS if budget_ms is None else budget_ms
+        self.cache_size = cache_size or Config.RERANK_CACHE_SIZE
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._cache: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # Cost estimate and counters are updated by concurrent requests
+        self._stats_lock = threading.Lock()
+        self._ms_per_pair = None  # Moving average used to predict the cost of a batch
+        self._skips_since_run = 0
+        self.stats = {"reranked": 0, "skipped_budget": 0, "cache_hits": 0, "cache_misses": 0}
+
+    def _get_model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    from sentence_transformers import CrossEncoder
+                    self._model = CrossEncoder(
+                        self.model_name,
+                        device='cpu',
+                        max_length=Config.RERANK_MAX_LENGTH
+                    )
+                    logger.info(f"Reranker initialized with model: {self.model_name}")
+        return self._model
+
+    def warm_up(self):
+        """Load the model and calibrate per-pair cost so the first request is not penalised"""
+        self._score_pairs([("warm up", "warm up passage")])
+
+    def _score_pairs(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        model = self._get_model()
+        start = time.perf_counter()
+        scores = model.predict(pairs, batch_size=len(pairs), show_progress_bar=False)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        per_pair = elapsed_ms / len(pairs)
+        with self._stats_lock:
+            self._ms_per_pair = per_pair if self._ms_per_pair is None else 0.8 * self._ms_per_pair + 0.2 * per_pair
+        return [float(score) for score in scores]
+
+    def rerank(self, question: str, scored_documents: List[Tuple[Document, float]],
+               top_n: int) -> Tuple[List[Tuple[Document, float]], Dict[str, Any]]:
+        """Return the top_n candidates by cross-encoder score, or the FAISS order if over budget"""
+        start = time.perf_counter()
+        info = {"rerank_ms": 0.0, "reranked": False, "candidates": len(scored_documents)}
+
+        if len(scored_documents) <= 1:
+            return scored_documents[:top_n], info
+
+        question_key = _fingerprint(" ".join(question.lower().split()))
+        keys = [(question_key, _fingerprint(doc.page_content)) for doc, _ in scored_documents]
+
+        with self._cache_lock:
+            cached = {}
+            for key in keys:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    cached[key] = self._cache[key]
+        missing = [i for i, key in enumerate(keys) if key not in cached]
+        RERANK_CACHE_TOTAL.inc(len(keys) - len(missing), result="hit")
+        RERANK_CACHE_TOTAL.inc(len(missing), result="miss")
+
+        with self._stats_lock:
+            self.stats["cache_hits"] += len(keys) - len(missing)
+            self.stats["cache_misses"] += len(missing)
+            predicted_ms = self._ms_per_pair * len(missing) if missing and self._ms_per_pair is not None else None
+            # Re-measure occasionally so one slow batch cannot disable reranking for good
+            skip = (predicted_ms is not None and predicted_ms > self.budget_ms
+                    and self._skips_since_run < Config.RERANK_RECALIBRATE_EVERY)
+            if skip:
+                self._skips_since_run += 1
+                self.stats["skipped_budget"] += 1
+            elif missing:
+                self._skips_since_run = 0
+
+        if skip:
+            info["skipped"] = f"predicted {predicted_ms:.0f}ms exceeds budget {self.budget_ms:.0f}ms"
+            info["rerank_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            return scored_documents[:top_n], info
+
+        if missing:
+            pairs = [(question, scored_documents[i][0].page_content) for i in missing]
+            for i, score in zip(missing, self._score_pairs(pairs)):
+                cached[keys[i]] = score
+            with self._cache_lock:
+                for i in missing:
+                    self._cache[keys[i]] = cached[keys[i]]
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        order = sorted(range(len(scored_documents)), key=lambda i: cached[keys[i]], reverse=True)
+        with self._stats_lock:
+            self.stats["reranked"] += 1
+        info["reranked"] = True
+        info["rerank_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        if info["rerank_ms"] > self.budget_ms:
+            logger.warning(f"Reranking took {info['rerank_ms']}ms (budget {self.budget_ms}ms)")
+
+        return [scored_documents[i] for i in order[:top_n]], info
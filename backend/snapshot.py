@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Export, verify and import index snapshot bundles.
+
+A bundle is one gzip-compressed tar file holding the FAISS index, docstore and
+document registry, preceded by a manifest with the embedding model identity and
+a SHA-256 per file. A new node bootstraps by copying one file:
+
+    python snapshot.py export --output /backups/legal_index.tar.gz
+    python snapshot.py verify /backups/legal_index.tar.gz
+    python snapshot.py import /backups/legal_index.tar.gz
+
+Import checks the bundle against its .sha256 file before reading any entry, accepts
+only regular files with plain names listed in the manifest, hashes each file while it
+is decompressed into a staging directory next to the index, and swaps the files in
+under the save lock once all of them verified, so running workers reload the new
+version on their next query. Set INDEX_SNAPSHOT_PATH
+to import automatically when a node starts without an index.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import struct
+import hashlib
+import logging
+import tarfile
+import tempfile
+import argparse
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import Config
+from index_sync import IndexSync, VERSION_FILE, WRITER_LOCK_FILE, SAVE_LOCK_FILE
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 1
+MANIFEST_NAME = "manifest.json"
+CHECKSUM_SUFFIX = ".sha256"
+COPY_BUFFER_SIZE = 1024 * 1024
+# Per-node bookkeeping that must not travel between nodes
+EXCLUDED_FILES = {VERSION_FILE, WRITER_LOCK_FILE, SAVE_LOCK_FILE}
+
+
+class SnapshotError(Exception):
+    """Raised when a bundle is corrupt, incomplete or built for another embedding model"""
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(COPY_BUFFER_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_index_header(index_file: str) -> Dict[str, Any]:
+    """Dimension and vector count from the FAISS file header, without loading the index"""
+    with open(index_file, 'rb') as f:
+        fourcc, dimension, ntotal = struct.unpack('<4siq', f.read(16))
+    return {"index_type": fourcc.decode('ascii', 'replace'), "dimension": dimension, "vectors": ntotal}
+
+
+def embedding_identity() -> Dict[str, Any]:
+    """What must match for a bundle's vectors to be comparable with this node's query embeddings"""
+    return {
+        "model": Config.EMBEDDING_MODEL,
+        "backend": Config.EMBEDDING_BACKEND,
+        "normalized": True
+    }
+
+
+def snapshot_files(index_path: str) -> List[str]:
+    return sorted(
+        name for name in os.listdir(index_path)
+        if name not in EXCLUDED_FILES and not name.endswith('.tmp')
+        and os.path.isfile(os.path.join(index_path, name))
+    )
+
+
+def export_snapshot(index_path: str, output_path: str, compress_level: int = 6) -> Dict[str, Any]:
+    """Write the saved index as a checksummed bundle, plus a sha256sum-style sidecar file"""
+    index_file = os.path.join(index_path, "index.faiss")
+    if not os.path.exists(index_file):
+        raise SnapshotError(f"No saved index found at {index_path}")
+
+    start = time.perf_counter()
+    sync = IndexSync(index_path)
+    output_path = os.path.abspath(output_path)
+    output_dir = os.path.dirname(output_path)
+    os.makedirs(output_dir, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=output_dir, suffix='.tmp')
+    os.close(fd)
+    try:
+        # Shared lock: a writer cannot swap files in halfway through the export
+        with sync.loading():
+            names = snapshot_files(index_path)
+            manifest = {
+                "format": SNAPSHOT_FORMAT,
+                "created_at": datetime.now().isoformat(),
+                "index_version": sync.read_version(),
+                "embedding": embedding_identity(),
+                "index": read_index_header(index_file),
+                "chunking": {"chunker": Config.CHUNKER, "chunk_size": Config.CHUNK_SIZE,
+                             "chunk_overlap": Config.CHUNK_OVERLAP},
+                "files": {
+                    name: {"size": os.path.getsize(os.path.join(index_path, name)),
+                           "sha256": file_sha256(os.path.join(index_path, name))}
+                    for name in names
+                }
+            }
+            registry_file = os.path.join(index_path, "registry.json")
+            if os.path.exists(registry_file):
+                with open(registry_file, 'r', encoding='utf-8') as f:
+                    manifest["documents"] = len(json.load(f).get("sources", {}))
+
+            with tarfile.open(temp_path, 'w:gz', compresslevel=compress_level) as bundle:
+                # The manifest goes first so import can check every file as it streams past
+                payload = json.dumps(manifest, indent=2).encode('utf-8')
+                info = tarfile.TarInfo(MANIFEST_NAME)
+                info.size, info.mtime = len(payload), int(time.time())
+                bundle.addfile(info, fileobj=io.BytesIO(payload))
+                for name in names:
+                    bundle.add(os.path.join(index_path, name), arcname=name, recursive=False)
+
+        checksum = file_sha256(temp_path)
+        os.replace(temp_path, output_path)
+        with open(output_path + CHECKSUM_SUFFIX, 'w', encoding='utf-8') as f:
+            f.write(f"{checksum}  {os.path.basename(output_path)}\n")
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    raw_size = sum(entry["size"] for entry in manifest["files"].values())
+    result = {
+        "success": True,
+        "bundle": output_path,
+        "sha256": checksum,
+        "files": len(manifest["files"]),
+        "raw_bytes": raw_size,
+        "bundle_bytes": os.path.getsize(output_path),
+        "vectors": manifest["index"]["vectors"],
+        "documents": manifest.get("documents"),
+        "seconds": round(time.perf_counter() - start, 2)
+    }
+    logger.info(f"Exported index snapshot {output_path} ({result['vectors']} vectors, {result['bundle_bytes']} bytes)")
+    return result
+
+
+def _expected_checksum(bundle_path: str) -> Optional[str]:
+    try:
+        with open(bundle_path + CHECKSUM_SUFFIX, 'r', encoding='utf-8') as f:
+            return f.read().split()[0]
+    except (OSError, IndexError):
+        return None
+
+
+def _is_plain_name(name: str) -> bool:
+    """A bare file name that can only land inside the index directory"""
+    return (isinstance(name, str) and name not in ('', '.', '..', MANIFEST_NAME) and name not in EXCLUDED_FILES
+            and os.path.basename(name) == name and '/' not in name and '\\' not in name and '\0' not in name)
+
+
+def _check_manifest(manifest: Dict[str, Any], force: bool):
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        raise SnapshotError(f"Unsupported snapshot format: {manifest.get('format')}")
+    files = manifest.get("files")
+    if not isinstance(files, dict) or "index.faiss" not in files:
+        raise SnapshotError("Manifest does not list the index files")
+    unsafe = [name for name in files if not _is_plain_name(name)]
+    if unsafe:
+        raise SnapshotError(f"Manifest lists unsafe file names: {unsafe}")
+    bundle_model = manifest.get("embedding", {}).get("model")
+    if bundle_model != Config.EMBEDDING_MODEL and not force:
+        raise SnapshotError(
+            f"Snapshot was built with embedding model {bundle_model}, this node uses {Config.EMBEDDING_MODEL}"
+        )
+    bundle_backend = manifest.get("embedding", {}).get("backend")
+    if bundle_backend != Config.EMBEDDING_BACKEND:
+        # Same model weights, so vectors agree within quantization tolerance
+        logger.warning(f"Snapshot embeddings came from the {bundle_backend} backend, this node uses {Config.EMBEDDING_BACKEND}")
+
+
+def _stream_bundle(bundle_path: str, staging_dir: Optional[str], force: bool) -> Dict[str, Any]:
+    """Check the bundle, then read it once, checking every file against the manifest; extract into staging_dir if given"""
+    # Nothing is read from an archive that does not match its sidecar
+    expected_checksum = _expected_checksum(bundle_path)
+    try:
+        if expected_checksum and file_sha256(bundle_path) != expected_checksum:
+            raise SnapshotError("Bundle checksum does not match its .sha256 file")
+    except OSError as e:
+        raise SnapshotError(f"Cannot read bundle: {str(e)}")
+
+    data_filter = getattr(tarfile, 'data_filter', None)
+    with open(bundle_path, 'rb') as raw:
+        try:
+            with tarfile.open(fileobj=raw, mode='r|gz') as bundle:
+                members = iter(bundle)
+                first = next(members, None)
+                if first is None or first.name != MANIFEST_NAME:
+                    raise SnapshotError("Bundle does not start with a manifest")
+                manifest = json.loads(bundle.extractfile(first).read().decode('utf-8'))
+                _check_manifest(manifest, force)
+
+                expected = manifest.get("files", {})
+                seen = set()
+                for member in members:
+                    name = member.name
+                    # Regular files with a plain name from the manifest only: no links, devices or paths
+                    if not member.isfile() or not _is_plain_name(name) or name not in expected or name in seen:
+                        raise SnapshotError(f"Unexpected entry in bundle: {name}")
+                    if data_filter is not None:
+                        try:
+                            data_filter(member, staging_dir or '.')
+                        except tarfile.FilterError as e:
+                            raise SnapshotError(f"Unsafe entry in bundle: {name} ({str(e)})")
+                    seen.add(name)
+                    digest = hashlib.sha256()
+                    source = bundle.extractfile(member)
+                    target = open(os.path.join(staging_dir, name), 'wb') if staging_dir else None
+                    try:
+                        for block in iter(lambda: source.read(COPY_BUFFER_SIZE), b''):
+                            digest.update(block)
+                            if target:
+                                target.write(block)
+                    finally:
+                        if target:
+                            target.close()
+                    if digest.hexdigest() != expected[name]["sha256"]:
+                        raise SnapshotError(f"Checksum mismatch for {name}")
+
+                missing = set(expected) - seen
+                if missing:
+                    raise SnapshotError(f"Bundle is missing files: {sorted(missing)}")
+        except (tarfile.TarError, EOFError, OSError, ValueError) as e:
+            if isinstance(e, SnapshotError):
+                raise
+            raise SnapshotError(f"Bundle is corrupt or truncated: {str(e)}")
+    return manifest
+
+
+def verify_snapshot(bundle_path: str, force: bool = False) -> Dict[str, Any]:
+    """Check a bundle end to end without touching the index"""
+    try:
+        manifest = _stream_bundle(bundle_path, None, force)
+        return {"success": True, "bundle": bundle_path, "manifest": manifest,
+                "checksum_file": _expected_checksum(bundle_path) is not None}
+    except SnapshotError as e:
+        return {"success": False, "bundle": bundle_path, "error": str(e)}
+
+
+def import_snapshot(bundle_path: str, index_path: Optional[str] = None, force: bool = False) -> Dict[str, Any]:
+    """Verify and install a bundle as the index; running processes reload it on their next version check"""
+    index_path = index_path or Config.FAISS_INDEX_PATH
+    start = time.perf_counter()
+    parent = os.path.dirname(os.path.abspath(index_path))
+    os.makedirs(parent, exist_ok=True)
+    # Staging on the same filesystem makes the final swap a set of renames
+    staging_dir = tempfile.mkdtemp(dir=parent, prefix='.snapshot_')
+    sync = IndexSync(index_path)
+    try:
+        manifest = _stream_bundle(bundle_path, staging_dir, force)
+        os.makedirs(index_path, exist_ok=True)
+        # Only the swap waits for in-progress uploads; the verified files replace theirs anyway
+        with sync.writer():
+            with sync.saving():
+                for name in snapshot_files(index_path):
+                    if name not in manifest["files"]:
+                        os.remove(os.path.join(index_path, name))
+                for name in manifest["files"]:
+                    os.replace(os.path.join(staging_dir, name), os.path.join(index_path, name))
+                version = sync.bump_version()
+
+        result = {
+            "success": True,
+            "bundle": bundle_path,
+            "index_path": index_path,
+            "index_version": version,
+            "files": len(manifest["files"]),
+            "vectors": manifest["index"]["vectors"],
+            "documents": manifest.get("documents"),
+            "created_at": manifest.get("created_at"),
+            "seconds": round(time.perf_counter() - start, 2)
+        }
+        logger.info(f"Imported index snapshot {bundle_path} as version {version} ({result['vectors']} vectors)")
+        return result
+    except SnapshotError as e:
+        logger.error(f"Failed to import snapshot {bundle_path}: {str(e)}")
+        return {"success": False, "bundle": bundle_path, "error": str(e)}
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Export, verify and import index snapshot bundles")
+    parser.add_argument("--index-path", default=Config.FAISS_INDEX_PATH)
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="Bundle the saved index")
+    export_parser.add_argument("--output", default=os.path.join(
+        os.path.dirname(Config.FAISS_INDEX_PATH), "snapshots", f"faiss_index-{datetime.now():%Y%m%d-%H%M%S}.tar.gz"
+    ))
+    export_parser.add_argument("--level", type=int, default=6, help="gzip compression level (1-9)")
+    verify_parser = commands.add_parser("verify", help="Check a bundle's checksums and model identity")
+    verify_parser.add_argument("bundle")
+    import_parser = commands.add_parser("import", help="Verify a bundle and install it as the index")
+    import_parser.add_argument("bundle")
+    import_parser.add_argument("--force", action="store_true", help="Import even if the embedding model differs")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        try:
+            result = export_snapshot(args.index_path, args.output, args.level)
+        except SnapshotError as e:
+            result = {"success": False, "error": str(e)}
+    elif args.command == "verify":
+        result = verify_snapshot(args.bundle)
+    else:
+        result = import_snapshot(args.bundle, args.index_path, args.force)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    elif not result["success"]:
+        print(f"❌ {args.command.capitalize()} failed: {result['error']}")
+    elif args.command == "export":
+        print(f"✅ Exported {result['vectors']} vectors ({result['documents']} documents) to {result['bundle']}")
+        print(f"📦 {result['raw_bytes'] / (1024*1024):.2f} MB -> {result['bundle_bytes'] / (1024*1024):.2f} MB "
+              f"in {result['seconds']}s, sha256 {result['sha256']}")
+    elif args.command == "verify":
+        manifest = result["manifest"]
+        print(f"✅ Bundle OK: {manifest['index']['vectors']} vectors, {manifest.get('documents')} documents, "
+              f"model {manifest['embedding']['model']}, created {manifest['created_at']}")
+    else:
+        print(f"✅ Imported {result['vectors']} vectors as index version {result['index_version']} in {result['seconds']}s")
+    return 0 if result["success"] else 1
+
+
+if __name__ == "__main__":
+    from utils.logger import configure_logging
+    configure_logging()
+    sys.exit(main())
@@ -0,0 +1,224 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+from langchain_core.documents import Document
+
+from config import Config
+from context_builder import TokenCounter
+from llm_client import LLMUnavailableError
+from metrics import REGISTRY, LATENCY_BUCKETS
+
+SUMMARIES_DIR = "summaries"
+
+# Passed as the "question" so the extractive backend favours sentences carrying the substance of a legal text
+SUMMARY_FOCUS = "key obligations rights penalties punishment liability held judgment order decided court"
+
+MAP_TEMPLATE = """You are summarizing part of an Indian legal document ({title}{section}).
+Summarize the passage below in 3-6 sentences. Keep section numbers, parties, obligations,
+penalties, dates and the court's holdings. Do not add information that is not in the passage.
+
+Passage:
+{text}
+
+Summary:"""
+
+REDUCE_TEMPLATE = """You are combining partial summaries of the Indian legal document {title}.
+Write one coherent summary of the whole document in at most {sentences} sentences, in document order.
+Keep the most important section numbers, parties, obligations, penalties and holdings.
+
+Partial summaries:
+{text}
+
+Summary:"""
+
+SUMMARY_SECONDS = REGISTRY.histogram(
+    "legal_ai_summary_seconds", "Time to build a document summary", buckets=LATENCY_BUCKETS
+)
+SUMMARIES_TOTAL = REGISTRY.counter("legal_ai_summaries_total", "Summary requests by outcome", ("outcome",))
+
+logger = logging.getLogger(__name__)
+
+
+class SummaryStore:
+    """Document summaries saved next to the index, one file per source, tied to the source's content hash"""
+
+    def __init__(self, index_path: str):
+        self.directory = os.path.join(index_path, SUMMARIES_DIR)
+        self._lock = threading.Lock()
+
+    def _path(self, source: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(source.encode('utf-8')).hexdigest() + ".json")
+
+    def get(self, source: str, content_hash: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Stored summary, unless the source was re-ingested with different content since"""
+        try:
+            with open(self._path(source), 'r', encoding='utf-8') as f:
+                summary = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if summary.get("source") != source or summary.get("content_hash") != content_hash:
+            return None
+        return summary
+
+    def put(self, summary: Dict[str, Any]):
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(summary, f)
+            os.replace(temp_path, self._path(summary["source"]))
+
+    def invalidate(self, source: str):
+        """Forget a source's summary; called whenever its chunks are removed or replaced"""
+        with self._lock:
+            try:
+                os.remove(self._path(source))
+            except FileNotFoundError:
+                pass
+
+
+class DocumentSummarizer:
+    """Map-reduce summaries over every chunk of a document, with a bounded number of parallel LLM calls"""
+
+    def __init__(self, pipeline, max_parallel: int = None, map_tokens: int = None):
+        self.pipeline = pipeline
+        self.max_parallel = max(max_parallel or Config.SUMMARY_MAX_PARALLEL, 1)
+        self.map_tokens = map_tokens or Config.SUMMARY_MAP_TOKENS
+        self.token_counter = TokenCounter()
+
+    def summarize(self, source: str, refresh: bool = False) -> Dict[str, Any]:
+        """Return the stored summary, or build and store one; concurrent requests for a source share one build"""
+        entry = self.pipeline.registry.get(source)
+        if entry is None:
+            return {"success": False, "error": f"Document not found: {source}"}
+
+        if not refresh:
+            stored = self.pipeline.summary_store.get(source, entry.get("content_hash"))
+            if stored is not None:
+                SUMMARIES_TOTAL.inc(outcome="stored")
+                return dict(stored, success=True, cached=True, coalesced=False)
+
+        try:
+            summary, shared = self.pipeline.single_flight.do(
+                ("summarize", source), lambda: self._build(source, entry)
+            )
+        except LLMUnavailableError as e:
+            SUMMARIES_TOTAL.inc(outcome="unavailable")
+            logger.error(f"Failed to summarize {source}: {str(e)}")
+            return {"success": False, "error": str(e), "unavailable": True}
+        except Exception as e:
+            SUMMARIES_TOTAL.inc(outcome="error")
+            logger.error(f"Failed to summarize {source}: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+        SUMMARIES_TOTAL.inc(outcome="coalesced" if shared else "built")
+        return dict(summary, success=True, cached=False, coalesced=shared)
+
+    def _build(self, source: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+        start = time.perf_counter()
+        chunks = self._source_chunks(entry.get("chunk_ids", []))
+        if not chunks:
+            raise ValueError(f"No indexed chunks for {source}")
+
+        title = os.path.basename(str(chunks[0].metadata.get('source_file', source)))
+        groups = self._group(chunks)
+        calls = {"map": len(groups), "reduce": 0}
+
+        # Map: one call per section-sized group, a bounded number at a time
+        def summarize_group(group: Dict[str, Any]) -> str:
+            section = f", {group['label']}" if group['label'] else ""
+            prompt = MAP_TEMPLATE.format(title=title, section=section, text=group['text'])
+            return self.pipeline.llm_client.generate(prompt, SUMMARY_FOCUS, group['documents'])
+
+        with ThreadPoolExecutor(max_workers=min(self.max_parallel, len(groups))) as executor:
+            section_summaries = list(executor.map(summarize_group, groups))
+
+        # Reduce: collapse partial summaries until they fit one prompt, then write the final summary
+        partials = section_summaries
+        while len(partials) > 1 and self.token_counter.count("\n\n".join(partials)) > self.map_tokens:
+            batches = self._pack(partials)
+            with ThreadPoolExecutor(max_workers=min(self.max_parallel, len(batches))) as executor:
+                partials = list(executor.map(lambda batch: self._reduce(title, batch), batches))
+            calls["reduce"] += len(batches)
+        if len(partials) > 1:
+            document_summary = self._reduce(title, partials)
+            calls["reduce"] += 1
+        else:
+            document_summary = partials[0]
+
+        elapsed = time.perf_counter() - start
+        SUMMARY_SECONDS.observe(elapsed)
+        summary = {
+            "source": source,
+            "content_hash": entry.get("content_hash"),
+            "summary": document_summary,
+            "sections": [
+                {"section": group['label'], "pages": group['pages'], "summary": text}
+                for group, text in zip(groups, section_summaries)
+            ],
+            "chunks": len(chunks),
+            "llm_calls": calls["map"] + calls["reduce"],
+            "llm_backend": self.pipeline.llm_backend.name,
+            "generated_at": datetime.now().isoformat(),
+            "seconds": round(elapsed, 2)
+        }
+        self.pipeline.summary_store.put(summary)
+        logger.info(f"Summarized {source}: {len(chunks)} chunks, {summary['llm_calls']} LLM calls, {elapsed:.1f}s")
+        return summary
+
+    def _reduce(self, title: str, partials: List[str]) -> str:
+        text = "\n\n".join(f"- {partial}" for partial in partials)
+        prompt = REDUCE_TEMPLATE.format(title=title, sentences=Config.SUMMARY_MAX_SENTENCES, text=text)
+        documents = [Document(page_content=partial, metadata={"source_file": title}) for partial in partials]
+        return self.pipeline.llm_client.generate(prompt, SUMMARY_FOCUS, documents)
+
+    def _source_chunks(self, chunk_ids: List[str]) -> List[Document]:
+        vector_store = self.pipeline.vector_store
+        if vector_store is None:
+            return []
+        docstore = vector_store.docstore._dict
+        return [docstore[chunk_id] for chunk_id in chunk_ids if chunk_id in docstore]
+
+    def _group(self, chunks: List[Document]) -> List[Dict[str, Any]]:
+        """Consecutive chunks of the same chapter, split further so every group fits the map prompt"""
+        groups = []
+        current = None
+        for chunk in chunks:
+            label = chunk.metadata.get('chapter')
+            tokens = self.token_counter.count(chunk.page_content)
+            if (current is None or label != current['label']
+                    or current['tokens'] + tokens > self.map_tokens):
+                current = {"label": label, "documents": [], "tokens": 0}
+                groups.append(current)
+            current['documents'].append(chunk)
+            current['tokens'] += tokens
+
+        for group in groups:
+            pages = [doc.metadata.get('page', 0) for doc in group['documents']]
+            group['pages'] = [min(pages), max(pages)]
+            group['text'] = "\n\n".join(doc.page_content for doc in group['documents'])
+        return groups
+
+    def _pack(self, partials: List[str]) -> List[List[str]]:
+        """Split partial summaries into batches that each fit one reduce prompt"""
+        batches, current, tokens = [], [], 0
+        for partial in partials:
+            size = self.token_counter.count(partial)
+            if current and tokens + size > self.map_tokens:
+                batches.append(current)
+                current, tokens = [], 0
+            current.append(partial)
+            tokens += size
+        batches.append(current)
+        # Always make progress, even if every partial is large on its own
+        if len(batches) == len(partials) and len(partials) > 1:
+            batches = [partials[i:i + 2] for i in range(0, len(partials), 2)]
+        return batches
@@ -0,0 +1,98 @@
+import os
+import io
+import gzip
+import json
+import logging
+import tempfile
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from langchain_core.documents import Document
+
+from config import Config
+from metrics import TEXT_CACHE_TOTAL
+
+logger = logging.getLogger(__name__)
+
+# Bump when the extraction output format changes so stale entries are ignored
+CACHE_FORMAT_VERSION = 2
+
+
+class ExtractedTextCache:
+    """Compressed on-disk cache of extracted page text keyed by file content hash"""
+
+    def __init__(self, cache_dir: str = None):
+        self.cache_dir = cache_dir or Config.TEXT_CACHE_PATH
+        self.hits = 0
+        self.misses = 0
+        self._pdf_signature = None
+
+    def _extraction_signature(self, file_extension: str) -> str:
+        """Settings that change the extracted text for a file type"""
+        if file_extension == '.pdf':
+            if self._pdf_signature is None:
+                self._pdf_signature = self._pdf_extraction_signature()
+            return self._pdf_signature
+        return f"v{CACHE_FORMAT_VERSION}-{file_extension.lstrip('.')}"
+
+    @staticmethod
+    def _pdf_extraction_signature() -> str:
+        """Keyed on the extractors actually used, so 'auto' picking another library never serves its text"""
+        from pdf_extraction import available_extractors, resolve_extractor
+        try:
+            extractor = resolve_extractor()
+        except ImportError:
+            # Extraction fails the same way, so nothing is ever written under this key
+            extractor = Config.PDF_EXTRACTOR
+        fallback = (Config.PDF_FALLBACK_ON_POOR_TEXT and extractor != 'pdfplumber'
+                    and 'pdfplumber' in available_extractors())
+        return f"v{CACHE_FORMAT_VERSION}-pdf-{extractor}-{'fb' if fallback else 'nofb'}"
+
+    def _entry_path(self, content_hash: str, file_extension: str) -> str:
+        signature = self._extraction_signature(file_extension)
+        return os.path.join(self.cache_dir, content_hash[:2], f"{content_hash}-{signature}.jsonl.gz")
+
+    def get(self, content_hash: str, file_path: str) -> Optional[Iterator[Document]]:
+        """Return cached pages for this content, re-pointed at file_path, or None on a miss"""
+        entry = self._entry_path(content_hash, Path(file_path).suffix.lower())
+        if not os.path.exists(entry):
+            self.misses += 1
+            TEXT_CACHE_TOTAL.inc(result="miss")
+            return None
+        self.hits += 1
+        TEXT_CACHE_TOTAL.inc(result="hit")
+        return self._read(entry, file_path)
+
+    def _read(self, entry: str, file_path: str) -> Iterator[Document]:
+        with gzip.open(entry, 'rt', encoding='utf-8') as f:
+            for line in f:
+                record = json.loads(line)
+                metadata = record["metadata"]
+                # The same content may be cached under a different path
+                metadata['source'] = file_path
+                if 'file_path' in metadata:
+                    metadata['file_path'] = file_path
+                yield Document(page_content=record["page_content"], metadata=metadata)
+
+    def write_through(self, content_hash: str, file_path: str, pages: Iterable[Document]) -> Iterator[Document]:
+        """Yield pages while writing them to the cache; the entry is published only if all pages were read"""
+        entry = self._entry_path(content_hash, Path(file_path).suffix.lower())
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(entry), suffix='.tmp')
+        completed = False
+        try:
+            # GzipFile does not close a file object it was given, so each layer gets its own with
+            with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6) as gz, \
+                    io.TextIOWrapper(gz, encoding='utf-8') as f:
+                for page in pages:
+                    f.write(json.dumps({"page_content": page.page_content, "metadata": page.metadata}, default=str))
+                    f.write("\n")
+                    yield page
+            os.replace(temp_path, entry)
+            completed = True
+        finally:
+            if not completed and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def get_stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "path": self.cache_dir}
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for the ingestion and query paths of LegalRAGPipeline.
+
+Generates a synthetic legal corpus, then times each stage (load, split, embed,
+ingest, FAISS search, end-to-end query) with cold and warm variants. Runs fully
+offline: the LLM is a fake backend with configurable latency and embeddings are
+deterministic hash vectors unless --embedding-model names a (small) local model.
+
+Results are machine-readable JSON (throughput and p50/p95/p99 latency per stage)
+so runs can be diffed across releases:
+
+    python tools/benchmark.py --documents 50 --output bench.json
+    python tools/benchmark.py --embedding-model sentence-transformers/paraphrase-MiniLM-L3-v2
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import platform
+import argparse
+import tempfile
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import Config
+from llm_backends import LLMBackend
+from text_cache import ExtractedTextCache
+from rag_pipeline import LegalRAGPipeline
+from query_router import RAG
+from synthetic_corpus import generate_corpus, generate_queries
+
+
+class FakeLLMBackend(LLMBackend):
+    """Offline stand-in for the LLM that sleeps for a fixed latency"""
+
+    name = "fake"
+    model_name = "fake"
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+
+    def generate(self, prompt, question, documents) -> str:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return f"Fake answer built from {len(documents)} passages."
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: List[float], items: Optional[int] = None) -> Dict[str, Any]:
+    """Latency percentiles in ms plus throughput in items (default: operations) per second"""
+    values = sorted(latencies)
+    total = sum(values)
+    items = len(values) if items is None else items
+    return {
+        "count": len(values),
+        "items": items,
+        "total_s": round(total, 4),
+        "throughput_per_s": round(items / total, 2) if total else None,
+        "mean_ms": round(total / len(values) * 1000, 3) if values else 0.0,
+        "p50_ms": round(percentile(values, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(values, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(values, 0.99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3) if values else 0.0
+    }
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def create_embeddings(model_name: Optional[str]):
+    if model_name:
+        from langchain_community.embeddings import HuggingFaceEmbeddings
+        return HuggingFaceEmbeddings(
+            model_name=model_name,
+            model_kwargs={'device': 'cpu'},
+            encode_kwargs={'normalize_embeddings': True}
+        )
+    from langchain_community.embeddings import DeterministicFakeEmbedding
+    return DeterministicFakeEmbedding(size=384)
+
+
+def run(args) -> Dict[str, Any]:
+    work_dir = tempfile.mkdtemp(prefix="legal_rag_bench_")
+    try:
+        corpus = generate_corpus(os.path.join(work_dir, "corpus"), args.documents, args.sections, args.seed)
+        queries = generate_queries(args.queries, args.seed)
+
+        pipeline = LegalRAGPipeline(
+            embeddings=create_embeddings(args.embedding_model),
+            llm_backend=FakeLLMBackend(args.llm_latency_ms),
+            index_path=os.path.join(work_dir, "index")
+        )
+        pipeline.text_cache = ExtractedTextCache(os.path.join(work_dir, "text_cache"))
+        # Synthetic queries mostly miss the router's relevance threshold; keep the query stage on the full RAG path
+        pipeline.router = None
+        stages: Dict[str, Dict[str, Any]] = {}
+
+        # Loading: cold parses every file, warm is served from the extracted-text cache
+        for variant in ("cold", "warm"):
+            latencies, pages = [], 0
+            for path in corpus:
+                documents, seconds = timed(pipeline.load_documents, path)
+                latencies.append(seconds)
+                pages += len(documents)
+            stages.setdefault("load_documents", {})[variant] = summarize(latencies, pages)
+
+        # Splitting
+        loaded = [pipeline.load_documents(path) for path in corpus]
+        latencies, chunks = [], []
+        for documents in loaded:
+            result, seconds = timed(pipeline.split_documents, documents)
+            latencies.append(seconds)
+            chunks.extend(result)
+        stages["split_documents"] = {"warm": summarize(latencies, len(chunks))}
+
+        # Embedding throughput per batch; cold includes model warm-up
+        texts = [chunk.page_content for chunk in chunks]
+        for variant in ("cold", "warm"):
+            latencies = []
+            for start in range(0, len(texts), Config.INGEST_BATCH_SIZE):
+                _, seconds = timed(pipeline.embeddings.embed_documents, texts[start:start + Config.INGEST_BATCH_SIZE])
+                latencies.append(seconds)
+            stages.setdefault("embed", {})[variant] = summarize(latencies, len(texts))
+
+        # End-to-end ingestion into an empty index
+        latencies = []
+        for path in corpus:
+            ok, seconds = timed(pipeline.add_documents, path, os.path.basename(path))
+            if not ok:
+                raise RuntimeError(f"Ingestion failed for {path}")
+            latencies.append(seconds)
+        stages["ingest"] = {"warm_text_cache": summarize(latencies, len(corpus))}
+
+        # FAISS search only, on precomputed query vectors
+        query_vectors = pipeline.embeddings.embed_documents(queries)
+        for variant in ("cold", "warm"):
+            latencies = []
+            for vector in query_vectors:
+                _, seconds = timed(
+                    pipeline.vector_store.similarity_search_with_score_by_vector, vector, k=Config.RETRIEVAL_K
+                )
+                latencies.append(seconds)
+            stages.setdefault("faiss_search", {})[variant] = summarize(latencies)
+
+        # End-to-end query with the fake LLM: retrieval plus generation for every question
+        for variant in ("cold", "warm"):
+            latencies = []
+            for question in queries:
+                result, seconds = timed(pipeline.query, question)
+                if "error" in result:
+                    raise RuntimeError(f"Query failed: {result['error']}")
+                if result.get("route") != RAG:
+                    raise RuntimeError(f"Query took the {result.get('route')} route instead of RAG")
+                latencies.append(seconds)
+            stages.setdefault("query", {})[variant] = summarize(latencies)
+
+        return {
+            "meta": {
+                "timestamp": datetime.now().isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "documents": args.documents,
+                "sections_per_document": args.sections,
+                "queries": len(queries),
+                "chunks": len(chunks),
+                "index_vectors": pipeline.vector_store.index.ntotal,
+                "chunker": Config.CHUNKER,
+                "query_routing": False,
+                "chunk_size": Config.CHUNK_SIZE,
+                "ingest_batch_size": Config.INGEST_BATCH_SIZE,
+                "embedding_model": args.embedding_model or "deterministic-fake-384",
+                "llm_latency_ms": args.llm_latency_ms,
+                "seed": args.seed
+            },
+            "stages": stages
+        }
+    finally:
+        if not args.keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Legal AI Advisor RAG pipeline")
+    parser.add_argument('--documents', type=int, default=20, help="Synthetic documents to generate")
+    parser.add_argument('--sections', type=int, default=40, help="Sections per document")
+    parser.add_argument('--queries', type=int, default=50, help="Queries per query stage")
+    parser.add_argument('--embedding-model', default=None, help="Local embedding model (default: fake vectors)")
+    parser.add_argument('--llm-latency-ms', type=float, default=0.0, help="Simulated LLM latency")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="Write JSON results to this file instead of stdout")
+    parser.add_argument('--keep', action='store_true', help="Keep the temporary corpus and index")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    report = run(args)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Benchmark results written to {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
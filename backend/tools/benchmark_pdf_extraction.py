@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark PDF text extractors on a sample of legal PDFs.
+
+For every installed extractor (and the auto mode with per-page pdfplumber fallback)
+reports pages/second and text parity against pdfplumber, measured as the F1 overlap
+of the extracted word multisets.
+
+Usage:
+    python tools/benchmark_pdf_extraction.py legal_documents --sample 20 --json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from collections import Counter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_extraction import available_extractors, iter_pdf_pages
+
+
+def word_f1(reference: str, candidate: str) -> float:
+    """F1 overlap of word multisets; insensitive to line breaks and column order"""
+    ref_words, cand_words = Counter(reference.split()), Counter(candidate.split())
+    if not ref_words and not cand_words:
+        return 1.0
+    common = sum((ref_words & cand_words).values())
+    if common == 0:
+        return 0.0
+    precision = common / sum(cand_words.values())
+    recall = common / sum(ref_words.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def extract(file_path: str, extractor: str, fallback: bool) -> tuple:
+    stats = {}
+    start = time.perf_counter()
+    pages = [doc.page_content for doc in iter_pdf_pages(file_path, extractor=extractor, fallback=fallback, stats=stats)]
+    return pages, time.perf_counter() - start, stats.get("fallback_pages", 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF text extraction backends")
+    parser.add_argument('folder', help="Folder containing PDF files")
+    parser.add_argument('--sample', type=int, default=20, help="Number of PDFs to sample")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help="Print machine-readable JSON only")
+    args = parser.parse_args()
+
+    pdfs = sorted(
+        os.path.join(root, file)
+        for root, _, files in os.walk(args.folder)
+        for file in files if file.lower().endswith('.pdf')
+    )
+    if not pdfs:
+        print(f"❌ No PDF files found in {args.folder}")
+        return
+    random.Random(args.seed).shuffle(pdfs)
+    pdfs = pdfs[:args.sample]
+
+    extractors = available_extractors()
+    if 'pdfplumber' not in extractors:
+        print("❌ pdfplumber is required as the parity reference")
+        return
+
+    # (label, extractor, per-page fallback)
+    variants = [(name, name, False) for name in extractors]
+    variants += [(f"{name}+fallback", name, True) for name in extractors if name != 'pdfplumber']
+
+    totals = {label: {"pages": 0, "seconds": 0.0, "fallback_pages": 0, "f1_sum": 0.0} for label, _, _ in variants}
+    for file_path in pdfs:
+        reference, _, _ = extract(file_path, 'pdfplumber', False)
+        for label, extractor, fallback in variants:
+            pages, seconds, fallback_pages = extract(file_path, extractor, fallback)
+            totals[label]["pages"] += len(pages)
+            totals[label]["seconds"] += seconds
+            totals[label]["fallback_pages"] += fallback_pages
+            totals[label]["f1_sum"] += sum(word_f1(ref, cand) for ref, cand in zip(reference, pages))
+
+    report = {"files": len(pdfs), "extractors": {}}
+    for label, total in totals.items():
+        pages = total["pages"] or 1
+        report["extractors"][label] = {
+            "pages": total["pages"],
+            "pages_per_second": round(total["pages"] / total["seconds"], 1) if total["seconds"] else None,
+            "fallback_pages": total["fallback_pages"],
+            "parity_f1": round(total["f1_sum"] / pages, 4)
+        }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"📄 Sampled {report['files']} PDFs")
+    print(f"{'extractor':22}{'pages':>8}{'pages/s':>10}{'fallback':>10}{'parity F1':>11}")
+    for label, row in report["extractors"].items():
+        print(f"{label:22}{row['pages']:>8}{row['pages_per_second'] or 0:>10}{row['fallback_pages']:>10}{row['parity_f1']:>11}")
+
+
+if __name__ == "__main__":
+    main()
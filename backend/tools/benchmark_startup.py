@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark import and startup time of the API and the command line tools.
+
+Every scenario runs in a fresh interpreter, so nothing is cached between runs.
+Reports the median time inside the interpreter, the median wall time including
+interpreter start, and which heavy libraries the scenario pulled in. /health,
+/config and the CLI usage paths are expected to load none of them.
+
+Usage:
+    python tools/benchmark_startup.py --runs 5
+    python tools/benchmark_startup.py --with-pipeline   # also time loading the models and index
+    python tools/benchmark_startup.py --importtime 15   # slowest imports of app.py
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = [
+    'langchain_core', 'langchain_community', 'langchain_text_splitters', 'langchain_groq',
+    'faiss', 'numpy', 'torch', 'sentence_transformers', 'onnxruntime'
+]
+
+PROBE = """
+import io, sys, json, time, contextlib
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+{code}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+RUN_CLI = """try:
+    sys.argv = {argv!r}
+    import runpy
+    runpy.run_path(sys.argv[0], run_name='__main__')
+except SystemExit:
+    pass"""
+
+FIRST_REQUEST = """import app
+app.app.test_client().get({path!r})"""
+
+SCENARIOS = [
+    ("import app", "import app"),
+    ("first GET /health", FIRST_REQUEST.format(path='/health')),
+    ("first GET /config", FIRST_REQUEST.format(path='/config')),
+    ("import rag_pipeline", "import rag_pipeline"),
+    ("ingest_documents.py --help", RUN_CLI.format(argv=['ingest_documents.py', '--help'])),
+    ("snapshot.py --help", RUN_CLI.format(argv=['snapshot.py', '--help'])),
+]
+
+# Needs the configured models (and API keys for the Groq backend)
+PIPELINE_SCENARIOS = [
+    ("app + load_services()", "import app\napp.load_services()"),
+]
+
+
+def run_probe(code: str, env: dict) -> dict:
+    indented = "\n".join("    " + line for line in code.splitlines())
+    script = PROBE.format(code=indented, heavy=HEAVY_MODULES)
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "probe failed")
+    measurement = json.loads(result.stdout.strip().splitlines()[-1])
+    measurement["wall"] = wall
+    return measurement
+
+
+def import_profile(limit: int, env: dict) -> list:
+    """Slowest modules by cumulative import time when importing app.py"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = [part.strip() for part in line[len("import time:"):].split("|")]
+        if parts[0].isdigit():
+            rows.append({"module": parts[2], "cumulative_ms": round(int(parts[1]) / 1000, 1)})
+    return sorted(rows, key=lambda row: row["cumulative_ms"], reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark import and startup time")
+    parser.add_argument('--runs', type=int, default=5, help="Fresh interpreters per scenario")
+    parser.add_argument('--with-pipeline', action='store_true', help="Also time loading the pipeline")
+    parser.add_argument('--importtime', type=int, default=0, metavar='N', help="Show the N slowest imports of app.py")
+    parser.add_argument('--json', action='store_true', help="Print machine-readable JSON only")
+    args = parser.parse_args()
+
+    # Measure the default lazy startup, whatever the local .env says
+    env = dict(os.environ, PRELOAD_PIPELINE='false')
+    scenarios = SCENARIOS + (PIPELINE_SCENARIOS if args.with_pipeline else [])
+
+    report = {"python": sys.version.split()[0], "runs": args.runs, "scenarios": {}}
+    for label, code in scenarios:
+        try:
+            runs = [run_probe(code, env) for _ in range(max(args.runs, 1))]
+        except RuntimeError as e:
+            report["scenarios"][label] = {"error": str(e)}
+            continue
+        report["scenarios"][label] = {
+            "median_ms": round(statistics.median(run["seconds"] for run in runs) * 1000, 1),
+            "wall_median_ms": round(statistics.median(run["wall"] for run in runs) * 1000, 1),
+            "heavy_modules": runs[-1]["heavy"]
+        }
+    if args.importtime:
+        report["slowest_imports"] = import_profile(args.importtime, env)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"⏱️ Startup benchmark (Python {report['python']}, median of {args.runs} fresh interpreters)")
+    print(f"{'scenario':30}{'in-process ms':>15}{'wall ms':>10}  heavy modules loaded")
+    for label, row in report["scenarios"].items():
+        if "error" in row:
+            print(f"{label:30}  ❌ {row['error']}")
+            continue
+        heavy = ", ".join(row["heavy_modules"]) or "none"
+        print(f"{label:30}{row['median_ms']:>15}{row['wall_median_ms']:>10}  {heavy}")
+    if args.importtime:
+        print("\n🐢 Slowest imports of app.py (cumulative ms)")
+        for row in report["slowest_imports"]:
+            print(f"{row['cumulative_ms']:>10}  {row['module']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Smoke check of ManagedLLMClient against the local fake LLM server.
+
+Starts tools/fake_llm_server.py on a free port and drives the client through
+healthy, failing, rate-limited, slow and down upstreams, checking retries with
+backoff, the concurrency limit, the circuit breaker and the passages-only answer
+the pipeline falls back to. Runs offline in a few seconds; exits non-zero when a
+check fails.
+
+    python tools/check_llm_client.py
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+from typing import List, Callable
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from llm_backends import LLMBackend
+from llm_client import ManagedLLMClient, CircuitBreaker, LLMUnavailableError, CircuitOpenError
+from fake_llm_server import FakeLLMHandler, run_server, configure
+
+
+class UpstreamStatusError(Exception):
+    """HTTP error shaped like the SDK's: a status code plus the response and its headers"""
+
+    def __init__(self, error: urllib.error.HTTPError):
+        super().__init__(f"HTTP {error.code}: {error.reason}")
+        self.status_code = error.code
+        self.response = error
+
+
+class FakeServerBackend(LLMBackend):
+    """Chat completions over plain HTTP, so the check needs no SDK"""
+
+    name = "fake-server"
+    model_name = "fake-model"
+
+    def __init__(self, base_url: str, timeout: float = 2.0):
+        self.base_url = base_url.rstrip('/')
+        self.url = self.base_url + "/chat/completions"
+        self.timeout = timeout
+
+    def generate(self, prompt, question, documents) -> str:
+        body = json.dumps({"model": self.model_name, "messages": [{"role": "user", "content": prompt}]})
+        request = urllib.request.Request(
+            self.url, data=body.encode('utf-8'), headers={"Content-Type": "application/json"}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())["choices"][0]["message"]["content"]
+        except urllib.error.HTTPError as e:
+            raise UpstreamStatusError(e) from e
+
+
+def make_client(backend: LLMBackend, **overrides) -> ManagedLLMClient:
+    """Client with short delays and an explicit breaker, so checks do not depend on .env"""
+    options = dict(max_retries=2, max_concurrency=4, queue_timeout=1.0, retry_base_delay=0.01, retry_max_delay=0.2)
+    options.update(overrides)
+    breaker = options.pop("circuit_breaker", None) or CircuitBreaker(failure_threshold=5, reset_timeout=60)
+    return ManagedLLMClient(backend, circuit_breaker=breaker, **options)
+
+
+def expect(condition: bool, message: str):
+    if not condition:
+        raise AssertionError(message)
+
+
+def check_healthy(backend: LLMBackend):
+    configure()
+    client = make_client(backend)
+    expect(client.generate("prompt") == FakeLLMHandler.answer, "unexpected answer")
+    stats = client.get_stats()
+    expect(stats["successes"] == 1 and stats["retries"] == 0, f"stats {stats}")
+    expect(stats["in_flight"] == 0, "slot not released")
+
+
+def check_retries_server_errors(backend: LLMBackend):
+    configure(fail_first=2, error_status=503)
+    client = make_client(backend)
+    expect(client.generate("prompt") == FakeLLMHandler.answer, "no answer after retries")
+    stats = client.get_stats()
+    expect(stats["retries"] == 2 and FakeLLMHandler.request_count == 3, f"stats {stats}")
+    expect(stats["circuit_state"] == CircuitBreaker.CLOSED, "a recovered call opened the breaker")
+
+
+def check_honours_retry_after(backend: LLMBackend):
+    # The fake server sends Retry-After: 1, capped here by retry_max_delay
+    configure(fail_first=1, error_status=429)
+    client = make_client(backend, retry_base_delay=0.0, retry_max_delay=0.3)
+    start = time.perf_counter()
+    client.generate("prompt")
+    elapsed = time.perf_counter() - start
+    expect(client.get_stats()["retries"] == 1, "429 was not retried")
+    expect(elapsed >= 0.3, f"backoff ignored Retry-After ({elapsed:.2f}s)")
+
+
+def check_client_errors_not_retried(backend: LLMBackend):
+    configure(fail_first=1, error_status=400)
+    client = make_client(backend)
+    try:
+        client.generate("prompt")
+        raise AssertionError("400 did not raise")
+    except UpstreamStatusError as e:
+        expect(e.status_code == 400, f"status {e.status_code}")
+    expect(FakeLLMHandler.request_count == 1, "400 was retried")
+    expect(client.circuit_breaker.state == CircuitBreaker.CLOSED, "a client error counted against the breaker")
+
+
+def check_breaker_opens(backend: LLMBackend):
+    configure(error_rate=1.0, error_status=503)
+    client = make_client(backend, max_retries=1, circuit_breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+    for _ in range(2):
+        try:
+            client.generate("prompt")
+            raise AssertionError("a failing upstream returned an answer")
+        except CircuitOpenError:
+            raise AssertionError("breaker opened too early")
+        except LLMUnavailableError:
+            pass
+    expect(client.circuit_breaker.state == CircuitBreaker.OPEN, "breaker still closed after 2 failed calls")
+    requests_before = FakeLLMHandler.request_count
+    try:
+        client.generate("prompt")
+        raise AssertionError("open breaker let a call through")
+    except CircuitOpenError:
+        pass
+    expect(FakeLLMHandler.request_count == requests_before == 4, "open breaker still reached the server")
+
+
+def check_timeouts_retried(backend: LLMBackend):
+    configure(latency=0.5)
+    slow = FakeServerBackend(backend.base_url, timeout=0.1)
+    client = make_client(slow, max_retries=1)
+    try:
+        client.generate("prompt")
+        raise AssertionError("timed-out calls returned an answer")
+    except LLMUnavailableError as e:
+        expect("after 2 attempts" in str(e), str(e))
+    expect(client.get_stats()["retries"] == 1, "timeout was not retried")
+
+
+def check_concurrency_limit(backend: LLMBackend):
+    configure(latency=0.5)
+    client = make_client(backend, max_concurrency=1, queue_timeout=0.1, max_retries=0)
+    outcomes: List[str] = []
+
+    def call():
+        try:
+            client.generate("prompt")
+            outcomes.append("answered")
+        except LLMUnavailableError:
+            outcomes.append("rejected")
+
+    threads = [threading.Thread(target=call) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    expect(sorted(outcomes) == ["answered", "rejected"], f"outcomes {outcomes}")
+    stats = client.get_stats()
+    expect(stats["rejected_saturated"] == 1 and stats["in_flight"] == 0, f"stats {stats}")
+    expect(FakeLLMHandler.request_count == 1, "a rejected call reached the server")
+
+
+def check_passages_only_fallback(backend: LLMBackend):
+    from langchain_community.embeddings import DeterministicFakeEmbedding
+    from config import Config
+    from rag_pipeline import LegalRAGPipeline
+    from synthetic_corpus import generate_corpus
+
+    configure(error_rate=1.0, error_status=503)
+    work_dir = tempfile.mkdtemp(prefix="llm_client_check_")
+    try:
+        pipeline = LegalRAGPipeline(
+            embeddings=DeterministicFakeEmbedding(size=64), llm_backend=backend,
+            llm_client=make_client(backend, max_retries=1), index_path=os.path.join(work_dir, "index")
+        )
+        pipeline.text_cache = None
+        # Routing could answer without the LLM; the fallback is only reached on the RAG path
+        pipeline.router = None
+        for path in generate_corpus(os.path.join(work_dir, "corpus"), 1, 5, 0):
+            expect(pipeline.add_documents(path, os.path.basename(path)), "ingestion failed")
+        result = pipeline.query("What is the punishment for theft?", k=Config.RETRIEVAL_K)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    expect(result.get("degraded") is True, f"not degraded: {result.get('error') or result.get('answer')}")
+    expect(result["sources"] and "most relevant passages" in result["answer"], "no passages in the fallback answer")
+
+
+CHECKS: List[Callable[[LLMBackend], None]] = [
+    check_healthy,
+    check_retries_server_errors,
+    check_honours_retry_after,
+    check_client_errors_not_retried,
+    check_breaker_opens,
+    check_timeouts_retried,
+    check_concurrency_limit,
+    check_passages_only_fallback
+]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check ManagedLLMClient against the fake LLM server")
+    parser.add_argument('--verbose', action='store_true', help="Show the client's retry and fallback logs")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING if args.verbose else logging.CRITICAL)
+    server = run_server(port=0)
+    backend = FakeServerBackend(f"http://127.0.0.1:{server.server_address[1]}")
+
+    failed = 0
+    try:
+        for check in CHECKS:
+            name = check.__name__[len("check_"):].replace("_", " ")
+            try:
+                check(backend)
+                print(f"✅ {name}")
+            except Exception as e:
+                failed += 1
+                print(f"❌ {name}: {type(e).__name__}: {e}")
+    finally:
+        server.shutdown()
+
+    print(f"{'❌' if failed else '✅'} {len(CHECKS) - failed}/{len(CHECKS)} checks passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Compare the legal-aware chunker with the fixed-size recursive splitter on the same corpus.
+
+Reports chunk count, indexed characters, duplicated (overlap) characters, serialized
+index size and embedding time for each chunker. Needs only the embedding model, not
+the LLM keys; --no-embed skips embedding and reports the chunking figures alone.
+
+Usage:
+    python tools/compare_chunkers.py legal_documents
+    python tools/compare_chunkers.py legal_documents --no-embed
+"""
+
+import os
+import sys
+import json
+import time
+import pickle
+import argparse
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ingest import SUPPORTED_FORMATS
+from rag_pipeline import create_embeddings, extract_pages, iter_chunks
+
+CHUNKERS = ('recursive', 'legal')
+
+
+def measure(pages, chunker: str, embeddings=None) -> dict:
+    """Split the pages with one chunker and, given embeddings, embed and index them too"""
+    start = time.perf_counter()
+    chunks = list(iter_chunks(pages, chunker))
+    split_seconds = time.perf_counter() - start
+
+    texts = [chunk.page_content for chunk in chunks]
+    source_chars = sum(len(page.page_content) for page in pages)
+    chunk_chars = sum(len(text) for text in texts)
+    result = {
+        "chunks": len(chunks),
+        "chunk_chars": chunk_chars,
+        "duplicated_chars": max(0, chunk_chars - source_chars),
+        "avg_chunk_chars": round(chunk_chars / len(chunks), 1) if chunks else 0,
+        "split_seconds": round(split_seconds, 3)
+    }
+    if embeddings is None:
+        return result
+
+    import faiss
+    from langchain_community.vectorstores import FAISS
+
+    start = time.perf_counter()
+    vectors = embeddings.embed_documents(texts)
+    embed_seconds = time.perf_counter() - start
+
+    store = FAISS.from_embeddings(
+        list(zip(texts, vectors)), embeddings, metadatas=[chunk.metadata for chunk in chunks]
+    )
+    result.update({
+        "index_bytes": len(faiss.serialize_index(store.index)),
+        "docstore_bytes": len(pickle.dumps((store.docstore, store.index_to_docstore_id))),
+        "embed_seconds": round(embed_seconds, 3)
+    })
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare legal and recursive chunkers")
+    parser.add_argument('folder', help="Folder of legal documents")
+    parser.add_argument('--no-embed', action='store_true', help="Only split; skip embedding and indexing")
+    parser.add_argument('--json', action='store_true', help="Print machine-readable JSON only")
+    args = parser.parse_args()
+
+    pages = []
+    for root, _, files in os.walk(args.folder):
+        for file in sorted(files):
+            if Path(file).suffix.lower() in SUPPORTED_FORMATS:
+                pages.extend(extract_pages(os.path.join(root, file)))
+
+    if not pages:
+        print(f"❌ No supported documents found in {args.folder}")
+        return
+
+    embeddings = None if args.no_embed else create_embeddings()
+    report = {
+        "pages": len(pages),
+        "source_chars": sum(len(page.page_content) for page in pages),
+        **{chunker: measure(pages, chunker, embeddings) for chunker in CHUNKERS}
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"📄 Pages: {report['pages']}  Source characters: {report['source_chars']:,}")
+    print(f"{'':20}" + "".join(f"{chunker:>15}" for chunker in CHUNKERS))
+    for key in report[CHUNKERS[0]]:
+        print(f"{key:20}" + "".join(f"{report[chunker][key]:>15,}" for chunker in CHUNKERS))
+
+
+if __name__ == "__main__":
+    main()
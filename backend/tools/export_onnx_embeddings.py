@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Export the sentence embedding model to ONNX, quantize it to int8 and verify it against PyTorch.
+
+The export needs torch, transformers and onnx (build machine only); serving with
+EMBEDDING_BACKEND=onnx needs just onnxruntime and tokenizers.
+
+Verification embeds a synthetic legal corpus and query set with the PyTorch model
+and each ONNX variant, and fails (exit code 1) unless the mean cosine similarity
+and the top-k retrieval overlap stay within tolerance:
+
+    python tools/export_onnx_embeddings.py
+    python tools/export_onnx_embeddings.py --verify-only --min-overlap 0.9 --json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from config import Config
+from onnx_embeddings import OnnxEmbeddings, MODEL_FILE, QUANTIZED_MODEL_FILE
+from synthetic_corpus import generate_document, generate_queries
+
+
+def export(model_name: str, output_dir: str, opset: int = 14):
+    """Export the transformer to ONNX with dynamic batch/sequence axes and write its fast tokenizer"""
+    import torch
+    from transformers import AutoTokenizer, AutoModel
+
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name).eval()
+    tokenizer.save_pretrained(output_dir)
+
+    sample = tokenizer(["Whoever commits murder shall be punished."], return_tensors='pt')
+    input_names = [name for name in ('input_ids', 'attention_mask', 'token_type_ids') if name in sample]
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names + ['last_hidden_state']}
+
+    model_path = os.path.join(output_dir, MODEL_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            model, tuple(sample[name] for name in input_names), model_path,
+            input_names=input_names, output_names=['last_hidden_state'],
+            dynamic_axes=dynamic_axes, opset_version=opset
+        )
+    print(f"✅ Exported {model_name} to {model_path}")
+    return model_path
+
+
+def quantize(output_dir: str):
+    """Dynamic int8 quantization of the weights (activations stay float)"""
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    source = os.path.join(output_dir, MODEL_FILE)
+    target = os.path.join(output_dir, QUANTIZED_MODEL_FILE)
+    quantize_dynamic(source, target, weight_type=QuantType.QInt8)
+    print(f"✅ Quantized model written to {target}")
+    return target
+
+
+def sample_texts(documents: int, seed: int) -> list:
+    """One passage per section of the synthetic corpus, capped at the chunk size"""
+    rng = random.Random(seed)
+    texts = []
+    for number in range(1, documents + 1):
+        for line in generate_document(rng, number, 40).splitlines():
+            if len(line) > 40:
+                texts.append(line[:Config.CHUNK_SIZE])
+    return texts
+
+
+def embed_timed(embeddings, texts):
+    start = time.perf_counter()
+    vectors = np.array(embeddings.embed_documents(texts), dtype=np.float32)
+    return vectors, time.perf_counter() - start
+
+
+def compare(reference_docs, reference_queries, docs, queries, k: int) -> dict:
+    """Cosine agreement of document vectors and overlap of top-k retrieval results"""
+    cosine = np.sum(reference_docs * docs, axis=1)
+    reference_top = np.argsort(-reference_queries @ reference_docs.T, axis=1)[:, :k]
+    candidate_top = np.argsort(-queries @ docs.T, axis=1)[:, :k]
+    overlap = [len(set(a) & set(b)) / k for a, b in zip(reference_top, candidate_top)]
+    return {
+        "mean_cosine": round(float(cosine.mean()), 5),
+        "min_cosine": round(float(cosine.min()), 5),
+        f"overlap_at_{k}": round(float(np.mean(overlap)), 4),
+        "top1_agreement": round(float(np.mean(reference_top[:, 0] == candidate_top[:, 0])), 4)
+    }
+
+
+def verify(output_dir: str, args) -> dict:
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+
+    texts = sample_texts(args.documents, args.seed)
+    questions = generate_queries(args.queries)
+
+    reference = HuggingFaceEmbeddings(
+        model_name=args.model,
+        model_kwargs={'device': 'cpu'},
+        encode_kwargs={'normalize_embeddings': True, 'batch_size': Config.EMBEDDING_BATCH_SIZE}
+    )
+    reference_docs, reference_seconds = embed_timed(reference, texts)
+    reference_queries = np.array(reference.embed_documents(questions), dtype=np.float32)
+
+    report = {
+        "texts": len(texts),
+        "queries": len(questions),
+        "threads": Config.EMBEDDING_THREADS,
+        "variants": {"torch": {"texts_per_second": round(len(texts) / reference_seconds, 1)}},
+        "passed": True
+    }
+    for label, quantized in (("onnx_fp32", False), ("onnx_int8", True)):
+        if quantized and not os.path.exists(os.path.join(output_dir, QUANTIZED_MODEL_FILE)):
+            continue
+        embeddings = OnnxEmbeddings(model_dir=output_dir, quantized=quantized)
+        docs, seconds = embed_timed(embeddings, texts)
+        queries = np.array(embeddings.embed_documents(questions), dtype=np.float32)
+        result = compare(reference_docs, reference_queries, docs, queries, args.k)
+        result["texts_per_second"] = round(len(texts) / seconds, 1)
+        result["passed"] = result["mean_cosine"] >= args.min_cosine and result[f"overlap_at_{args.k}"] >= args.min_overlap
+        report["variants"][label] = result
+        report["passed"] = report["passed"] and result["passed"]
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export, quantize and verify the ONNX embedding model")
+    parser.add_argument('--model', default=Config.EMBEDDING_MODEL)
+    parser.add_argument('--output-dir', default=Config.ONNX_EMBEDDING_PATH)
+    parser.add_argument('--verify-only', action='store_true', help="Skip export; verify an existing export")
+    parser.add_argument('--no-quantize', action='store_true')
+    parser.add_argument('--documents', type=int, default=10, help="Synthetic documents for verification")
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--k', type=int, default=Config.RETRIEVAL_K)
+    parser.add_argument('--min-cosine', type=float, default=0.99)
+    parser.add_argument('--min-overlap', type=float, default=0.9, help="Required mean top-k overlap with PyTorch")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', action='store_true', help="Print machine-readable JSON only")
+    args = parser.parse_args()
+
+    if not args.verify_only:
+        export(args.model, args.output_dir)
+        if not args.no_quantize:
+            quantize(args.output_dir)
+
+    report = verify(args.output_dir, args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"📊 {report['texts']} passages, {report['queries']} queries, {report['threads']} threads")
+        for label, row in report["variants"].items():
+            print(f"  {label:10} {json.dumps(row)}")
+        print("✅ Within tolerance" if report["passed"] else "❌ Outside tolerance")
+    sys.exit(0 if report["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Local fake of the Groq chat completions API for offline testing of the LLM client.
+
+Usage:
+    python tools/fake_llm_server.py --port 8089 --latency 0.2 --error-rate 0.3
+    python tools/fake_llm_server.py --fail-first 2 --error-status 429
+    GROQ_BASE_URL=http://127.0.0.1:8089 GROQ_API_KEY=fake python app.py
+"""
+
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    """Serves OpenAI-compatible chat completions with configurable latency and failures"""
+
+    latency = 0.0
+    error_rate = 0.0
+    error_status = 503
+    fail_first = 0
+    answer = "This is a canned answer from the fake LLM server."
+    request_count = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {"error": {"message": f"Unknown path: {self.path}"}})
+            return
+
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+
+        with FakeLLMHandler.lock:
+            FakeLLMHandler.request_count += 1
+            count = FakeLLMHandler.request_count
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        if count <= self.fail_first or random.random() < self.error_rate:
+            headers = {"retry-after": "1"} if self.error_status == 429 else {}
+            self._send_json(self.error_status, {"error": {"message": "Injected failure"}}, headers)
+            return
+
+        self._send_json(200, {
+            "id": f"chatcmpl-fake-{count}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake-model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": self.answer},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        })
+
+    def _send_json(self, status: int, payload: dict, headers: dict = None):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up waiting, as a timeout test means it to
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def configure(latency: float = 0.0, error_rate: float = 0.0, error_status: int = 503, fail_first: int = 0):
+    """Set the failure mode and reset the request counter; takes effect on the next request"""
+    with FakeLLMHandler.lock:
+        FakeLLMHandler.latency = latency
+        FakeLLMHandler.error_rate = error_rate
+        FakeLLMHandler.error_status = error_status
+        FakeLLMHandler.fail_first = fail_first
+        FakeLLMHandler.request_count = 0
+
+
+def run_server(host: str = '127.0.0.1', port: int = 8089, latency: float = 0.0,
+               error_rate: float = 0.0, error_status: int = 503, fail_first: int = 0) -> ThreadingHTTPServer:
+    """Start the fake server on a background thread and return it; port 0 picks a free port"""
+    configure(latency, error_rate, error_status, fail_first)
+
+    server = ThreadingHTTPServer((host, port), FakeLLMHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Groq-compatible LLM server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds to sleep per request")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument('--error-status', type=int, default=503, help="HTTP status for injected failures")
+    parser.add_argument('--fail-first', type=int, default=0, help="Fail this many requests before any succeed")
+    args = parser.parse_args()
+
+    server = run_server(args.host, args.port, args.latency, args.error_rate, args.error_status, args.fail_first)
+    print(f"🤖 Fake LLM server listening on http://{args.host}:{args.port}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
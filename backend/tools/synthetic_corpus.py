@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic Indian-statute-style corpus for benchmarks.
+
+Documents are plain text Acts made of chapters and bare-Act style sections
+("302. Title.—Body"), so they exercise the legal chunker like real statutes.
+
+Usage:
+    python tools/synthetic_corpus.py /tmp/corpus --documents 50 --sections 40
+"""
+
+import os
+import random
+import argparse
+from typing import List
+
+SUBJECTS = [
+    'murder', 'theft', 'cheating', 'defamation', 'trespass', 'bribery', 'forgery', 'extortion',
+    'kidnapping', 'assault', 'contract', 'tenancy', 'inheritance', 'arbitration', 'bail', 'appeal',
+    'evidence', 'limitation', 'partnership', 'insolvency', 'copyright', 'taxation', 'marriage', 'custody'
+]
+ACTORS = ['whoever', 'any person', 'a public servant', 'the court', 'the magistrate', 'the tenant',
+          'the landlord', 'the accused', 'the complainant', 'the government', 'a company', 'the arbitrator']
+VERBS = ['commits', 'abets', 'attempts', 'causes', 'permits', 'conceals', 'declares', 'transfers',
+         'receives', 'executes', 'registers', 'revokes']
+QUALIFIERS = ['dishonestly', 'fraudulently', 'knowingly', 'with intent to cause wrongful loss',
+              'without lawful excuse', 'in good faith', 'for valuable consideration', 'in contravention of this Act']
+PENALTIES = ['imprisonment for a term which may extend to seven years', 'fine which may extend to ten thousand rupees',
+             'imprisonment for life', 'simple imprisonment for one month', 'both imprisonment and fine']
+
+
+def _sentence(rng: random.Random, subject: str) -> str:
+    return (
+        f"{rng.choice(ACTORS).capitalize()} who {rng.choice(VERBS)} {subject} {rng.choice(QUALIFIERS)} "
+        f"shall be punished with {rng.choice(PENALTIES)}."
+    )
+
+
+def generate_document(rng: random.Random, act_number: int, sections: int) -> str:
+    """Build one synthetic Act as text"""
+    lines = [f"THE SYNTHETIC LEGAL ACT NO. {act_number}", ""]
+    section_number = 1
+    chapter = 1
+    while section_number <= sections:
+        lines.append(f"CHAPTER {chapter}")
+        lines.append(f"OF OFFENCES RELATING TO {rng.choice(SUBJECTS).upper()}")
+        for _ in range(min(rng.randint(4, 12), sections - section_number + 1)):
+            subject = rng.choice(SUBJECTS)
+            body = " ".join(_sentence(rng, subject) for _ in range(rng.randint(2, 12)))
+            lines.append(f"{section_number}. Punishment for {subject}.—{body}")
+            if rng.random() < 0.3:
+                lines.append("Explanation.—" + _sentence(rng, rng.choice(SUBJECTS)))
+            section_number += 1
+        chapter += 1
+        lines.append("")
+    return "\n".join(lines)
+
+
+def generate_corpus(output_dir: str, documents: int = 20, sections: int = 40, seed: int = 42) -> List[str]:
+    """Write synthetic Acts to output_dir and return their paths"""
+    rng = random.Random(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for number in range(1, documents + 1):
+        path = os.path.join(output_dir, f"synthetic_act_{number:04d}.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(generate_document(rng, number, sections))
+        paths.append(path)
+    return paths
+
+
+def generate_queries(count: int = 50, seed: int = 7) -> List[str]:
+    """Questions in the style users ask about the synthetic corpus"""
+    rng = random.Random(seed)
+    templates = [
+        "What is the punishment for {subject}?",
+        "What happens if {actor} {verb} {subject} {qualifier}?",
+        "Explain section {number} relating to {subject}",
+        "Is {subject} punishable with {penalty}?"
+    ]
+    return [
+        rng.choice(templates).format(
+            subject=rng.choice(SUBJECTS), actor=rng.choice(ACTORS), verb=rng.choice(VERBS),
+            qualifier=rng.choice(QUALIFIERS), penalty=rng.choice(PENALTIES), number=rng.randint(1, 40)
+        )
+        for _ in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic legal corpus")
+    parser.add_argument('output_dir')
+    parser.add_argument('--documents', type=int, default=20)
+    parser.add_argument('--sections', type=int, default=40, help="Sections per document")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    paths = generate_corpus(args.output_dir, args.documents, args.sections, args.seed)
+    print(f"✅ Wrote {len(paths)} documents to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,11 @@
 import os
 import uuid
 import hashlib
+import unicodedata
 from pathlib import Path
 from typing import Dict, Any, List
 from datetime import datetime
+from werkzeug.utils import secure_filename
 
 def generate_unique_filename(original_filename: str) -> str:
     """Generate a unique filename to prevent conflicts"""
@@ -50,6 +52,22 @@ def sanitize_filename(filename: str) -> str:
     
     return filename
 
+def document_source_name(filename: str, content_hash: str) -> str:
+    """Index key for an uploaded file; names in any script are kept instead of reduced to ASCII"""
+    name = unicodedata.normalize('NFC', filename or '').replace('\\', '/').rsplit('/', 1)[-1]
+    extension = Path(name).suffix
+    if name.isascii():
+        # The same keys as before for ASCII names, so re-uploads still replace documents indexed earlier
+        key = secure_filename(name)
+    else:
+        key = sanitize_filename(''.join(char for char in name if unicodedata.category(char) != 'Cc'))
+    
+    # Nothing usable left of the name: the content hash keeps different files apart
+    stem, key_extension = Path(key).stem, Path(key).suffix
+    if not stem or key_extension != extension:
+        key = f"{stem or 'document'}-{content_hash[:12]}{extension}"
+    return key
+
 def validate_json_structure(data: Dict[str, Any], required_fields: List[str]) -> Dict[str, Any]:
     """Validate JSON structure and return validation result"""
     missing_fields = []
@@ -1,53 +1,238 @@
 import logging
+import logging.handlers
 import os
-from datetime import datetime
+import re
+import json
+import queue
+import atexit
+import uuid
+import random
+import threading
+import contextvars
+from datetime import datetime, timezone
 from pathlib import Path
 
+from config import Config
+from metrics import LOG_RECORDS_DROPPED_TOTAL
+
+# Request id of the request being served by the current thread/context
+request_id_var = contextvars.ContextVar('request_id', default=None)
+
+# Attributes every LogRecord has; anything else was passed via `extra=` and goes into the JSON record
+_RESERVED_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'request_id'}
+
+# Caller-supplied request ids end up in log records, response headers and file names
+REQUEST_ID_PATTERN = re.compile(r'[A-Za-z0-9_-]{1,64}')
+
+_configure_lock = threading.Lock()
+_listener = None
+_queue_handler = None
+_configured = False
+
+def resolve_request_id(value: str = None) -> str:
+    """The caller's request id when it is a short plain token, otherwise a new one"""
+    if value and REQUEST_ID_PATTERN.fullmatch(value):
+        return value
+    return uuid.uuid4().hex
+
+class RequestContextFilter(logging.Filter):
+    """Stamp records with the current request id (runs on the calling thread, before queueing)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, 'request_id'):
+            record.request_id = request_id_var.get()
+        return True
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the request id and any structured `extra` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        request_id = getattr(record, 'request_id', None)
+        if request_id:
+            payload["request_id"] = request_id
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith('_'):
+                payload[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exception"] = record.exc_text
+        return json.dumps(payload, default=str)
+
+class TextFormatter(logging.Formatter):
+    """Classic text format with the request id appended when there is one"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = super().format(record)
+        request_id = getattr(record, 'request_id', None)
+        return f"{message} [request_id={request_id}]" if request_id else message
+
+class _PreparedQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that keeps structured fields intact for the background formatter"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message and traceback now: args and exc_info may not survive the thread hop
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        # The queue is bounded: when the writer stalls (e.g. a slow disk) drop records instead of growing memory
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED_TOTAL.inc()
+
+class _BoundedQueueListener(logging.handlers.QueueListener):
+    """Queue listener whose stop sentinel waits for room in a full queue"""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+def configure_logging(level: str = None, log_file: str = None, log_format: str = None,
+                      async_mode: bool = None, max_bytes: int = None, backup_count: int = None):
+    """Configure the root logger once: console + rotating file, optionally written by a background thread"""
+    global _listener, _queue_handler, _configured
+
+    level = level or Config.LOG_LEVEL
+    log_file = Config.LOG_FILE if log_file is None else log_file
+    log_format = log_format or Config.LOG_FORMAT
+    async_mode = Config.LOG_ASYNC if async_mode is None else async_mode
+    max_bytes = max_bytes or Config.LOG_MAX_BYTES
+    backup_count = Config.LOG_BACKUP_COUNT if backup_count is None else backup_count
+
+    with _configure_lock:
+        root = logging.getLogger()
+        root.setLevel(getattr(logging, level.upper()))
+        if _configured:
+            return
+
+        formatter = JsonFormatter() if log_format == 'json' else TextFormatter()
+        handlers = []
+
+        # Console handler
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
+
+        # Size-rotated file handler
+        if log_file:
+            # Create logs directory if it doesn't exist
+            Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+            file_handler = logging.handlers.RotatingFileHandler(
+                log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+            )
+            file_handler.setFormatter(formatter)
+            handlers.append(file_handler)
+
+        root.handlers.clear()
+        if async_mode:
+            # Request threads only enqueue; formatting and disk writes happen on the listener thread
+            _queue_handler = _PreparedQueueHandler(queue.Queue(maxsize=Config.LOG_QUEUE_SIZE))
+            _queue_handler.addFilter(RequestContextFilter())
+            root.addHandler(_queue_handler)
+            _listener = _BoundedQueueListener(_queue_handler.queue, *handlers, respect_handler_level=True)
+            _listener.start()
+            atexit.register(shutdown_logging)
+        else:
+            for handler in handlers:
+                handler.addFilter(RequestContextFilter())
+                root.addHandler(handler)
+        _configured = True
+
+def shutdown_logging():
+    """Flush queued records and stop the background writer"""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+def _per_process_file_handler(handler: logging.handlers.RotatingFileHandler) -> logging.Handler:
+    """Same rotating file settings, with this process's pid in the name: processes must never rotate one file"""
+    path = Path(handler.baseFilename)
+    replacement = logging.handlers.RotatingFileHandler(
+        path.with_name(f"{path.stem}.{os.getpid()}{path.suffix}"),
+        maxBytes=handler.maxBytes, backupCount=handler.backupCount, encoding=handler.encoding
+    )
+    replacement.setFormatter(handler.formatter)
+    replacement.setLevel(handler.level)
+    for log_filter in handler.filters:
+        replacement.addFilter(log_filter)
+    handler.close()
+    return replacement
+
+def _restart_listener_after_fork():
+    """Threads do not survive fork: give each pre-forked worker its own queue, background writer and log file"""
+    global _listener, _configure_lock
+    _configure_lock = threading.Lock()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, logging.handlers.RotatingFileHandler):
+            root.removeHandler(handler)
+            root.addHandler(_per_process_file_handler(handler))
+    if _listener is not None:
+        handlers = [
+            _per_process_file_handler(handler) if isinstance(handler, logging.handlers.RotatingFileHandler)
+            else handler
+            for handler in _listener.handlers
+        ]
+        _queue_handler.queue = queue.Queue(maxsize=Config.LOG_QUEUE_SIZE)
+        _listener = _BoundedQueueListener(_queue_handler.queue, *handlers, respect_handler_level=True)
+        _listener.start()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_listener_after_fork)
+
 def setup_logger(name: str, log_file: str = None, level: str = 'INFO') -> logging.Logger:
-    """Setup a logger with file and console handlers"""
-    
-    # Create logger
+    """Setup a logger; records propagate to the shared root handlers configured once per process"""
+
+    configure_logging(level=level, log_file=log_file)
+
     logger = logging.getLogger(name)
     logger.setLevel(getattr(logging, level.upper()))
-    
-    # Clear existing handlers
+
+    # Handlers live on the root logger only, so records are never written twice
     logger.handlers.clear()
-    
-    # Create formatter
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    
-    # Console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
-    # File handler
-    if log_file:
-        # Create logs directory if it doesn't exist
-        log_dir = Path(log_file).parent
-        log_dir.mkdir(parents=True, exist_ok=True)
-        
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
-    
+    logger.propagate = True
+
     return logger
 
+def should_sample(rate: float) -> bool:
+    """Decide whether to keep one high-volume record at the given sampling rate"""
+    return rate >= 1.0 or random.random() < rate
+
 def log_request(logger: logging.Logger, method: str, endpoint: str, user_ip: str = None):
     """Log API request"""
     message = f"API Request: {method} {endpoint}"
     if user_ip:
         message += f" from {user_ip}"
-    logger.info(message)
+    logger.info(message, extra={"method": method, "endpoint": endpoint, "client_ip": user_ip})
 
-def log_response(logger: logging.Logger, method: str, endpoint: str, status_code: int, response_time: float = None):
+def log_response(logger: logging.Logger, method: str, endpoint: str, status_code: int, response_time: float = None,
+                 timings: dict = None):
     """Log API response"""
     message = f"API Response: {method} {endpoint} - {status_code}"
+    extra = {"method": method, "endpoint": endpoint, "status": status_code}
     if response_time:
         message += f" ({response_time:.3f}s)"
-    logger.info(message)
+        extra["duration_ms"] = round(response_time * 1000, 2)
+    if timings:
+        extra["timings"] = timings
+    logger.info(message, extra=extra)
 
 def log_error(logger: logging.Logger, error: Exception, context: str = None):
     """Log error with context"""
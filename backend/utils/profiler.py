@@ -0,0 +1,104 @@
+import os
+import re
+import sys
+import json
+import hmac
+import logging
+import threading
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_STACK_DEPTH = 128
+
+# Anything else in a request id could escape the profile directory or break the file name
+UNSAFE_NAME_CHARS = re.compile(r'[^A-Za-z0-9_-]')
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class SamplingProfiler:
+    """Samples one thread's stack at a fixed interval from a background thread"""
+
+    def __init__(self, thread_id: int = None, interval: float = 0.005):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return
+            labels = []
+            while frame is not None and len(labels) < MAX_STACK_DEPTH:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            # Collapsed-stack format: root first, frames separated by semicolons
+            self.stacks[";".join(reversed(labels))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """Stacks in the folded format read by flamegraph.pl, speedscope and inferno"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+def is_authorized(header_value: Optional[str], token: str) -> bool:
+    """On-demand profiling needs a configured token; an empty token disables the header"""
+    if not token or not header_value:
+        return False
+    return hmac.compare_digest(header_value.encode('utf-8'), token.encode('utf-8'))
+
+class ProfileStore:
+    """Writes profiles as <name>.folded plus a <name>.json sidecar, keeping the newest max_files"""
+
+    def __init__(self, directory: str, max_files: int = 200):
+        self.directory = directory
+        self.max_files = max_files
+
+    def save(self, profiler: SamplingProfiler, request_id: str, details: Dict[str, Any]) -> Optional[str]:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            safe_id = UNSAFE_NAME_CHARS.sub('_', str(request_id))[:64] or 'request'
+            name = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{safe_id}"
+            folded_path = os.path.join(self.directory, f"{name}.folded")
+            with open(folded_path, 'w', encoding='utf-8') as f:
+                f.write(profiler.collapsed())
+
+            metadata = dict(details)
+            metadata.update({
+                "request_id": request_id,
+                "samples": profiler.samples,
+                "interval_ms": profiler.interval * 1000,
+                "created_at": datetime.now().isoformat()
+            })
+            with open(os.path.join(self.directory, f"{name}.json"), 'w', encoding='utf-8') as f:
+                json.dump(metadata, f, indent=2, default=str)
+
+            self._prune()
+            return folded_path
+
+        except Exception as e:
+            logger.error(f"Failed to save request profile: {str(e)}")
+            return None
+
+    def _prune(self):
+        profiles = sorted(Path(self.directory).glob("*.folded"), key=lambda p: p.stat().st_mtime)
+        for path in profiles[:max(0, len(profiles) - self.max_files)]:
+            path.unlink(missing_ok=True)
+            path.with_suffix('.json').unlink(missing_ok=True)
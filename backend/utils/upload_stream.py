@@ -0,0 +1,93 @@
+import os
+import hashlib
+import tempfile
+from pathlib import Path
+from typing import List
+
+from utils.helpers import format_file_size
+
+class UploadRejected(Exception):
+    """Raised while the body is still arriving, so the rest of it is never read"""
+
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+class HashingUploadStream:
+    """Writable upload target that spools to disk while computing SHA-256 and size on the fly"""
+
+    def __init__(self, upload_dir: str, filename: str, max_size: int):
+        os.makedirs(upload_dir, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(dir=upload_dir, prefix='upload_', suffix=Path(filename).suffix.lower())
+        self._file = os.fdopen(fd, 'w+b')
+        self._hash = hashlib.sha256()
+        self.filename = filename
+        self.max_size = max_size
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self.size += len(data)
+        if self.size > self.max_size:
+            self.discard()
+            raise UploadRejected(
+                f"File too large. Maximum size is {format_file_size(self.max_size)}", 413
+            )
+        self._hash.update(data)
+        return self._file.write(data)
+
+    @property
+    def sha256(self) -> str:
+        return self._hash.hexdigest()
+
+    def finish(self):
+        """Flush and close the spooled file so ingestion can read it by path"""
+        if not self._file.closed:
+            self._file.close()
+
+    def discard(self):
+        """Close and delete the spooled file"""
+        self.finish()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    # File protocol used by the multipart parser and FileStorage
+    def seek(self, offset: int, whence: int = 0) -> int:
+        return self._file.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def read(self, size: int = -1) -> bytes:
+        return self._file.read(size)
+
+    def readline(self, size: int = -1) -> bytes:
+        return self._file.readline(size)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self.finish()
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def readable(self) -> bool:
+        return True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+def open_upload_stream(upload_dir: str, filename: str, supported_formats: List[str],
+                       max_size: int) -> HashingUploadStream:
+    """Reject unsupported file types from the part headers, before any file data is read"""
+    file_extension = Path(filename or '').suffix.lower()
+    if file_extension not in supported_formats:
+        raise UploadRejected(
+            f"Unsupported file format: {file_extension or 'none'}. Supported formats: {supported_formats}", 415
+        )
+    return HashingUploadStream(upload_dir, filename, max_size)